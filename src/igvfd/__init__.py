@@ -244,12 +244,15 @@ def main(global_config, **local_config):
     config.include('.renderers')
     config.include('.authentication')
     config.include('.server_defaults')
+    config.include('.embed')
+    config.include('.provenance')
     config.include('.types')
     config.include('.searches.configs')
     config.include('.root')
 
     config.include('.ontology')
     config.include('.report')
+    config.include('.bulk_import')
     config.include('.verify_email')
 
     if 'elasticsearch.server' in config.registry.settings:
@@ -1,2 +1,19 @@
+from .docstrings import (
+    get_audit_modules,
+    register_audit_docstrings,
+)
+from .tracking import (
+    AUDIT_RESULT_CACHE,
+    AuditResultCache,
+    DEFAULT_AUDIT_RESULT_CACHE_CAPACITY,
+)
+
+
 def includeme(config):
+    capacity = int(
+        config.registry.settings.get('audit_cache.capacity', DEFAULT_AUDIT_RESULT_CACHE_CAPACITY)
+    )
+    config.registry[AUDIT_RESULT_CACHE] = AuditResultCache(capacity=capacity)
     config.scan(categories=None)
+    # Fail at startup rather than while auditing on a malformed docstring.
+    register_audit_docstrings(get_audit_modules())
@@ -3,13 +3,14 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .tracking import track_audit_inputs
 
 
 @audit_checker('AnalysisSet', frame='object')
+@track_audit_inputs
 def audit_input_file_sets(value, system):
     '''
     [
@@ -25,7 +26,7 @@ def audit_input_file_sets(value, system):
     if value.get('file_set_type') == 'primary analysis':
         if not(any(file_set.startswith('/measurement-sets/') for file_set in value['input_file_sets'])):
             detail = (
-                f'Analysis set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+                f'Analysis set {path_to_link(value["@id"])} '
                 f'is a primary analysis, but does not specify any measurement sets in '
                 f'`input_file_sets`.'
             )
@@ -3,16 +3,18 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
+    paths_to_links,
 )
+from .tracking import track_audit_inputs
 from .file_set import (
     find_non_config_sequence_files
 )
 
 
 @audit_checker('AuxiliarySet', frame='object')
+@track_audit_inputs
 def audit_auxiliary_set_files(value, system):
     '''
     [
@@ -27,7 +29,7 @@ def audit_auxiliary_set_files(value, system):
     non_sequence_files = find_non_config_sequence_files(value)
     if non_sequence_files:
         non_sequence_files = ', '.join(
-            [audit_link(path_to_text(file), file) for file in non_sequence_files])
-        detail = (f'Auxiliary set {audit_link(path_to_text(value["@id"]),value["@id"])} links to '
+            paths_to_links(non_sequence_files))
+        detail = (f'Auxiliary set {path_to_link(value["@id"])} links to '
                   f'`files` that are not sequence or configuration files: {non_sequence_files}.')
         yield AuditFailure('unexpected files', f'{detail} {description}', level='WARNING')
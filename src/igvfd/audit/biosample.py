@@ -3,13 +3,20 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('Biosample', frame='object')
+@track_audit_inputs
+@audit_links('Biosample', donors=RAW_OBJECT_FRAME)
 def audit_biosample_taxa_check(value, system):
     '''
     [
@@ -26,8 +33,8 @@ def audit_biosample_taxa_check(value, system):
         donor_ids = value.get('donors')
         taxa_dict = {}
         for d in donor_ids:
-            donor_object = system.get('request').embed(d + '@@object?skip_calculated=true')
-            d_link = audit_link(path_to_text(d), d)
+            donor_object = get_linked_object(system, d, RAW_OBJECT_FRAME)
+            d_link = path_to_link(d)
             if donor_object.get('taxa'):
                 taxa = donor_object.get('taxa')
                 if taxa not in taxa_dict:
@@ -40,11 +47,12 @@ def audit_biosample_taxa_check(value, system):
             for k, v in taxa_dict.items():
                 taxa_donors.append(f'{k} ({", ".join(v)})')
             taxa_detail = ', '.join(taxa_donors)
-            detail = f'Biosample {audit_link(path_to_text(sample_id), sample_id)} has `donors` with `taxa` {taxa_detail}. '
+            detail = f'Biosample {path_to_link(sample_id)} has `donors` with `taxa` {taxa_detail}. '
             yield AuditFailure('inconsistent donor taxa', f'{detail} {description}', level='ERROR')
 
 
 @audit_checker('Biosample', frame='object')
+@track_audit_inputs
 def audit_biosample_age(value, system):
     '''
     [
@@ -60,7 +68,7 @@ def audit_biosample_age(value, system):
         if 'lower_bound_age' and 'upper_bound_age' and 'age_units' not in value:
             value_id = system.get('path')
             detail = (
-                f'Biosample {audit_link(path_to_text(value_id), value_id)} '
+                f'Biosample {path_to_link(value_id)} '
                 f'is missing `upper_bound_age`, `lower_bound_age`, and `age_units`.'
             )
             yield AuditFailure('missing age', f'{detail} {description}', level='WARNING')
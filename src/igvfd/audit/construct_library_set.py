@@ -3,16 +3,23 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
+    paths_to_links,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 from .file_set import (
     find_non_config_sequence_files
 )
 
 
 @audit_checker('ConstructLibrarySet', frame='object')
+@track_audit_inputs
 def audit_construct_library_set_associated_phenotypes(value, system):
     '''
     [
@@ -32,7 +39,7 @@ def audit_construct_library_set_associated_phenotypes(value, system):
             return
         else:
             detail = (
-                f'Construct library set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+                f'Construct library set {path_to_link(value["@id"])} '
                 f'has phenotype-associated variants listed in its `selection_criteria`, '
                 f'but no phenotype term specified in `associated_phenotypes`.'
             )
@@ -41,6 +48,8 @@ def audit_construct_library_set_associated_phenotypes(value, system):
 
 
 @audit_checker('ConstructLibrarySet', frame='object')
+@track_audit_inputs
+@audit_links('ConstructLibrarySet', documents=RAW_OBJECT_FRAME)
 def audit_construct_library_set_plasmid_map(value, system):
     '''
     [
@@ -54,7 +63,7 @@ def audit_construct_library_set_plasmid_map(value, system):
     description = get_audit_description(audit_construct_library_set_plasmid_map)
     map_counter = 0
     detail = (
-        f'Construct library set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+        f'Construct library set {path_to_link(value["@id"])} '
         f'does not have a plasmid map attached in `documents`.'
     )
     documents = value.get('documents', [])
@@ -62,7 +71,7 @@ def audit_construct_library_set_plasmid_map(value, system):
         yield AuditFailure('missing plasmid map', f'{detail} {description}', level='NOT_COMPLIANT')
     else:
         for document in documents:
-            document_obj = system.get('request').embed(document, '@@object?skip_calculated=true')
+            document_obj = get_linked_object(system, document, RAW_OBJECT_FRAME)
             if document_obj['document_type'] == 'plasmid map':
                 map_counter += 1
                 break
@@ -73,6 +82,7 @@ def audit_construct_library_set_plasmid_map(value, system):
 
 
 @audit_checker('ConstructLibrarySet', frame='object')
+@track_audit_inputs
 def audit_construct_library_set_scope(value, system):
     '''
     [
@@ -88,7 +98,7 @@ def audit_construct_library_set_scope(value, system):
     if value.get('scope') in ['exon', 'tile']:
         if len(value.get('small_scale_gene_list', [])) > 1:
             detail = (
-                f'Construct library set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+                f'Construct library set {path_to_link(value["@id"])} '
                 f'specifies it has a `scope` of {value["scope"]}, but multiple genes are listed in '
                 f'`small_scale_gene_list`.'
             )
@@ -97,6 +107,7 @@ def audit_construct_library_set_scope(value, system):
 
 
 @audit_checker('ConstructLibrarySet', frame='object')
+@track_audit_inputs
 def audit_construct_library_set_files(value, system):
     '''
     [
@@ -111,7 +122,7 @@ def audit_construct_library_set_files(value, system):
     non_sequence_files = find_non_config_sequence_files(value)
     if non_sequence_files:
         non_sequence_files = ', '.join(
-            [audit_link(path_to_text(file), file) for file in non_sequence_files])
-        detail = (f'Construct library set {audit_link(path_to_text(value["@id"]),value["@id"])} links to '
+            paths_to_links(non_sequence_files))
+        detail = (f'Construct library set {path_to_link(value["@id"])} links to '
                   f'`files` that are not sequence or configuration files: {non_sequence_files}.')
         yield AuditFailure('unexpected files', f'{detail} {description}', level='WARNING')
@@ -3,13 +3,21 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    OBJECT_FRAME,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('CuratedSet', frame='object')
+@track_audit_inputs
+@audit_links('CuratedSet', samples=OBJECT_FRAME, donors=RAW_OBJECT_FRAME)
 def audit_curated_set_mismatched_taxa(value, system):
     '''
     [
@@ -27,26 +35,26 @@ def audit_curated_set_mismatched_taxa(value, system):
     if 'samples' in value:
         samples_taxa = set(
             [
-                system.get('request').embed(x).get('taxa', None)
+                get_linked_object(system, x).get('taxa', None)
                 for x in value.get('samples', [])
             ]
         )
         if samples_taxa != taxa and '' not in taxa:
             detail = (
-                f'Curated set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+                f'Curated set {path_to_link(value["@id"])} '
                 f'has a `taxa` which does not match the `taxa` of its associated `samples`.'
             )
             yield AuditFailure('inconsistent taxa', f'{detail} {description}', level='ERROR')
     if 'donors' in value:
         donors_taxa = set(
             [
-                system.get('request').embed(x + '@@object?skip_calculated=true').get('taxa', None)
+                get_linked_object(system, x, RAW_OBJECT_FRAME).get('taxa', None)
                 for x in value.get('donors', [])
             ]
         )
         if donors_taxa != taxa and '' not in taxa:
             detail = (
-                f'Curated set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+                f'Curated set {path_to_link(value["@id"])} '
                 f'has a `taxa` which does not match the `taxa` of its associated `donors`.'
             )
             yield AuditFailure('inconsistent taxa', f'{detail} {description}', level='ERROR')
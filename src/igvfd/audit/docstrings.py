@@ -0,0 +1,98 @@
+import importlib
+import json
+import pkgutil
+
+
+AUDIT_DOCSTRINGS = {}
+
+AUDIT_DOCSTRING_KEYS = [
+    'audit_description',
+    'audit_category',
+    'audit_level',
+]
+
+AUDIT_LEVELS = [
+    'ERROR',
+    'NOT_COMPLIANT',
+    'WARNING',
+    'INTERNAL_ACTION',
+]
+
+NON_AUDIT_FUNCTION_NAMES = [
+    'audit_checker',
+    'audit_link',
+    'audit_links',
+]
+
+
+def get_audit_modules():
+    package = importlib.import_module('igvfd.audit')
+    return [
+        importlib.import_module(f'{package.__name__}.{name}')
+        for _, name, _ in pkgutil.iter_modules(package.__path__)
+    ]
+
+
+def get_audit_functions(module):
+    return [
+        (name, getattr(module, name))
+        for name in dir(module)
+        if name.startswith('audit_') and name not in NON_AUDIT_FUNCTION_NAMES
+    ]
+
+
+def parse_audit_docstring(audit_function, name=None):
+    """Returns the list of audits described by the JSON docstring of an
+    audit function, or None if it has no docstring."""
+    docstring = audit_function.__doc__
+    if docstring is None:
+        return None
+    try:
+        return json.loads(docstring)
+    except ValueError:
+        raise ValueError(f'Docstring: {docstring} in function: {name or audit_function} is not valid JSON format.')
+
+
+def validate_audit_docstring(name, docstrings):
+    if not isinstance(docstrings, list) or not docstrings:
+        raise ValueError(f'Docstring in function: {name} is not a non-empty list of audits.')
+    for index, docstring in enumerate(docstrings):
+        if not isinstance(docstring, dict) or sorted(docstring) != sorted(AUDIT_DOCSTRING_KEYS):
+            raise ValueError(
+                f'Audit {index} in docstring of function: {name} must have exactly the keys {AUDIT_DOCSTRING_KEYS}.'
+            )
+        if docstring['audit_level'] not in AUDIT_LEVELS:
+            raise ValueError(
+                f'Audit {index} in docstring of function: {name} has unknown level {docstring["audit_level"]}.'
+            )
+
+
+def register_audit_docstrings(modules):
+    """Parses and validates the docstrings of the audit functions in modules
+    once and returns them by full function name. Raises ValueError on the
+    first malformed docstring."""
+    docstrings_by_name = {}
+    for module in modules:
+        for function_name, audit_function in get_audit_functions(module):
+            name = f'{module.__name__}.{function_name}'
+            docstrings = parse_audit_docstring(audit_function, name)
+            if docstrings is not None:
+                validate_audit_docstring(name, docstrings)
+            AUDIT_DOCSTRINGS[audit_function] = docstrings or []
+            docstrings_by_name[name] = docstrings or {}
+    return docstrings_by_name
+
+
+def get_audit_docstrings(audit_function):
+    docstrings = AUDIT_DOCSTRINGS.get(audit_function)
+    if docstrings is None:
+        docstrings = parse_audit_docstring(audit_function) or []
+        AUDIT_DOCSTRINGS[audit_function] = docstrings
+    return docstrings
+
+
+def get_audit_field(audit_function, field, index):
+    docstrings = get_audit_docstrings(audit_function)
+    if not docstrings:
+        return None
+    return docstrings[index].get(field, '')
@@ -3,10 +3,16 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
+    paths_to_links,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 def find_non_config_sequence_files(file_set):
@@ -18,6 +24,7 @@ def find_non_config_sequence_files(file_set):
 
 
 @audit_checker('FileSet', frame='object')
+@track_audit_inputs
 def audit_no_files(value, system):
     '''
     [
@@ -31,13 +38,15 @@ def audit_no_files(value, system):
     description = get_audit_description(audit_no_files)
     if not(value.get('files', '')):
         detail = (
-            f'File set {audit_link(path_to_text(value["@id"]), value["@id"])} '
+            f'File set {path_to_link(value["@id"])} '
             f'has no `files`.'
         )
         yield AuditFailure('missing files', f'{detail} {description}', level='WARNING')
 
 
 @audit_checker('FileSet', frame='object')
+@track_audit_inputs
+@audit_links('FileSet', files=OBJECT_FRAME, prefixes=['/sequence-files/'])
 def audit_missing_seqspec(value, system):
     '''
     [
@@ -53,20 +62,21 @@ def audit_missing_seqspec(value, system):
         no_seqspec = []
         for file in value['files']:
             if file.startswith('/sequence-files/'):
-                sequence_file_object = system.get('request').embed(file)
+                sequence_file_object = get_linked_object(system, file)
                 if not sequence_file_object.get('seqspecs'):
                     no_seqspec.append(file)
         if no_seqspec:
-            no_seqspec = ', '.join([audit_link(path_to_text(file_no_seqspec), file_no_seqspec)
-                                   for file_no_seqspec in no_seqspec])
+            no_seqspec = ', '.join(paths_to_links(no_seqspec))
             detail = (
-                f'File set {audit_link(path_to_text(value["@id"]), value["@id"])} has sequence file(s): '
+                f'File set {path_to_link(value["@id"])} has sequence file(s): '
                 f'{no_seqspec} which do not have any `seqspecs`.'
             )
             yield AuditFailure('missing sequence specification', f'{detail} {description}', level='NOT_COMPLIANT')
 
 
 @audit_checker('FileSet', frame='object')
+@track_audit_inputs
+@audit_links('FileSet', files=OBJECT_FRAME, prefixes=['/sequence-files/', '/configuration-files/'])
 def audit_files_associated_with_incorrect_fileset(value, system):
     '''
     [
@@ -81,37 +91,39 @@ def audit_files_associated_with_incorrect_fileset(value, system):
     if 'files' in value:
         for file in value['files']:
             if file.startswith('/sequence-files/'):
-                sequence_file_object = system.get('request').embed(file)
+                sequence_file_object = get_linked_object(system, file)
 
                 # Audit the file set with sequence files without the associated seqspec also in the file set.
                 if sequence_file_object.get('seqspecs'):
                     for configuration_file in sequence_file_object.get('seqspecs'):
                         if configuration_file not in value['files']:
                             detail = (
-                                f'File set {audit_link(path_to_text(value["@id"]), value["@id"])} has sequence file '
-                                f'{audit_link(path_to_text(file), file)} which links to seqspec '
-                                f'{audit_link(path_to_text(configuration_file), configuration_file)} which does not link to this file set.'
+                                f'File set {path_to_link(value["@id"])} has sequence file '
+                                f'{path_to_link(file)} which links to seqspec '
+                                f'{path_to_link(configuration_file)} which does not link to this file set.'
                             )
                             yield AuditFailure('missing related files', f'{detail} {description}', level='ERROR')
 
             # Audit the file set with a seqspec configuration file without the associated sequence files also in the file set.
             if file.startswith('/configuration-files/'):
-                configuration_file_object = system.get('request').embed(file, '@@object?skip_calculated=true')
+                configuration_file_object = get_linked_object(system, file)
                 if configuration_file_object['content_type'] == 'seqspec' and configuration_file_object.get('seqspec_of'):
                     missing_sequence_files = list(set(configuration_file_object.get(
                         'seqspec_of', [])).difference(set(value['files'])))
                     if missing_sequence_files:
                         missing_sequence_files = ', '.join(
-                            [audit_link(path_to_text(sequence_file), sequence_file) for sequence_file in missing_sequence_files])
+                            paths_to_links(missing_sequence_files))
                         detail = (
-                            f'File set {audit_link(path_to_text(value["@id"]), value["@id"])} has seqspec configuration file '
-                            f'{audit_link(path_to_text(file), file)} which links to sequence file(s): {missing_sequence_files} which '
+                            f'File set {path_to_link(value["@id"])} has seqspec configuration file '
+                            f'{path_to_link(file)} which links to sequence file(s): {missing_sequence_files} which '
                             f'do not link to this file set.'
                         )
                         yield AuditFailure('missing related files', f'{detail} {description}', level='ERROR')
 
 
 @audit_checker('FileSet', frame='object')
+@track_audit_inputs
+@audit_links('FileSet', files=OBJECT_FRAME, prefixes=['/sequence-files/'])
 def audit_inconsistent_seqspec(value, system):
     '''
     [
@@ -127,7 +139,7 @@ def audit_inconsistent_seqspec(value, system):
         sequence_to_seqspec = {}
         for file in value['files']:
             if file.startswith('/sequence-files/'):
-                sequence_file_object = system.get('request').embed(file)
+                sequence_file_object = get_linked_object(system, file)
 
                 sequencing_run = str(sequence_file_object.get('sequencing_run'))
                 flowcell_id = sequence_file_object.get('flowcell_id', '')
@@ -147,8 +159,8 @@ def audit_inconsistent_seqspec(value, system):
             if not(all(seqspec == first_seqspec for seqspec in file_dict.values())):
                 non_matching_files = [file for file, _ in file_dict.items()]
                 detail = (
-                    f'File set {audit_link(path_to_text(value["@id"]), value["@id"])} has sequence files: '
-                    f'{", ".join([audit_link(path_to_text(non_matching_files), non_matching_files) for non_matching_files in non_matching_files])} '
+                    f'File set {path_to_link(value["@id"])} has sequence files: '
+                    f'{", ".join(paths_to_links(non_matching_files))} '
                     f'which belong to the same sequencing set, but do not have the same `seqspecs`.'
                 )
                 yield AuditFailure('inconsistent sequence specifications', f'{detail} {description}', level='ERROR')
@@ -168,10 +180,10 @@ def audit_inconsistent_seqspec(value, system):
             for key, file in sequence_files:
                 key_set.add(key)
             if len(key_set) > 1:
-                seqspec_paths = [audit_link(path_to_text(x), x) for x in seqspec.split(':')]
+                seqspec_paths = paths_to_links(seqspec.split(':'))
                 detail = (
-                    f'File set {audit_link(path_to_text(value["@id"]), value["@id"])} has sequence files: '
-                    f'{", ".join([audit_link(path_to_text(file), file) for _, file in sequence_files])} '
+                    f'File set {path_to_link(value["@id"])} has sequence files: '
+                    f'{", ".join([path_to_link(file) for _, file in sequence_files])} '
                     f'which share the same `seqspecs` {", ".join(seqspec_paths)} '
                     f'but belong to different sequencing sets.'
                 )
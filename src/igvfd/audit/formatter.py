@@ -1,5 +1,12 @@
+import functools
 import re
-import json
+
+from .docstrings import get_audit_field
+
+
+PATH_TO_TEXT_CACHE_SIZE = 100000
+
+PATH_TO_TEXT_RE = re.compile(r'\/.*\/(.*)\/')
 
 
 def audit_link(linkText, uri):
@@ -7,12 +14,25 @@ def audit_link(linkText, uri):
     return '[{}]({})'.format(linkText, uri)
 
 
+@functools.lru_cache(maxsize=PATH_TO_TEXT_CACHE_SIZE)
 def path_to_text(path):
     """Convert object path to the text portion."""
-    accession = re.match(r'\/.*\/(.*)\/', path)
+    accession = PATH_TO_TEXT_RE.match(path)
     return accession.group(1) if accession else None
 
 
+@functools.lru_cache(maxsize=PATH_TO_TEXT_CACHE_SIZE)
+def path_to_link(path):
+    """Generate link markdown from object path, same as
+    audit_link(path_to_text(path), path)."""
+    return audit_link(path_to_text(path), path)
+
+
+def paths_to_links(paths):
+    """Generate link markdown for each of a list of object paths."""
+    return [path_to_link(path) for path in paths]
+
+
 def space_in_words(objects_string):
     """Insert a space between objects that have more than one
     capital letter eg. AntibodyChar --> Antibody Char"""
@@ -23,10 +43,14 @@ def space_in_words(objects_string):
 def get_audit_description(audit_function, index=0):
     """Retrieves an audit description from the docstring of an audit function.
     By default retrieves the first description."""
-    docstring = audit_function.__doc__
-    if docstring:
-        try:
-            json_docstring = json.loads(docstring)[index]
-            return json_docstring.get('audit_description', '')
-        except:
-            return ValueError(f'Docstring: {docstring} in function: {audit_function} is not valid JSON format.')
+    return get_audit_field(audit_function, 'audit_description', index)
+
+
+def get_audit_category(audit_function, index=0):
+    """Retrieves an audit category from the docstring of an audit function."""
+    return get_audit_field(audit_function, 'audit_category', index)
+
+
+def get_audit_level(audit_function, index=0):
+    """Retrieves an audit level from the docstring of an audit function."""
+    return get_audit_field(audit_function, 'audit_level', index)
@@ -3,13 +3,18 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .prefetch import (
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('HumanDonor', frame='object')
+@track_audit_inputs
 def audit_related_donors(value, system):
     '''
     [
@@ -31,16 +36,16 @@ def audit_related_donors(value, system):
         for unique_related_donor in set([related_donor['donor'] for related_donor in value['related_donors']]):
             if [related_donor['donor'] for related_donor in value['related_donors']].count(unique_related_donor) > 1:
                 detail = (
-                    f'Human donor {audit_link(path_to_text(value["@id"]), value["@id"])} '
-                    f'has a duplicated related donor {audit_link(path_to_text(unique_related_donor), unique_related_donor)} in `related_donors`.'
+                    f'Human donor {path_to_link(value["@id"])} '
+                    f'has a duplicated related donor {path_to_link(unique_related_donor)} in `related_donors`.'
                 )
                 yield AuditFailure('inconsistent related donors', f'{detail} {description_unique}', level='WARNING')
-            related_donor_object = system.get('request').embed(unique_related_donor, '@@object?skip_calculated=true')
+            related_donor_object = get_linked_object(system, unique_related_donor, RAW_OBJECT_FRAME)
             if 'related_donors' not in related_donor_object or value['@id'] not in [related_donor['donor'] for related_donor in related_donor_object['related_donors']]:
                 detail = (
-                    f'Human donor {audit_link(path_to_text(value["@id"]), value["@id"])} '
-                    f'has {audit_link(path_to_text(unique_related_donor), unique_related_donor)} '
-                    f'as a related donor, but {audit_link(path_to_text(unique_related_donor), unique_related_donor)} '
-                    f'does not mutually specify {audit_link(path_to_text(value["@id"]), value["@id"])} as a related donor in `related_donors`.'
+                    f'Human donor {path_to_link(value["@id"])} '
+                    f'has {path_to_link(unique_related_donor)} '
+                    f'as a related donor, but {path_to_link(unique_related_donor)} '
+                    f'does not mutually specify {path_to_link(value["@id"])} as a related donor in `related_donors`.'
                 )
                 yield AuditFailure('inconsistent related donors', f'{detail} {description_mutual}', level='ERROR')
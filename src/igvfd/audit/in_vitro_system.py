@@ -3,13 +3,19 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
     get_audit_description,
+    path_to_link,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('InVitroSystem', frame='object')
+@track_audit_inputs
 def audit_targeted_sample_term_check(value, system):
     '''
     [
@@ -28,13 +34,14 @@ def audit_targeted_sample_term_check(value, system):
         for term in sample_terms:
             if term == targeted_sample_term:
                 detail = (
-                    f'In vitro system {audit_link(path_to_text(value_id), value_id)} '
+                    f'In vitro system {path_to_link(value_id)} '
                     f'has specified its `targeted_sample_term` to be the same as in `sample_terms`.'
                 )
                 yield AuditFailure('inconsistent targeted sample term', f'{detail} {description}', level='WARNING')
 
 
 @audit_checker('InVitroSystem', frame='embedded')
+@track_audit_inputs
 def audit_cell_fate_change_treatments_purpose(value, system):
     '''
     [
@@ -50,14 +57,16 @@ def audit_cell_fate_change_treatments_purpose(value, system):
         for treatment in value.get('cell_fate_change_treatments'):
             if treatment['purpose'] in ['perturbation', 'agonist', 'antagonist', 'control']:
                 detail = (
-                    f'In vitro system {audit_link(path_to_text(value["@id"]), value["@id"])} '
-                    f'has a treatment {audit_link(path_to_text(treatment["@id"]), treatment["@id"])} in `cell_fate_change_treatments` '
+                    f'In vitro system {path_to_link(value["@id"])} '
+                    f'has a treatment {path_to_link(treatment["@id"])} in `cell_fate_change_treatments` '
                     f'that has `purpose` {treatment["purpose"]}.'
                 )
                 yield AuditFailure('inconsistent treatment purpose', f'{detail} {description}', level='WARNING')
 
 
 @audit_checker('InVitroSystem', frame='embedded')
+@track_audit_inputs
+@audit_links('InVitroSystem', cell_fate_change_protocol=RAW_OBJECT_FRAME)
 def audit_cell_fate_change_protocol_document_type(value, system):
     '''
     [
@@ -70,11 +79,11 @@ def audit_cell_fate_change_protocol_document_type(value, system):
     '''
     description = get_audit_description(audit_cell_fate_change_protocol_document_type)
     if 'cell_fate_change_protocol' in value:
-        doc_object = system.get('request').embed(value['cell_fate_change_protocol'] + '@@object?skip_calculated=true')
+        doc_object = get_linked_object(system, value['cell_fate_change_protocol'], RAW_OBJECT_FRAME)
         if doc_object['document_type'] != 'cell fate change protocol':
             detail = (
-                f'In vitro system {audit_link(path_to_text(value["@id"]), value["@id"])} '
-                f'has a protocol {audit_link(path_to_text(value["cell_fate_change_protocol"]), value["cell_fate_change_protocol"])} in `cell_fate_change_protocols` '
+                f'In vitro system {path_to_link(value["@id"])} '
+                f'has a protocol {path_to_link(value["cell_fate_change_protocol"])} in `cell_fate_change_protocols` '
                 f'that does not have `document_type` cell fate change protocol.'
             )
             yield AuditFailure('inconsistent document type', f'{detail} {description}', level='ERROR')
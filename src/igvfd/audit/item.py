@@ -1,16 +1,51 @@
+import hashlib
+import json
+
 from snovault import (
     AuditFailure,
     audit_checker,
 )
 from snovault import (
+    TYPES,
     UPGRADER,
 )
 from snovault.schema_utils import validate
+from pyramid.events import (
+    ApplicationCreated,
+    subscriber,
+)
+from igvfd.embed import query_max_sid
 from .formatter import (
-    audit_link,
-    path_to_text,
     space_in_words,
+    path_to_link,
 )
+from .tracking import AUDIT_RESULT_CACHE
+
+
+AUDIT_SCHEMA_HASHES = 'igvfd.audit_schema_hashes'
+
+
+def hash_schema(schema):
+    return hashlib.sha1(
+        json.dumps(schema, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+@subscriber(ApplicationCreated)
+def hash_type_schemas(event):
+    registry = event.app.registry
+    registry[AUDIT_SCHEMA_HASHES] = {
+        type_info.name: hash_schema(type_info.schema)
+        for type_info in registry[TYPES].by_item_type.values()
+        if type_info.schema
+    }
+
+
+def get_schema_hash(registry, type_info):
+    hashes = registry.setdefault(AUDIT_SCHEMA_HASHES, {})
+    if type_info.name not in hashes:
+        hashes[type_info.name] = hash_schema(type_info.schema)
+    return hashes[type_info.name]
 
 
 @audit_checker('Item', frame='object')
@@ -19,7 +54,54 @@ def audit_item_schema(value, system):
     registry = system['registry']
     if not context.schema:
         return
+    cache = registry.get(AUDIT_RESULT_CACHE)
+    # Items written in the current transaction have no sid yet.
+    sid = getattr(context, 'sid', None)
+    linked_sid = get_linked_max_sid(system['request'], context) if cache is not None else None
+    if cache is None or sid is None or linked_sid is None:
+        yield from get_schema_failures(value, context, registry)
+        return
+    # Every write gets a new sid and schema changes get a new hash, so an
+    # unchanged item is neither upgraded nor validated again. Validation
+    # also checks linkTo targets, so their max sid is part of the key.
+    key = (
+        'audit_item_schema',
+        str(context.uuid),
+        sid,
+        linked_sid,
+        get_schema_hash(registry, context.type_info),
+    )
+    failures = cache.get(key)
+    if failures is None:
+        failures = list(get_schema_failures(value, context, registry))
+        cache.set(key, failures)
+    yield from failures
+
+
+def get_linked_max_sid(request, context):
+    '''
+    Max sid of the items linked to by context, 0 if it links to none, or
+    None if any of them has no sid (yet).
+    '''
+    linked_uuids = {
+        uuid
+        for uuids in context.links(context.properties).values()
+        for uuid in uuids
+    }
+    if not linked_uuids:
+        return 0
+    return query_max_sid(request, linked_uuids)
+
 
+def get_schema_failures(value, context, registry):
+    '''
+    Upgrades and validates the properties of context with
+    snovault.schema_utils.validate. Compiled validators per type are
+    deliberately not used: validate builds its validator internally and
+    its serializing validator keeps per-call state on the instance, so a
+    validator shared across threads would mean reimplementing snovault's
+    error filtering here. audit_item_schema caches the failures instead.
+    '''
     properties = context.properties.copy()
     current_version = properties.get('schema_version', '')
     target_version = context.type_info.schema_version
@@ -48,7 +130,7 @@ def audit_item_schema(value, system):
             category += ': ' + '/'.join(str(elem) for elem in path)
         detail = ('{} {} has schema error {}.'.format(
             space_in_words(value['@type'][0]).capitalize(),
-            audit_link(path_to_text(value['@id']), value['@id']),
+            path_to_link(value['@id']),
             error.message
         )
         )
@@ -3,13 +3,14 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .tracking import track_audit_inputs
 
 
 @audit_checker('MatrixFile', frame='object')
+@track_audit_inputs
 def audit_matrix_file_dimensions(value, system):
     '''
     [
@@ -23,7 +24,7 @@ def audit_matrix_file_dimensions(value, system):
     description = get_audit_description(audit_matrix_file_dimensions)
     if value['dimension1'] == value['dimension2'] and value['file_format'] != 'hic':
         detail = (
-            f'Matrix file {audit_link(path_to_text(value["@id"]), value["@id"])} '
+            f'Matrix file {path_to_link(value["@id"])} '
             f'has {value["dimension1"]} for both `dimension1` and `dimension2`.'
         )
         yield AuditFailure('inconsistent dimensions', f'{detail} {description}', level='WARNING')
@@ -3,13 +3,21 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
+    paths_to_links,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
+@audit_links('MeasurementSet', related_multiome_datasets=RAW_OBJECT_FRAME)
 def audit_related_multiome_datasets(value, system):
     '''
     [
@@ -26,48 +34,48 @@ def audit_related_multiome_datasets(value, system):
     multiome_size = value.get('multiome_size')
     if related_multiome_datasets == [] and multiome_size:
         detail = (
-            f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+            f'Measurement set {path_to_link(value["@id"])} '
             f'has a `multiome_size` of {multiome_size}, but no `related_multiome_datasets`.'
         )
         yield AuditFailure('inconsistent multiome datasets', f'{detail} {description}', level='ERROR')
     elif related_multiome_datasets and multiome_size:
         if len(related_multiome_datasets) != multiome_size - 1:
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+                f'Measurement set {path_to_link(value["@id"])} '
                 f'has a `multiome_size` of {multiome_size}, but {len(related_multiome_datasets)} '
                 f'`related_multiome_datasets` when {multiome_size - 1} are expected.'
             )
             yield AuditFailure('inconsistent multiome datasets', f'{detail} {description}', level='ERROR')
         samples = value.get('samples')
-        samples_to_link = [audit_link(path_to_text(sample), sample) for sample in samples]
+        samples_to_link = paths_to_links(samples)
         datasets_with_different_samples = []
         datasets_with_different_multiome_sizes = []
         for dataset in related_multiome_datasets:
-            dataset_object = system.get('request').embed(dataset, '@@object?skip_calculated=true')
+            dataset_object = get_linked_object(system, dataset, RAW_OBJECT_FRAME)
             if set(samples) != set(dataset_object.get('samples')):
-                related_samples_to_link = [audit_link(path_to_text(sample), sample)
+                related_samples_to_link = [path_to_link(sample)
                                            for sample in dataset_object.get('samples')]
                 datasets_with_different_samples.append(
-                    f"{audit_link(path_to_text(dataset), dataset)} which has associated sample(s): {', '.join(related_samples_to_link)}")
+                    f"{path_to_link(dataset)} which has associated sample(s): {', '.join(related_samples_to_link)}")
             if dataset_object.get('multiome_size') is None:
                 datasets_with_different_multiome_sizes.append(
-                    f'{audit_link(path_to_text(dataset), dataset)} which does not have a specified `multiome_size`')
+                    f'{path_to_link(dataset)} which does not have a specified `multiome_size`')
             if multiome_size != dataset_object.get('multiome_size') and dataset_object.get('multiome_size') is not None:
                 datasets_with_different_multiome_sizes.append(
-                    f"{audit_link(path_to_text(dataset), dataset)} which has a `multiome_size` of: {dataset_object.get('multiome_size')}")
+                    f"{path_to_link(dataset)} which has a `multiome_size` of: {dataset_object.get('multiome_size')}")
         datasets_with_different_samples = ', '.join(datasets_with_different_samples)
         datasets_with_different_multiome_sizes = ', '.join(datasets_with_different_multiome_sizes)
         samples_to_link = ', '.join(samples_to_link)
         if datasets_with_different_samples:
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]), value["@id"])} '
+                f'Measurement set {path_to_link(value["@id"])} '
                 f'has associated `samples`: {samples_to_link} which are not the same associated `samples` '
                 f'of `related_multiome_datasets`: {datasets_with_different_samples}'
             )
             yield AuditFailure('inconsistent multiome datasets', f'{detail} {description}', level='ERROR')
         if datasets_with_different_multiome_sizes:
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]), value["@id"])} '
+                f'Measurement set {path_to_link(value["@id"])} '
                 f'has a specified `multiome_size` of {multiome_size}, which does not match the '
                 f'`multiome_size` of `related_multiome_datasets`: {datasets_with_different_multiome_sizes}'
             )
@@ -75,6 +83,7 @@ def audit_related_multiome_datasets(value, system):
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
 def audit_unspecified_protocol(value, system):
     '''
     [
@@ -88,13 +97,15 @@ def audit_unspecified_protocol(value, system):
     description = get_audit_description(audit_unspecified_protocol)
     if 'protocols' not in value:
         detail = (
-            f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} '
+            f'Measurement set {path_to_link(value["@id"])} '
             f'has no `protocols`.'
         )
         yield AuditFailure('missing protocol', f'{detail} {description}', level='NOT_COMPLIANT')
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
+@audit_links('MeasurementSet', assay_term=RAW_OBJECT_FRAME)
 def audit_inconsistent_readout(value, system):
     '''
     [
@@ -113,7 +124,7 @@ def audit_inconsistent_readout(value, system):
     description_readout_expectation = get_audit_description(audit_inconsistent_readout)
     description_identical_readout = get_audit_description(audit_inconsistent_readout, index=1)
     assay_term = value.get('assay_term')
-    assay = system.get('request').embed(assay_term, '@@object?skip_calculated=true')
+    assay = get_linked_object(system, assay_term, RAW_OBJECT_FRAME)
     assay = assay.get('term_name')
     assays_with_readout = ['CRISPR screen',
                            'massively parallel reporter assay',
@@ -121,26 +132,28 @@ def audit_inconsistent_readout(value, system):
     if 'readout' in value:
         if assay not in assays_with_readout:
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} is '
+                f'Measurement set {path_to_link(value["@id"])} is '
                 f'a {assay} `assay_term`, but specifies a readout.'
             )
             yield AuditFailure('inconsistent readout', f'{detail} {description_readout_expectation}', level='ERROR')
         if assay_term == value.get('readout'):
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} specifies '
+                f'Measurement set {path_to_link(value["@id"])} specifies '
                 f'the same `readout` and `assay_term`.'
             )
             yield AuditFailure('inconsistent readout', f'{detail} {description_identical_readout}', level='ERROR')
     else:
         if assay in assays_with_readout:
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} is '
+                f'Measurement set {path_to_link(value["@id"])} is '
                 f'a {assay} `assay_term` and does not specify a `readout`.'
             )
             yield AuditFailure('inconsistent readout', f'{detail} {description_readout_expectation}', level='NOT_COMPLIANT')
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
+@audit_links('MeasurementSet', samples=RAW_OBJECT_FRAME)
 def audit_inconsistent_modifications(value, system):
     '''
     [
@@ -155,18 +168,20 @@ def audit_inconsistent_modifications(value, system):
     samples = value.get('samples', [])
     modifications = []
     for sample in samples:
-        sample_object = system.get('request').embed(sample, '@@object?skip_calculated=true')
+        sample_object = get_linked_object(system, sample, RAW_OBJECT_FRAME)
         modifications.append(sorted(sample_object.get('modifications', [])))
     modifications = set(tuple(i) for i in modifications)
     if len(modifications) > 1:
         detail = (
-            f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} has '
+            f'Measurement set {path_to_link(value["@id"])} has '
             f'`samples` with inconsistent `modifications` applied.'
         )
         yield AuditFailure('inconsistent modifications', f'{detail} {description}', level='ERROR')
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
+@audit_links('MeasurementSet', assay_term=RAW_OBJECT_FRAME, samples=RAW_OBJECT_FRAME)
 def audit_CRISPR_screen_lacking_modifications(value, system):
     '''
     [
@@ -179,7 +194,7 @@ def audit_CRISPR_screen_lacking_modifications(value, system):
     '''
     description = get_audit_description(audit_CRISPR_screen_lacking_modifications)
     assay_term = value.get('assay_term')
-    assay = system.get('request').embed(assay_term, '@@object?skip_calculated=true')
+    assay = get_linked_object(system, assay_term, RAW_OBJECT_FRAME)
     crispr_assays = ['cas mediated mutagenesis',
                      'CRISPR screen'
                      ]
@@ -187,20 +202,22 @@ def audit_CRISPR_screen_lacking_modifications(value, system):
         samples = value.get('samples', [])
         bad_samples = []
         for sample in samples:
-            sample_object = system.get('request').embed(sample, '@@object?skip_calculated=true')
+            sample_object = get_linked_object(system, sample, RAW_OBJECT_FRAME)
             if 'modifications' not in sample_object:
                 bad_samples.append(sample)
         if bad_samples != []:
-            samples_to_link = [audit_link(path_to_text(bad_sample), bad_sample) for bad_sample in bad_samples]
+            samples_to_link = paths_to_links(bad_samples)
             sample_detail = samples_to_link = ', '.join(samples_to_link)
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} is '
+                f'Measurement set {path_to_link(value["@id"])} is '
                 f'a CRISPR screen assay but has no specified `modifications` on its `samples`: {sample_detail}.'
             )
             yield AuditFailure('missing modification', f'{detail} {description}', level='NOT_COMPLIANT')
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
+@audit_links('MeasurementSet', assay_term=RAW_OBJECT_FRAME)
 def audit_preferred_assay_title(value, system):
     '''
     [
@@ -213,18 +230,20 @@ def audit_preferred_assay_title(value, system):
     '''
     description = get_audit_description(audit_preferred_assay_title)
     assay_term = value.get('assay_term')
-    assay_object = system.get('request').embed(assay_term, '@@object?skip_calculated=true')
+    assay_object = get_linked_object(system, assay_term, RAW_OBJECT_FRAME)
     assay_term_name = assay_object.get('term_name')
     preferred_assay_title = value.get('preferred_assay_title', '')
     if preferred_assay_title and preferred_assay_title not in assay_object.get('preferred_assay_titles', []):
         detail = (
-            f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} has '
+            f'Measurement set {path_to_link(value["@id"])} has '
             f'`assay_term` {assay_term_name}, but `preferred_assay_title` {preferred_assay_title}.'
         )
         yield AuditFailure('inconsistent assays', f'{detail} {description}', level='WARNING')
 
 
 @audit_checker('MeasurementSet', frame='object')
+@track_audit_inputs
+@audit_links('MeasurementSet', assay_term=RAW_OBJECT_FRAME, donors=RAW_OBJECT_FRAME)
 def audit_missing_institutional_certification(value, system):
     '''
     [
@@ -240,7 +259,7 @@ def audit_missing_institutional_certification(value, system):
     donors = value.get('donors', [])
     taxa = set()
     for d in donors:
-        donor_obj = system.get('request').embed(d, '@@object?skip_calculated=true')
+        donor_obj = get_linked_object(system, d, RAW_OBJECT_FRAME)
         taxa.add(donor_obj.get('taxa', ''))
     if 'Homo sapiens' not in taxa:
         return
@@ -256,7 +275,7 @@ def audit_missing_institutional_certification(value, system):
         'OBI:0002041'  # self-transcribing active regulatory region sequencing assay
     ]
     assay_term = value.get('assay_term', '')
-    assay_object = system.get('request').embed(assay_term, '@@object?skip_calculated=true')
+    assay_object = get_linked_object(system, assay_term, RAW_OBJECT_FRAME)
     assay_term_id = assay_object.get('term_id', '')
     if assay_term_id in characterization_assays:
         return
@@ -266,17 +285,17 @@ def audit_missing_institutional_certification(value, system):
     samples = value.get('samples', [])
 
     for s in samples:
-        sample_object = system.get('request').embed(s, '@@object')
+        sample_object = get_linked_object(system, s)
         nic_labs = []
         nic_awards = []
         for nic in sample_object.get('institutional_certificates', []):
-            nic_object = system.get('request').embed(nic, '@@object?skip_calculated=true')
+            nic_object = get_linked_object(system, nic, RAW_OBJECT_FRAME)
             nic_labs.append(nic_object.get('lab', ''))
             nic_awards.append(nic_object.get('award', ''))
         if lab not in nic_labs or award not in nic_awards:
             detail = (
-                f'Measurement set {audit_link(path_to_text(value["@id"]),value["@id"])} has '
-                f'a sample {audit_link(path_to_text(s),s)} that lacks any `institutional_certificates` '
+                f'Measurement set {path_to_link(value["@id"])} has '
+                f'a sample {path_to_link(s)} that lacks any `institutional_certificates` '
                 f'issued to the lab that submitted this file set.'
             )
             yield AuditFailure('missing nih certification', f'{detail} {description}', level='NOT_COMPLIANT')
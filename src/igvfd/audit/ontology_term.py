@@ -3,13 +3,14 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .tracking import track_audit_inputs
 
 
 @audit_checker('OntologyTerm', frame='object')
+@track_audit_inputs
 def audit_ntr_term_id(value, system):
     '''
     [
@@ -25,5 +26,5 @@ def audit_ntr_term_id(value, system):
         ontologyterm_id = value['@id']
         term_id = value['term_id']
         if term_id.startswith('NTR'):
-            detail = f'Ontology term for {audit_link(path_to_text(ontologyterm_id), ontologyterm_id)} has been newly requested.'
+            detail = f'Ontology term for {path_to_link(ontologyterm_id)} has been newly requested.'
             yield AuditFailure('NTR term ID', f'{detail} {description}', level='INTERNAL_ACTION')
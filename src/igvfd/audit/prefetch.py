@@ -0,0 +1,115 @@
+import functools
+
+
+AUDIT_LINKS = {}
+
+OBJECT_FRAME = '@@object'
+
+RAW_OBJECT_FRAME = '@@object?skip_calculated=true'
+
+LINKED_FRAMES_ENVIRON_KEY = 'igvfd.audit_linked_frames'
+
+
+def audit_links(item_type, prefixes=None, **links):
+    '''
+    Declares the linked objects an audit checker of item_type reads, as
+    property=frame pairs, optionally only the paths starting with one of
+    prefixes. Place it under @audit_checker. Before the first declared
+    checker runs on an item, the objects linked by every property declared
+    for the item's types are fetched with one bulk query per frame into
+    the embed memo, where the checkers find them through
+    get_linked_object(s).
+    '''
+    for name, frame in links.items():
+        frames = AUDIT_LINKS.setdefault(item_type, {}).setdefault(name, {})
+        if prefixes is None or (frame in frames and frames[frame] is None):
+            frames[frame] = None
+        else:
+            frames.setdefault(frame, set()).update(prefixes)
+
+    def decorate(checker):
+        @functools.wraps(checker)
+        def wrapper(value, system):
+            prefetch_audit_links(value, system)
+            return checker(value, system)
+        return wrapper
+
+    return decorate
+
+
+def _merge_prefixes(current, prefixes):
+    if current is None or prefixes is None:
+        return None
+    return current | prefixes
+
+
+def get_audit_links(type_info):
+    links = {}
+    for item_type in [type_info.name] + list(type_info.base_types):
+        for name, frames in AUDIT_LINKS.get(item_type, {}).items():
+            for frame, prefixes in frames.items():
+                merged = links.setdefault(name, {})
+                merged[frame] = _merge_prefixes(merged.get(frame, set()), prefixes)
+    return links
+
+
+def _get_link_paths(links):
+    # Checkers registered with the embedded frame see linked objects as
+    # dicts, others see paths.
+    if not links:
+        return []
+    if not isinstance(links, list):
+        links = [links]
+    return [
+        link['@id'] if isinstance(link, dict) else link
+        for link in links
+        if isinstance(link, str) or (isinstance(link, dict) and '@id' in link)
+    ]
+
+
+def prefetch_audit_links(value, system):
+    request = system['request']
+    prefetched = request.environ.setdefault('igvfd.audit_prefetched', set())
+    path = system.get('path') or value['@id']
+    if path in prefetched:
+        return
+    prefetched.add(path)
+    paths_by_frame = {}
+    for name, frames in get_audit_links(system['context'].type_info).items():
+        paths = _get_link_paths(value.get(name))
+        for frame, prefixes in frames.items():
+            paths_by_frame.setdefault(frame, []).extend(
+                path for path in paths
+                if prefixes is None or path.startswith(tuple(prefixes))
+            )
+    # The prefetched objects are not reads of the checker being run, which
+    # records the frames it reads in through get_linked_object(s).
+    linked_frames = request.environ.pop(LINKED_FRAMES_ENVIRON_KEY, None)
+    try:
+        for frame, paths in paths_by_frame.items():
+            if paths:
+                request.embed_many(paths, frame)
+    finally:
+        if linked_frames is not None:
+            request.environ[LINKED_FRAMES_ENVIRON_KEY] = linked_frames
+
+
+def get_linked_object(system, path, frame=OBJECT_FRAME):
+    '''
+    Shared, read-only embed of a linked object for audit checkers.
+    '''
+    request = system['request']
+    record_linked_frame(request, frame)
+    return request.memoized_embed(path, frame)
+
+
+def get_linked_objects(system, paths, frame=OBJECT_FRAME):
+    request = system['request']
+    record_linked_frame(request, frame)
+    return request.embed_many(paths, frame)
+
+
+def record_linked_frame(request, frame):
+    frames = request.environ.get(LINKED_FRAMES_ENVIRON_KEY)
+    if frames is not None:
+        frames.add(frame)
@@ -3,13 +3,21 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
+    paths_to_links,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('Sample', frame='object?skip_calculated=true')
+@track_audit_inputs
+@audit_links('Sample', sorted_from=RAW_OBJECT_FRAME)
 def audit_sample_sorted_from_parent_child_check(value, system):
     '''
     [
@@ -26,7 +34,7 @@ def audit_sample_sorted_from_parent_child_check(value, system):
         prop_errors = ''
         value_id = system.get('path')
         parent_id = value.get('sorted_from')
-        parent = system.get('request').embed(parent_id + '@@object?skip_calculated=true')
+        parent = get_linked_object(system, parent_id, RAW_OBJECT_FRAME)
         skip_keys = ['accession', 'alternate_accessions', 'aliases', 'audit', 'creation_timestamp', 'date_obtained',
                      'schema_version', 'starting_amount', 'starting_amount_units', 'submitted_by', 'description',
                      'sorted_from', 'sorted_from_detail', 'revoke_detail', 'notes', 'submitter_comment',
@@ -38,15 +46,17 @@ def audit_sample_sorted_from_parent_child_check(value, system):
                 error_keys.append(key)
         prop_errors = ', '.join([f'`{key}`' for key in error_keys])
         detail = (
-            f'Sample {audit_link(path_to_text(value_id), value_id)} '
+            f'Sample {path_to_link(value_id)} '
             f'has metadata properties ({prop_errors}) inconsistent with '
-            f'its associated parent sample {audit_link(path_to_text(parent_id), parent_id)}.'
+            f'its associated parent sample {path_to_link(parent_id)}.'
         )
         if prop_errors != '':
             yield AuditFailure('inconsistent parent sample', f'{detail} {description}', level='ERROR')
 
 
 @audit_checker('Sample', frame='object')
+@track_audit_inputs
+@audit_links('Sample', donors=RAW_OBJECT_FRAME)
 def audit_sample_virtual_donor_check(value, system):
     '''
     [
@@ -63,20 +73,27 @@ def audit_sample_virtual_donor_check(value, system):
         donor_ids = value.get('donors', [])
         donors_error = []
         for d in donor_ids:
-            donor_object = system.get('request').embed(d + '@@object')
-            donor_id = donor_object.get('@id')
+            donor_object = get_linked_object(system, d, RAW_OBJECT_FRAME)
             donor_virtual = donor_object.get('virtual', False)
             if donor_virtual == True:
-                donors_error.append(donor_id)
-        donors_to_link = [audit_link(path_to_text(d_id), d_id) for d_id in donors_error]
+                donors_error.append(d)
+        donors_to_link = paths_to_links(donors_error)
         donors_to_link = ', '.join(donors_to_link)
         if len(donors_error) > 0:
-            detail = (f'Sample {audit_link(path_to_text(sample_id), sample_id)} is linked to virtual `donors`: '
+            detail = (f'Sample {path_to_link(sample_id)} is linked to virtual `donors`: '
                       f'{donors_to_link}.')
             yield AuditFailure('inconsistent donor', f'{detail} {description}', level='ERROR')
 
 
 @audit_checker('Sample', frame='object')
+@track_audit_inputs
+@audit_links(
+    'Sample',
+    part_of=RAW_OBJECT_FRAME,
+    originated_from=RAW_OBJECT_FRAME,
+    sorted_from=RAW_OBJECT_FRAME,
+    pooled_from=RAW_OBJECT_FRAME,
+)
 def audit_non_virtual_sample_linked_to_virtual_sample(value, system):
     '''
     [
@@ -113,7 +130,7 @@ def get_virtual_sample_failures(
     linked_sample_id
 ):
     description = get_audit_description(audit_non_virtual_sample_linked_to_virtual_sample)
-    linked_data = system.get('request').embed(linked_sample_id + '@@object?skip_calculated=true')
+    linked_data = get_linked_object(system, linked_sample_id, RAW_OBJECT_FRAME)
     if linked_data.get('virtual', False) != sample_is_virtual:
         if sample_is_virtual:
             audit_detail_body = 'is virtual'
@@ -122,9 +139,9 @@ def get_virtual_sample_failures(
             audit_detail_body = 'is not virtual'
             audit_detail_end = 'that is virtual'
         detail = (
-            f'Sample {audit_link(path_to_text(sample_id), sample_id)} '
+            f'Sample {path_to_link(sample_id)} '
             f'{audit_detail_body} and has a linked sample '
-            f'{audit_link(path_to_text(linked_sample_id), linked_sample_id)} {audit_detail_end}.'
+            f'{path_to_link(linked_sample_id)} {audit_detail_end}.'
         )
         return AuditFailure('inconsistent parent sample', f'{detail} {description}', level='ERROR')
     else:
@@ -132,6 +149,8 @@ def get_virtual_sample_failures(
 
 
 @audit_checker('Sample', frame='object')
+@track_audit_inputs
+@audit_links('Sample', construct_library_sets=RAW_OBJECT_FRAME)
 def audit_construct_library_sets_types(value, system):
     '''
     [
@@ -146,7 +165,7 @@ def audit_construct_library_sets_types(value, system):
     if 'construct_library_sets' in value and len(value['construct_library_sets']) > 1:
         library_types = set()
         for CLS in value['construct_library_sets']:
-            CLS_object = system.get('request').embed(CLS, '@@object?skip_calculated=true')
+            CLS_object = get_linked_object(system, CLS, RAW_OBJECT_FRAME)
             library_types.add(CLS_object['file_set_type'])
         if len(library_types) > 1:
             if len(library_types) > 2:
@@ -155,7 +174,7 @@ def audit_construct_library_sets_types(value, system):
             else:
                 library_types = ' and '.join(library_types)
             detail = (
-                f'Sample {audit_link(path_to_text(value["@id"]), value["@id"])} '
+                f'Sample {path_to_link(value["@id"])} '
                 f'has `construct_library_sets` of multiple types {library_types}.'
             )
             yield AuditFailure('inconsistent construct library sets', f'{detail} {description}', level='WARNING')
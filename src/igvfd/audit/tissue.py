@@ -3,13 +3,14 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .tracking import track_audit_inputs
 
 
 @audit_checker('Tissue', frame='object')
+@track_audit_inputs
 def audit_tissue_ccf_id(value, system):
     '''
     [
@@ -24,13 +25,14 @@ def audit_tissue_ccf_id(value, system):
     if ('ccf_id' not in value) and (any(donor.startswith('/human-donors/') for donor in value.get('donors'))):
         value_id = system.get('path')
         detail = (
-            f'Tissue {audit_link(path_to_text(value_id), value_id)} '
+            f'Tissue {path_to_link(value_id)} '
             f'is missing a `ccf_id`.'
         )
         yield AuditFailure('missing CCF ID', f'{detail} {description}', level='NOT_COMPLIANT')
 
 
 @audit_checker('Tissue', frame='object')
+@track_audit_inputs
 def audit_tissue_ccf_id_nonhuman_sample(value, system):
     '''
     [
@@ -45,7 +47,7 @@ def audit_tissue_ccf_id_nonhuman_sample(value, system):
     if ('ccf_id' in value) and (value.get('taxa', '') != 'Homo sapiens'):
         value_id = system.get('path')
         detail = (
-            f'Tissue {audit_link(path_to_text(value_id), value_id)} '
+            f'Tissue {path_to_link(value_id)} '
             f'has a `ccf_id` but is associated with a non-human donor.'
         )
         yield AuditFailure('unexpected CCF ID', f'{detail} {description}', level='ERROR')
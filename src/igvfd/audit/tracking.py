@@ -0,0 +1,215 @@
+import functools
+import hashlib
+import json
+import threading
+
+from collections import OrderedDict
+from snovault import AuditFailure
+
+from igvfd.embed import call_with_dependencies
+from igvfd.embed import query_max_sid
+from igvfd.embed import record_dependencies
+
+from .prefetch import (
+    LINKED_FRAMES_ENVIRON_KEY,
+    RAW_OBJECT_FRAME,
+    record_linked_frame,
+)
+
+
+AUDIT_RESULT_CACHE = 'igvfd.audit_result_cache'
+
+DEFAULT_AUDIT_RESULT_CACHE_CAPACITY = 100000
+
+
+class AuditResultCache:
+    '''
+    Process wide LRU of audit failures keyed by (checker, item uuid). Each
+    entry also holds what the checker read: the item properties it read
+    (or None when it read all of them) with a digest of their values, and
+    the uuids of the linked items it embedded with their max sid.
+    '''
+
+    def __init__(self, capacity=DEFAULT_AUDIT_RESULT_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+class TrackedValue(dict):
+    '''
+    Copy of the item value passed to a checker that records which
+    properties were read. Anything that walks all of the properties marks
+    the value as read in full.
+    '''
+
+    def __init__(self, value):
+        super().__init__(value)
+        self.read_keys = set()
+        self.read_all = False
+
+    def __getitem__(self, key):
+        self.read_keys.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.read_keys.add(key)
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        self.read_keys.add(key)
+        return super().get(key, default)
+
+    def _get_all(self, method, *args):
+        self.read_all = True
+        return getattr(super(), method)(*args)
+
+    def __iter__(self):
+        return self._get_all('__iter__')
+
+    def __len__(self):
+        return self._get_all('__len__')
+
+    def __eq__(self, other):
+        return self._get_all('__eq__', other)
+
+    def keys(self):
+        return self._get_all('keys')
+
+    def values(self):
+        return self._get_all('values')
+
+    def items(self):
+        return self._get_all('items')
+
+    def copy(self):
+        return self._get_all('copy')
+
+
+def _count(request, name):
+    stats = getattr(request, '_stats', None)
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + 1
+
+
+def _collect_failures(checker, value, system):
+    failures = []
+    try:
+        result = checker(value, system)
+        if isinstance(result, AuditFailure):
+            failures.append(result)
+        elif result is not None:
+            for failure in result:
+                failures.append(failure)
+    except AuditFailure as e:
+        failures.append(e)
+    return failures
+
+
+def _digest_inputs(value, read_keys):
+    if read_keys is not None:
+        value = {key: value[key] for key in read_keys if key in value}
+    inputs = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(inputs.encode('utf-8')).hexdigest()
+
+
+def _get_inputs(value, tracked):
+    read_keys = None if tracked.read_all else frozenset(tracked.read_keys)
+    return read_keys, _digest_inputs(value, read_keys)
+
+
+def _get_embed_frame(path):
+    if '@@' not in path:
+        return None
+    return '@@' + path.rpartition('@@')[2]
+
+
+def _track_embeds(request, embed):
+    # Linked objects embedded directly rather than with get_linked_object(s)
+    # are recorded in their frame as well.
+    def tracked_embed(*elements, **kw):
+        record_linked_frame(request, _get_embed_frame(''.join(map(str, elements))))
+        return embed(*elements, **kw)
+    return tracked_embed
+
+
+def track_audit_inputs(checker):
+    '''
+    Reuses the failures of the previous run of checker on the same item
+    when none of the item properties it read changed and none of the
+    linked items it embedded were edited since. Place it under
+    @audit_checker, above @audit_links, on checkers that only read value
+    and linked objects (not context or registry). Runs that read linked
+    objects in a frame with calculated properties, through
+    get_linked_object(s) or request.embed, are not cached, since those can
+    change (through rev links for example) without an edit of the linked
+    item. Only a digest of the item properties read is kept.
+    '''
+    name = '{}.{}'.format(checker.__module__, checker.__qualname__)
+
+    @functools.wraps(checker)
+    def wrapper(value, system):
+        request = system['request']
+        cache = system['registry'].get(AUDIT_RESULT_CACHE)
+        if cache is None:
+            return _collect_failures(checker, value, system)
+        key = (name, str(system['context'].uuid))
+        entry = cache.get(key)
+        if entry is not None:
+            read_keys, digest, embedded_uuids, linked_uuids, max_sid, failures = entry
+            dependencies = embedded_uuids | linked_uuids
+            if (
+                _digest_inputs(value, read_keys) == digest
+                and (not dependencies or query_max_sid(request, dependencies) == max_sid)
+            ):
+                _count(request, 'audit_cache_hits')
+                # Recording the dependencies keeps the invalidation queue
+                # reindexing this item when anything the checker read changes.
+                record_dependencies(request, embedded_uuids, linked_uuids)
+                return failures
+        _count(request, 'audit_cache_misses')
+        tracked = TrackedValue(value)
+        request.environ[LINKED_FRAMES_ENVIRON_KEY] = set()
+        embed = request.embed
+        request.embed = _track_embeds(request, embed)
+        try:
+            failures, embedded_uuids, linked_uuids = call_with_dependencies(
+                request,
+                _collect_failures,
+                checker,
+                tracked,
+                system,
+            )
+        finally:
+            request.embed = embed
+            frames = request.environ.pop(LINKED_FRAMES_ENVIRON_KEY)
+        if frames - {RAW_OBJECT_FRAME}:
+            return failures
+        dependencies = embedded_uuids | linked_uuids
+        max_sid = query_max_sid(request, dependencies) if dependencies else None
+        if not dependencies or max_sid is not None:
+            cache.set(
+                key,
+                _get_inputs(value, tracked) + (embedded_uuids, linked_uuids, max_sid, failures)
+            )
+        return failures
+
+    return wrapper
@@ -3,13 +3,14 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .tracking import track_audit_inputs
 
 
 @audit_checker('Treatment', frame='object')
+@track_audit_inputs
 def audit_treatment_term_id_check(value, system):
     '''
     [
@@ -25,5 +26,5 @@ def audit_treatment_term_id_check(value, system):
         term_id = value['treatment_term_id']
         if term_id.startswith('NTR'):
             treatment_id = value['@id']
-            detail = f'Treatment term for {audit_link(path_to_text(treatment_id), treatment_id)} has been newly requested.'
+            detail = f'Treatment term for {path_to_link(treatment_id)} has been newly requested.'
             yield AuditFailure('NTR term ID', f'{detail} {description}', level='INTERNAL_ACTION')
@@ -7,9 +7,11 @@ from .formatter import (
     path_to_text,
     get_audit_description
 )
+from .tracking import track_audit_inputs
 
 
 @audit_checker('Variant', frame='object')
+@track_audit_inputs
 def audit_variant_ref_alt_check(value, system):
     '''
     [
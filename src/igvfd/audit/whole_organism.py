@@ -3,13 +3,20 @@ from snovault.auditor import (
     AuditFailure,
 )
 from .formatter import (
-    audit_link,
-    path_to_text,
-    get_audit_description
+    get_audit_description,
+    path_to_link,
 )
+from .prefetch import (
+    audit_links,
+    get_linked_object,
+    RAW_OBJECT_FRAME,
+)
+from .tracking import track_audit_inputs
 
 
 @audit_checker('WholeOrganism', frame='object')
+@track_audit_inputs
+@audit_links('WholeOrganism', donors=RAW_OBJECT_FRAME)
 def audit_whole_organism_human_taxa(value, system):
     '''
     [
@@ -24,7 +31,7 @@ def audit_whole_organism_human_taxa(value, system):
     if 'taxa' in value:
         if value['taxa'] == 'Homo sapiens':
             detail = (
-                f'Whole organism {audit_link(path_to_text(value["@id"]), value["@id"])} '
+                f'Whole organism {path_to_link(value["@id"])} '
                 f'specifies that it is of `taxa` Homo sapiens.'
             )
             yield AuditFailure('unexpected donor', f'{detail} {description}', level='ERROR')
@@ -32,11 +39,11 @@ def audit_whole_organism_human_taxa(value, system):
         donor_ids = value.get('donors')
         taxa_set = set()
         for d in donor_ids:
-            donor_object = system.get('request').embed(d + '@@object?skip_calculated=true')
+            donor_object = get_linked_object(system, d, RAW_OBJECT_FRAME)
             taxa_set.add(donor_object.get('taxa', ''))
         if 'Homo sapiens' in taxa_set:
             detail = (
-                f'Whole organism {audit_link(path_to_text(value["@id"]), value["@id"])} '
+                f'Whole organism {path_to_link(value["@id"])} '
                 f'specifies that it has `donors` of `taxa` Homo sapiens.'
             )
             yield AuditFailure('unexpected donor', f'{detail} {description}', level='ERROR')
@@ -0,0 +1,115 @@
+"""Compare audit detail link formatting throughput on the test inserts.
+
+    python -m igvfd.benchmarks.audit_links --runs 100
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from igvfd.audit.formatter import path_to_link
+from igvfd.audit.formatter import paths_to_links
+
+
+INSERTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'inserts')
+
+
+def legacy_audit_link(linkText, uri):
+    """audit_link as it was before path_to_link."""
+    return '[{}]({})'.format(linkText, uri)
+
+
+def legacy_path_to_text(path):
+    """path_to_text as it was before it was precompiled and memoized."""
+    accession = re.match(r'\/.*\/(.*)\/', path)
+    return accession.group(1) if accession else None
+
+
+def get_item_path(item_type, item):
+    collection = item_type.replace('_', '-') + 's'
+    name = item.get('accession') or item.get('uuid')
+    return f'/{collection}/{name}/' if name else None
+
+
+def load_items(inserts_dir=INSERTS_DIR):
+    """Returns (path, linked paths) for every insert, with links given by
+    uuid, alias or accession resolved to item paths as audits see them."""
+    items = []
+    paths_by_key = {}
+    for filename in sorted(os.listdir(inserts_dir)):
+        if not filename.endswith('.json'):
+            continue
+        item_type = filename[:-len('.json')]
+        with open(os.path.join(inserts_dir, filename)) as f:
+            for item in json.load(f):
+                path = get_item_path(item_type, item)
+                if path is None:
+                    continue
+                for key in [item.get('uuid'), item.get('accession')] + item.get('aliases', []):
+                    if key:
+                        paths_by_key[key] = path
+                items.append((path, item))
+
+    def linked_paths(item):
+        for name, value in item.items():
+            if name in ('uuid', 'accession', 'aliases'):
+                continue
+            for link in value if isinstance(value, list) else [value]:
+                if isinstance(link, str) and link in paths_by_key:
+                    yield paths_by_key[link]
+
+    return [(path, list(linked_paths(item))) for path, item in items]
+
+
+def legacy_details(items):
+    for path, links in items:
+        yield (
+            f'{legacy_audit_link(legacy_path_to_text(path), path)} links to '
+            f'{", ".join([legacy_audit_link(legacy_path_to_text(link), link) for link in links])}.'
+        )
+
+
+def fast_path_details(items):
+    for path, links in items:
+        yield f'{path_to_link(path)} links to {", ".join(paths_to_links(links))}.'
+
+
+def time_details(generate_details, items, runs):
+    start = time.perf_counter()
+    size = 0
+    for _ in range(runs):
+        for detail in generate_details(items):
+            size += len(detail)
+    return time.perf_counter() - start, size
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark audit detail link formatting',
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=100,
+        help='Number of passes over the test inserts, as in repeated reindexing',
+    )
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    items = load_items()
+    links = sum(len(item_links) + 1 for _, item_links in items) * args.runs
+    legacy_seconds, legacy_size = time_details(legacy_details, items, args.runs)
+    fast_path_seconds, fast_path_size = time_details(fast_path_details, items, args.runs)
+    assert legacy_size == fast_path_size
+    print(f'{len(items)} items, {links:,} links')
+    print(f're.match per link: {links / legacy_seconds:,.0f} links/sec')
+    print(f'memoized:          {links / fast_path_seconds:,.0f} links/sec')
+    print(f'speedup: {legacy_seconds / fast_path_seconds:.2f}x')
+    print(path_to_link.cache_info())
+
+
+if __name__ == '__main__':
+    main()
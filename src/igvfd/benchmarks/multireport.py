@@ -0,0 +1,108 @@
+"""Compare multireport.tsv href expansion throughput on a synthetic FileSet report.
+
+    python -m igvfd.benchmarks.multireport --rows 1000000
+"""
+import argparse
+import time
+
+from igvfd.report import HrefRewritePlan
+from igvfd.report import format_row
+from igvfd.report import format_row_full_url
+
+
+HOST_URL = 'https://api.data.igvf.org'
+
+COLUMNS = [
+    '@id',
+    'accession',
+    'file_set_type',
+    'status',
+    'files.href',
+    'lab.title',
+]
+
+
+def legacy_format_row_full_url(columns, href_index, host_url, id):
+    """The per-character href detection used by multireport.tsv before HrefRewritePlan."""
+    row = []
+    for index, column in enumerate(columns):
+        ls = column.strip('\t\n\r').split()
+        if index in href_index:
+            if len(ls) == 1:
+                if ',' in ls[0]:
+                    files = ls[0].split(',')
+                    files_with_host_url = []
+                    for file in files:
+                        file = host_url + file.strip()
+                        files_with_host_url.append(file)
+                    ls[0] = ','.join(files_with_host_url)
+                elif ls[0].startswith('@@download'):
+                    ls[0] = host_url + id + ls[0]
+                else:
+                    ls[0] = host_url + ls[0]
+            elif len(ls) > 1:
+                for index, item in enumerate(ls):
+                    if ''.join([i for i in item if i.isalpha()]) == 'href':
+                        embedded_index = index + 1
+                        break
+                if embedded_index:
+                    ls[embedded_index] = ls[embedded_index][0] + host_url + id + ls[embedded_index][1:]
+        row.append(' '.join(ls).encode('utf-8'))
+    return b'\t'.join(row) + b'\r\n'
+
+
+def make_values(index, files_per_row=3):
+    item_id = f'/measurement-sets/IGVFDS{index:07d}/'
+    files = ','.join(
+        f'/sequence-files/IGVFFI{index:07d}{f}/@@download/IGVFFI{index:07d}{f}.fastq.gz'
+        for f in range(files_per_row)
+    )
+    return item_id, [item_id, f'IGVFDS{index:07d}', 'experimental data', 'released', files, 'Lab, Institute']
+
+
+def run_legacy(rows):
+    href_index = [index for index, key in enumerate(COLUMNS) if key in ('href', 'files.href')]
+    for item_id, values in rows:
+        yield legacy_format_row_full_url(values, href_index, HOST_URL, item_id)
+
+
+def run_plan(rows):
+    href_plan = HrefRewritePlan(COLUMNS, HOST_URL)
+    for item_id, values in rows:
+        yield format_row_full_url(list(values), href_plan, item_id)
+
+
+def time_rows(run, rows):
+    start = time.perf_counter()
+    size = 0
+    for row in run(rows):
+        size += len(row)
+    return time.perf_counter() - start, size
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark multireport.tsv href expansion',
+    )
+    parser.add_argument(
+        '--rows',
+        type=int,
+        default=1000000,
+        help='Number of synthetic rows',
+    )
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    rows = [make_values(index) for index in range(args.rows)]
+    legacy_seconds, legacy_size = time_rows(run_legacy, rows)
+    plan_seconds, plan_size = time_rows(run_plan, rows)
+    assert legacy_size == plan_size
+    print(f'per-row href detection: {args.rows / legacy_seconds:,.0f} rows/sec')
+    print(f'href rewrite plan:      {args.rows / plan_seconds:,.0f} rows/sec')
+    print(f'speedup: {legacy_seconds / plan_seconds:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Compare report.tsv row formatting throughput on synthetic embedded documents.
+
+    python -m igvfd.benchmarks.report --rows 100000
+"""
+import argparse
+import time
+
+from igvfd.report import ColumnProjector
+from igvfd.report import format_row
+from igvfd.report import lookup_column_value
+
+
+COLUMNS = [
+    '@id',
+    'accession',
+    'status',
+    'lab.title',
+    'award.contact_pi.title',
+    'files.@id',
+    'files.file_format',
+    'files.content_type',
+    'samples.@id',
+    'samples.sample_terms.term_name',
+    'samples.sample_terms.@id',
+    'samples.sample_terms.classification',
+    'samples.targeted_sample_term.term_name',
+    'donors.taxa',
+    'assay_term.term_name',
+]
+
+
+def make_item(index, files_per_item=20, samples_per_item=4):
+    return {
+        '@id': f'/measurement-sets/IGVFDS{index:07d}/',
+        'accession': f'IGVFDS{index:07d}',
+        'status': 'released',
+        'lab': {'@id': '/labs/lab/', 'title': 'Lab, Institute'},
+        'award': {'@id': '/awards/1/', 'contact_pi': {'@id': '/users/1/', 'title': 'Contact PI'}},
+        'files': [
+            {
+                '@id': f'/sequence-files/IGVFFI{index:07d}{f:03d}/',
+                'file_format': 'fastq',
+                'content_type': 'reads',
+            }
+            for f in range(files_per_item)
+        ],
+        'samples': [
+            {
+                '@id': f'/in-vitro-systems/IGVFSM{index:07d}{s:02d}/',
+                'sample_terms': [
+                    {
+                        '@id': f'/sample-terms/CL_{s:07d}/',
+                        'term_name': f'term {s % 2}',
+                        'classification': 'cell line',
+                    }
+                ],
+                'targeted_sample_term': {'@id': '/sample-terms/CL_1/', 'term_name': 'neuron'},
+            }
+            for s in range(samples_per_item)
+        ],
+        'donors': [{'@id': '/human-donors/IGVFDO0000001/', 'taxa': 'Homo sapiens'}],
+        'assay_term': {'@id': '/assay-terms/OBI_1/', 'term_name': 'ATAC-seq'},
+    }
+
+
+def per_column_rows(items, columns):
+    for item in items:
+        yield format_row([lookup_column_value(item, path) for path in columns])
+
+
+def projected_rows(items, columns):
+    projector = ColumnProjector(columns)
+    for item in items:
+        yield format_row(projector.project(item))
+
+
+def time_rows(generate_rows, items, columns):
+    start = time.perf_counter()
+    size = 0
+    for row in generate_rows(items, columns):
+        size += len(row)
+    return time.perf_counter() - start, size
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark report.tsv row projection',
+    )
+    parser.add_argument(
+        '--rows',
+        type=int,
+        default=100000,
+        help='Number of synthetic documents',
+    )
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    items = [make_item(index) for index in range(args.rows)]
+    per_column_seconds, per_column_size = time_rows(per_column_rows, items, COLUMNS)
+    projected_seconds, projected_size = time_rows(projected_rows, items, COLUMNS)
+    assert per_column_size == projected_size
+    print(f'per column lookup: {args.rows / per_column_seconds:,.0f} rows/sec')
+    print(f'column projector:  {args.rows / projected_seconds:,.0f} rows/sec')
+    print(f'speedup: {per_column_seconds / projected_seconds:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
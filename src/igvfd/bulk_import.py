@@ -0,0 +1,72 @@
+import json
+
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.view import view_config
+from snovault import TYPES
+from snovault.crud_views import create_item
+from snovault.schema_utils import validate
+from snovault.validation import ValidationFailure
+
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def includeme(config):
+    config.add_route('bulk_import', '/_bulk_import')
+    config.scan(__name__, categories=None)
+
+
+def iter_ndjson(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            raise HTTPBadRequest(explanation=f'Invalid JSON on line {line_number}: {e}')
+
+
+def _get_type_info(request):
+    item_type = request.params.get('type')
+    if not item_type:
+        raise HTTPBadRequest(explanation='Specify an item type with ?type=')
+    try:
+        return request.registry[TYPES][item_type]
+    except KeyError:
+        raise HTTPBadRequest(explanation=f'Unknown item type {item_type}')
+
+
+@view_config(route_name='bulk_import', request_method='POST', permission='bulk_import')
+def bulk_import(context, request):
+    '''
+    Creates every item in a newline delimited JSON body of items of one
+    ?type= in the transaction of this request. Items are validated with
+    the schema of the type as in a collection POST, and nothing is created
+    unless all of them are valid. Callers pick the batch size by how many
+    items they send, and each batch gets one transaction queue message.
+    '''
+    type_info = _get_type_info(request)
+    schema = type_info.schema
+    created = []
+    for line_number, properties in iter_ndjson(request.body_file):
+        validated, errors = validate(schema, properties)
+        for error in errors:
+            request.errors.add('body', [f'line {line_number}'] + list(error.path), error.message)
+        if errors or request.errors:
+            # Keep validating to report every error but stop writing.
+            continue
+        item = create_item(type_info, request, validated)
+        created.append(str(item.uuid))
+    if request.errors:
+        raise ValidationFailure(request.errors)
+    request.response.status = 201
+    return {
+        'status': 'success',
+        '@type': ['result'],
+        'item_type': type_info.item_type,
+        'count': len(created),
+        '@graph': created,
+    }
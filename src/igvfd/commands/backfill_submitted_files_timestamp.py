@@ -0,0 +1,67 @@
+import argparse
+import logging
+
+from pyramid.paster import get_app
+
+from webtest import TestApp
+
+
+logging.basicConfig()
+logger = logging.getLogger('igvfd')
+logger.setLevel(logging.INFO)
+
+
+def backfill_submitted_files_timestamp(app):
+    environ = {
+        'HTTP_ACCEPT': 'application/json',
+        'REMOTE_USER': 'INDEXER',
+    }
+    testapp = TestApp(
+        app,
+        environ
+    )
+    res = testapp.get(
+        '/search/?type=FileSet&field=@id&limit=all'
+    )
+    file_sets = [item['@id'] for item in res.json['@graph']]
+    for i, file_set in enumerate(file_sets, start=1):
+        testapp.post_json(
+            f'{file_set}@@refresh_submitted_files_timestamp',
+            {},
+        )
+        if i % 1000 == 0:
+            logger.info('Backfilled %d of %d file sets', i, len(file_sets))
+    logger.info('Backfilled %d file sets', len(file_sets))
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Backfill the submitted_files_timestamp of existing file sets',
+    )
+    parser.add_argument(
+        '--app-name',
+        default='app',
+        help='Pyramid app name in config file',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='path to configfile'
+    )
+    return parser
+
+
+def get_args():
+    return get_parser().parse_args()
+
+
+def main():
+    args = get_args()
+    app = get_app(
+        args.config_uri,
+        args.app_name,
+    )
+    backfill_submitted_files_timestamp(app)
+
+
+if __name__ == '__main__':
+    main()
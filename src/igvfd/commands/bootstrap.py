@@ -30,6 +30,34 @@ def get_parser():
         action='store_true',
         help='Load test set'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of item types to load concurrently'
+    )
+    parser.add_argument(
+        '--bulk-batch-size',
+        type=int,
+        default=None,
+        help='Create items through /_bulk_import this many at a time'
+    )
+    parser.add_argument(
+        '--attachment-workers',
+        type=int,
+        default=1,
+        help='Number of processes to read and check attachments with'
+    )
+    parser.add_argument(
+        '--attachment-cache-dir',
+        default=None,
+        help='Directory to cache processed attachments in by content hash'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip the item types and rows a previous interrupted load finished'
+    )
     return parser
 
 
@@ -43,7 +71,15 @@ def main():
         args.config_uri,
         args.app_name,
     )
-    load_test_data(app)
+    load_test_data(
+        app,
+        workers=args.workers,
+        bulk_batch_size=args.bulk_batch_size,
+        attachment_workers=args.attachment_workers,
+        attachment_cache_dir=args.attachment_cache_dir,
+        checkpoint=True,
+        resume=args.resume,
+    )
 
 
 if __name__ == '__main__':
@@ -31,6 +31,34 @@ def get_parser():
         action='store_true',
         help='Load test set'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of item types to load concurrently'
+    )
+    parser.add_argument(
+        '--bulk-batch-size',
+        type=int,
+        default=None,
+        help='Create items through /_bulk_import this many at a time'
+    )
+    parser.add_argument(
+        '--attachment-workers',
+        type=int,
+        default=1,
+        help='Number of processes to read and check attachments with'
+    )
+    parser.add_argument(
+        '--attachment-cache-dir',
+        default=None,
+        help='Directory to cache processed attachments in by content hash'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip the item types and rows a previous interrupted load finished'
+    )
     return parser
 
 
@@ -38,7 +66,8 @@ def get_args():
     return get_parser().parse_args()
 
 
-def load_alpha(app):
+def load_alpha(app, workers=1, bulk_batch_size=None, attachment_workers=1, attachment_cache_dir=None,
+               checkpoint=False, resume=False):
     from webtest import TestApp
     environ = {
         'HTTP_ACCEPT': 'application/json',
@@ -47,7 +76,17 @@ def load_alpha(app):
     testapp = TestApp(app, environ)
     inserts = resource_filename('igvfd', 'commands/assets/alpha/inserts/')
     docsdir = [resource_filename('igvfd', 'commands/assets/alpha/documents/')]
-    load_all(testapp, inserts, docsdir)
+    load_all(
+        testapp,
+        inserts,
+        docsdir,
+        workers=workers,
+        bulk_batch_size=bulk_batch_size,
+        attachment_workers=attachment_workers,
+        attachment_cache_dir=attachment_cache_dir,
+        checkpoint=checkpoint,
+        resume=resume,
+    )
 
 
 def main():
@@ -56,7 +95,15 @@ def main():
         args.config_uri,
         args.app_name,
     )
-    load_alpha(app)
+    load_alpha(
+        app,
+        workers=args.workers,
+        bulk_batch_size=args.bulk_batch_size,
+        attachment_workers=args.attachment_workers,
+        attachment_cache_dir=args.attachment_cache_dir,
+        checkpoint=True,
+        resume=args.resume,
+    )
 
 
 if __name__ == '__main__':
@@ -1,5 +1,10 @@
 import json
 
+from igvfd.audit.docstrings import (
+    get_audit_functions,
+    parse_audit_docstring,
+    register_audit_docstrings,
+)
 import igvfd.audit.biosample
 import igvfd.audit.construct_library_set
 import igvfd.audit.auxiliary_set
@@ -19,11 +24,6 @@ import igvfd.audit.variant
 import igvfd.audit.whole_organism
 
 
-NON_AUDIT_FUNCTION_NAMES = [
-    'audit_checker',
-    'audit_link',
-]
-
 AUDIT_MODULES_TO_PROCESS = [
     igvfd.audit.biosample,
     igvfd.audit.construct_library_set,
@@ -46,34 +46,16 @@ AUDIT_MODULES_TO_PROCESS = [
 
 
 def get_audit_function_names_from_module(module):
-    module_attributes = dir(module)
-    audit_function_names = [attribute for attribute in module_attributes if attribute.startswith(
-        'audit_') and attribute not in NON_AUDIT_FUNCTION_NAMES]
-    return audit_function_names
+    return [name for name, _ in get_audit_functions(module)]
 
 
 def get_docstring_dict_from_function_name(function_name):
-    docstring = eval(function_name + '.__doc__')
-    if docstring is not None:
-        try:
-            docstring = json.loads(docstring)
-            return {function_name: docstring}
-        except:
-            raise ValueError(f'Docstring: {docstring} in function: {function_name} is not valid JSON format.')
-    else:
-        return {function_name: {}}
+    docstring = parse_audit_docstring(eval(function_name), function_name)
+    return {function_name: {} if docstring is None else docstring}
 
 
 def main():
-    audit_function_full_names = []
-    for audit_module in AUDIT_MODULES_TO_PROCESS:
-        module_name = audit_module.__name__
-        function_names_in_module = get_audit_function_names_from_module(audit_module)
-        for function_name in function_names_in_module:
-            audit_function_full_names.append(module_name + '.' + function_name)
-    audit_docstring_dict = {}
-    for function_name in audit_function_full_names:
-        audit_docstring_dict.update(get_docstring_dict_from_function_name(function_name))
+    audit_docstring_dict = register_audit_docstrings(AUDIT_MODULES_TO_PROCESS)
     with open('src/igvfd/static/doc/auditdoc.json', 'w') as audit_json:
         json.dump(audit_docstring_dict, audit_json)
 
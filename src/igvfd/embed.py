@@ -0,0 +1,284 @@
+from collections import OrderedDict
+from pyramid.events import (
+    NewRequest,
+    subscriber,
+)
+from snovault import (
+    AfterModified,
+    BeforeModified,
+    CONNECTION,
+    Created,
+    DBSESSION,
+    TYPES,
+)
+from snovault.storage import (
+    CurrentPropertySheet,
+    Key,
+    Resource,
+)
+from sqlalchemy import func
+from sqlalchemy import orm
+from uuid import UUID
+
+
+EMBED_MEMO_ENVIRON_KEY = 'igvfd.embed_memo'
+
+DEFAULT_EMBED_MEMO_CAPACITY = 10000
+
+MEMOIZED_FRAMES = [
+    '@@object',
+    '@@object?skip_calculated=true',
+]
+
+
+def includeme(config):
+    config.scan(__name__, categories=None)
+    config.add_request_method(memoized_embed, 'memoized_embed')
+    config.add_request_method(embed_many, 'embed_many')
+
+
+class EmbedMemo:
+    '''
+    LRU of @@object embeds shared by a request and all of its subrequests.
+    Values are (result, embedded_uuids, linked_uuids) so that a hit records
+    the same dependencies on the calling request as a real embed would.
+    '''
+
+    def __init__(self, stats, capacity=DEFAULT_EMBED_MEMO_CAPACITY):
+        self.stats = stats
+        self.capacity = capacity
+        self.cache = OrderedDict()
+
+    def _count(self, name):
+        self.stats[name] = self.stats.get(name, 0) + 1
+
+    def get(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            self._count('embed_memo_misses')
+            return None
+        self._count('embed_memo_hits')
+        self.cache.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def get_embed_memo(request):
+    return request.environ.get(EMBED_MEMO_ENVIRON_KEY)
+
+
+@subscriber(NewRequest)
+def add_embed_memo(event):
+    request = event.request
+    # Subrequests copy the environ of their parent and so share its memo.
+    if EMBED_MEMO_ENVIRON_KEY in request.environ:
+        return
+    capacity = int(
+        request.registry.settings.get('embed_memo.capacity', DEFAULT_EMBED_MEMO_CAPACITY)
+    )
+    request.environ[EMBED_MEMO_ENVIRON_KEY] = EmbedMemo(
+        getattr(request, '_stats', {}),
+        capacity=capacity
+    )
+
+
+@subscriber(Created)
+@subscriber(BeforeModified)
+@subscriber(AfterModified)
+def clear_embed_memo(event):
+    memo = get_embed_memo(event.request)
+    if memo is not None:
+        memo.clear()
+
+
+def call_with_dependencies(request, func, *args):
+    '''
+    Returns (func(*args), embedded_uuids, linked_uuids) where the uuid sets
+    are the dependencies recorded on request while func ran. They are also
+    kept on request as usual.
+    '''
+    embedded_uuids = request._embedded_uuids
+    linked_uuids = request._linked_uuids
+    request._embedded_uuids = set()
+    request._linked_uuids = set()
+    try:
+        result = func(*args)
+        value = (result, request._embedded_uuids, request._linked_uuids)
+    finally:
+        embedded_uuids.update(request._embedded_uuids)
+        linked_uuids.update(request._linked_uuids)
+        request._embedded_uuids = embedded_uuids
+        request._linked_uuids = linked_uuids
+    return value
+
+
+def memoized_embed(request, path, frame='@@object', _embed_path=None):
+    '''
+    Like request.embed(path, frame) but @@object and
+    @@object?skip_calculated=true embeds are only rendered once per request.
+    Results are shared and must be treated as read-only.
+    '''
+    embed_path = _embed_path or path
+    memo = get_embed_memo(request)
+    if memo is None or frame not in MEMOIZED_FRAMES:
+        return request.embed(embed_path, frame)
+    key = (path, frame)
+    value = memo.get(key)
+    if value is None:
+        value = call_with_dependencies(request, request.embed, embed_path, frame)
+        memo.set(key, value)
+        return value[0]
+    result, embedded_uuids, linked_uuids = value
+    record_dependencies(request, embedded_uuids, linked_uuids)
+    return result
+
+
+def record_dependencies(request, embedded_uuids, linked_uuids):
+    request._embedded_uuids.update(embedded_uuids)
+    request._linked_uuids.update(linked_uuids)
+
+
+def query_max_sid(request, uuids):
+    '''
+    Returns the highest sid among the current property sheets of the
+    items with one query, or None if any of them has none (yet).
+    '''
+    uuids = {str(uuid) for uuid in uuids}
+    if not uuids:
+        return None
+    session = request.registry[DBSESSION]
+    sids = session.query(
+        CurrentPropertySheet.rid,
+        func.max(CurrentPropertySheet.sid),
+    ).filter(
+        CurrentPropertySheet.rid.in_(list(uuids))
+    ).group_by(
+        CurrentPropertySheet.rid
+    ).all()
+    if len(sids) < len(uuids) or any(sid is None for _, sid in sids):
+        return None
+    return max(sid for _, sid in sids)
+
+
+def _split_item_path(path):
+    names = [name for name in path.split('/') if name]
+    if len(names) == 1:
+        return None, names[0]
+    if len(names) == 2:
+        return names[0], names[1]
+    return None, None
+
+
+def _as_uuid(name):
+    try:
+        return str(UUID(name))
+    except ValueError:
+        return None
+
+
+def resolve_item_uuids(request, paths):
+    '''
+    Maps item paths (/<collection>/<name>/ or /<uuid>/) to uuids with one
+    keys query per distinct collection unique key. Paths that cannot be
+    resolved (aliases, unknown collections, missing items) are left out.
+    '''
+    uuids = {}
+    paths_by_key_value = {}
+    for path in paths:
+        collection_name, name = _split_item_path(path)
+        if name is None:
+            continue
+        uuid = _as_uuid(name)
+        if uuid is not None:
+            uuids[path] = uuid
+            continue
+        if collection_name is None:
+            continue
+        unique_key = getattr(request.root.get(collection_name), 'unique_key', None)
+        if unique_key is None:
+            continue
+        paths_by_key_value.setdefault(unique_key, {}).setdefault(name, []).append(path)
+    session = request.registry[DBSESSION]
+    for unique_key, paths_by_value in paths_by_key_value.items():
+        keys = session.query(Key).filter(
+            Key.name == unique_key,
+            Key.value.in_(list(paths_by_value)),
+        )
+        for key in keys:
+            for path in paths_by_value[key.value]:
+                uuids[path] = str(key.rid)
+    return uuids
+
+
+def _load_items(request, uuids):
+    connection = request.registry[CONNECTION]
+    types = request.registry[TYPES]
+    uuids = [
+        uuid for uuid in set(uuids)
+        if connection.item_cache.get(uuid) is None
+    ]
+    if not uuids:
+        return []
+    session = request.registry[DBSESSION]
+    models = session.query(Resource).options(
+        orm.joinedload(Resource.data)
+    ).filter(
+        Resource.rid.in_(uuids)
+    )
+    items = []
+    for model in models:
+        type_info = types.by_item_type.get(model.item_type)
+        if type_info is None:
+            continue
+        item = type_info.factory(request.registry, model)
+        model.used_for(item)
+        connection.item_cache[str(model.rid)] = item
+        items.append(item)
+    return items
+
+
+def prefetch_items(request, uuids):
+    '''
+    Loads the items and the targets of their links into the connection
+    item cache with one IN query each, so that rendering their @@object
+    frames does not go back to the database item by item.
+    '''
+    items = _load_items(request, uuids)
+    linked_uuids = set()
+    for item in items:
+        for link_uuids in item.links(item.properties).values():
+            linked_uuids.update(str(uuid) for uuid in link_uuids)
+    _load_items(request, linked_uuids)
+
+
+def embed_many(request, paths, frame='@@object'):
+    '''
+    Like [request.memoized_embed(path, frame) for path in paths] but the
+    items not already in the embed memo are fetched from the database in
+    bulk first. Results are returned in the order of paths.
+    '''
+    paths = list(paths)
+    memo = get_embed_memo(request)
+    unseen = [
+        path for path in dict.fromkeys(paths)
+        if memo is None or (path, frame) not in memo.cache
+    ]
+    uuids = resolve_item_uuids(request, unseen)
+    prefetch_items(request, uuids.values())
+    return [
+        memoized_embed(
+            request,
+            path,
+            frame,
+            _embed_path='/{}/'.format(uuids[path]) if path in uuids else None,
+        )
+        for path in paths
+    ]
@@ -0,0 +1,127 @@
+import codecs
+import json
+
+
+JSON_READ_SIZE = 1 << 16
+
+JSON_WHITESPACE = ' \t\r\n'
+
+JSON_NUMBER_CHARS = '0123456789+-.eE'
+
+
+class JSONStreamReader:
+    '''
+    Buffer over a text or utf-8 bytes stream for decoding JSON values one
+    at a time, reading read_size characters at a time.
+    '''
+
+    def __init__(self, stream, read_size=JSON_READ_SIZE):
+        self.stream = stream
+        self.read_size = read_size
+        self.text = ''
+        self.position = 0
+        self.eof = False
+        self.utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def fill(self):
+        # Read at least as much as is already buffered so that retrying a
+        # value that spans many chunks stays linear in its size.
+        chunk = self.stream.read(max(self.read_size, len(self.text) - self.position))
+        self.eof = not chunk
+        if isinstance(chunk, bytes):
+            # A chunk may end in the middle of a multi-byte character.
+            chunk = self.utf8_decoder.decode(chunk, final=self.eof)
+        self.text = self.text[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in JSON_WHITESPACE:
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if self.eof:
+                return None
+            self.fill()
+
+    def error(self, message):
+        return json.JSONDecodeError(message, self.text, self.position)
+
+    def expect(self, chars):
+        char = self.peek()
+        if char is None or char not in chars:
+            raise self.error('Expecting one of {!r}'.format(chars))
+        self.position += 1
+        return char
+
+    def may_continue(self, value, end):
+        # Whether a number ending at end could continue in the next chunk,
+        # like 1.5e10 read as 1 followed by .5e.
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return all(char in JSON_NUMBER_CHARS for char in self.text[end:])
+
+    def decode(self, decoder):
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.position)
+            except ValueError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if not self.eof and self.may_continue(value, end):
+                self.fill()
+                continue
+            self.position = end
+            return value
+
+
+def iter_json_values(stream, read_size=JSON_READ_SIZE):
+    '''
+    Yields the top level values of concatenated or newline delimited JSON.
+    The elements of a top level array are yielded one by one rather than
+    the array itself.
+    '''
+    decoder = json.JSONDecoder()
+    reader = JSONStreamReader(stream, read_size)
+    while True:
+        char = reader.peek()
+        if char is None:
+            return
+        if char != '[':
+            yield reader.decode(decoder)
+            continue
+        reader.position += 1
+        if reader.peek() == ']':
+            reader.position += 1
+            continue
+        while True:
+            if reader.peek() in (',', ']'):
+                raise reader.error('Expecting value')
+            yield reader.decode(decoder)
+            if reader.expect(',]') == ']':
+                break
+
+
+def iter_json_object_items(stream, read_size=JSON_READ_SIZE):
+    '''
+    Yields the (key, value) pairs of the JSON object in stream without
+    reading the whole object into memory.
+    '''
+    decoder = json.JSONDecoder()
+    reader = JSONStreamReader(stream, read_size)
+    if reader.peek() is None:
+        return
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        if reader.peek() != '"':
+            raise reader.error('Expecting property name enclosed in double quotes')
+        key = reader.decode(decoder)
+        reader.expect(':')
+        reader.peek()
+        yield key, reader.decode(decoder)
+        if reader.expect(',}') == '}':
+            return
@@ -1,9 +1,14 @@
 from past.builtins import basestring
 from .typedsheets import cast_row_values
+from .jsonstream import iter_json_values
 from functools import reduce
+import collections
 import io
+import itertools
+import json
 import logging
 import os.path
+import threading
 
 text = type(u'')
 
@@ -170,19 +175,22 @@ def skip_rows_with_all_falsey_value(*keys):
     return component
 
 
-def add_attachments(docsdir):
+def add_attachments(docsdir, attachments=None):
+    """ Replace attachment filenames with upload objects. Attachments are
+    processed by an AttachmentProcessor, possibly on a process pool, while
+    rows are still yielded in order.
+    """
+    if attachments is None:
+        attachments = AttachmentProcessor()
+
     def component(dictrows):
+        pending = collections.deque()
         for row in dictrows:
-            for attachment_property in IS_ATTACHMENT:
-                filename = row.get(attachment_property, None)
-                if filename is None:
-                    continue
-                try:
-                    path = find_doc(docsdir, filename)
-                    row[attachment_property] = attachment(path)
-                except ValueError as e:
-                    row['_errors'] = repr(e)
-            yield row
+            pending.append((row, attachments.submit_row(row, docsdir)))
+            while len(pending) > attachments.window:
+                yield attachments.finish_row(*pending.popleft())
+        while pending:
+            yield attachments.finish_row(*pending.popleft())
 
     return component
 
@@ -274,11 +282,17 @@ def read_csv(stream, **kw):
 
 
 def read_json(stream):
-    import json
-    obj = json.load(stream)
-    if isinstance(obj, dict):
-        return [obj]
-    return obj
+    """ Read a JSON object, a JSON array of objects or newline delimited
+    JSON objects one at a time, so that large inserts are never held in
+    memory as a whole.
+    """
+    values = iter_json_values(stream)
+    # Decode the first value now so that malformed files fail on open.
+    try:
+        first = next(values)
+    except StopIteration:
+        return iter(())
+    return itertools.chain([first], values)
 
 
 ##############################################################################
@@ -337,6 +351,54 @@ def make_request(testapp, item_type, method):
     return component
 
 
+def _post_bulk(testapp, item_type, batch):
+    body = '\n'.join(json.dumps(row['_value']) for row in batch)
+    res = testapp.post(
+        '/_bulk_import?type=' + item_type,
+        body,
+        content_type='application/x-ndjson',
+        status='*',
+    )
+    if res.status_int == 201:
+        for row in batch:
+            row['_response'] = res
+        return
+    errors_by_line = {}
+    for error in res.json.get('errors', []) if res.content_type == 'application/json' else []:
+        name = error.get('name') or ['']
+        errors_by_line.setdefault(name[0], []).append(error)
+    for line_number, row in enumerate(batch, start=1):
+        row['_errors'] = errors_by_line.get(
+            'line %d' % line_number,
+            '%s: batch rejected (%s)' % (res.status, 'another row failed' if errors_by_line else trim(res.text))
+        )
+
+
+def make_bulk_request(testapp, item_type, batch_size):
+    """ Like make_request for POSTs but creates rows batch_size at a time
+    through /_bulk_import. A batch is created or rejected as a whole.
+    """
+    def component(rows):
+        batch = []
+        for row in rows:
+            if row.get('_skip') or row.get('_errors') or not row.get('_url'):
+                yield row
+                continue
+            row['_value'] = {
+                k: v for k, v in row.items() if not k.startswith('_') and not k.startswith('@')
+            }
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _post_bulk(testapp, item_type, batch)
+                yield from batch
+                batch = []
+        if batch:
+            _post_bulk(testapp, item_type, batch)
+            yield from batch
+
+    return component
+
+
 ##############################################################################
 # Logging
 
@@ -425,53 +487,168 @@ def find_doc(docsdir, filename):
     return path
 
 
-def attachment(path):
-    """ Create an attachment upload object from a filename
-    Embeds the attachment as a data url.
+ATTACHMENT_IMAGE_TYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/tiff')
+
+
+class AttachmentCache(object):
+    """ On disk cache of what is slow to work out about an attachment (the
+    detected MIME type, image format and dimensions and the base64 payload)
+    keyed by the sha256 of its contents. Entries are written atomically so
+    one cache directory can be shared by concurrent loads.
     """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _entry_path(self, digest):
+        return os.path.join(self.path, digest[:2], digest + '.json')
+
+    def get(self, digest):
+        try:
+            with open(self._entry_path(digest)) as stream:
+                return json.load(stream)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, digest, content):
+        path = self._entry_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp_path, 'w') as stream:
+            json.dump(content, stream)
+        os.replace(tmp_path, path)
+
+
+def _inspect_attachment(data):
     import magic
-    import mimetypes
     from PIL import Image
     from base64 import b64encode
 
+    content = {
+        'detected_type': magic.from_buffer(data, mime=True),
+        'payload': b64encode(data).decode('ascii'),
+    }
+    if content['detected_type'] in ATTACHMENT_IMAGE_TYPES:
+        im = Image.open(io.BytesIO(data))
+        im.verify()
+        content['image_format'] = im.format
+        content['width'], content['height'] = im.size
+    return content
+
+
+def _get_attachment_content(data, cache_dir=None):
+    if cache_dir is None:
+        return _inspect_attachment(data)
+    import hashlib
+    cache = AttachmentCache(cache_dir)
+    digest = hashlib.sha256(data).hexdigest()
+    content = cache.get(digest)
+    if content is None:
+        content = _inspect_attachment(data)
+        cache.set(digest, content)
+    return content
+
+
+def attachment(path, cache_dir=None):
+    """ Create an attachment upload object from a filename
+    Embeds the attachment as a data url. With a cache_dir, files already
+    seen are not decoded again.
+    """
+    import mimetypes
+
     filename = os.path.basename(path)
     mime_type, encoding = mimetypes.guess_type(path)
     if encoding == 'gzip':
         mime_type = 'application/gzip'
     major, minor = mime_type.split('/')
-    detected_type = magic.from_file(path, mime=True)
+    with open(path, 'rb') as stream:
+        content = _get_attachment_content(stream.read(), cache_dir)
+    detected_type = content['detected_type']
 
     # XXX This validation logic should move server-side.
     if not (detected_type == mime_type or
             detected_type == 'text/plain' and major == 'text'):
         raise ValueError('Wrong extension for %s: %s' % (detected_type, filename))
 
-    with open(path, 'rb') as stream:
-        attach = {
-            'download': filename,
-            'type': mime_type,
-            'href': 'data:%s;base64,%s' % (mime_type, b64encode(stream.read()).decode('ascii'))
-        }
+    attach = {
+        'download': filename,
+        'type': mime_type,
+        'href': 'data:%s;base64,%s' % (mime_type, content['payload'])
+    }
 
-        if mime_type in ('application/pdf', 'application/json', 'application/gzip', 'text/plain', 'text/tab-separated-values', 'text/html'):
-            # XXX Should use chardet to detect charset for text files here.
-            return attach
+    if mime_type in ('application/pdf', 'application/json', 'application/gzip', 'text/plain', 'text/tab-separated-values', 'text/html'):
+        # XXX Should use chardet to detect charset for text files here.
+        return attach
 
-        if major == 'image' and minor in ('png', 'jpeg', 'gif', 'tiff'):
-            # XXX we should just convert our tiffs to pngs
-            stream.seek(0, 0)
-            im = Image.open(stream)
-            im.verify()
-            if im.format != minor.upper():
-                msg = 'Image file format %r does not match extension for %s'
-                raise ValueError(msg % (im.format, filename))
+    if major == 'image' and minor in ('png', 'jpeg', 'gif', 'tiff'):
+        # XXX we should just convert our tiffs to pngs
+        if content['image_format'] != minor.upper():
+            msg = 'Image file format %r does not match extension for %s'
+            raise ValueError(msg % (content['image_format'], filename))
 
-            attach['width'], attach['height'] = im.size
-            return attach
+        attach['width'], attach['height'] = content['width'], content['height']
+        return attach
 
     raise ValueError('Unknown file type for %s' % filename)
 
 
+class AttachmentProcessor(object):
+    """ Runs attachment() for the add_attachments pipeline stage, on a pool
+    of workers processes when workers > 1 and in line otherwise. Up to
+    window rows are kept in flight per pipeline.
+    """
+
+    def __init__(self, workers=1, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.pool = None
+        self.window = 0
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+            self.window = workers * 4
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def submit(self, path):
+        from concurrent.futures import Future
+        if self.pool is not None:
+            return self.pool.submit(attachment, path, self.cache_dir)
+        future = Future()
+        try:
+            future.set_result(attachment(path, self.cache_dir))
+        except ValueError as e:
+            future.set_exception(e)
+        return future
+
+    def submit_row(self, row, docsdir):
+        futures = {}
+        for attachment_property in IS_ATTACHMENT:
+            filename = row.get(attachment_property, None)
+            if filename is None:
+                continue
+            try:
+                futures[attachment_property] = self.submit(find_doc(docsdir, filename))
+            except ValueError as e:
+                row['_errors'] = repr(e)
+        return futures
+
+    def finish_row(self, row, futures):
+        for attachment_property, future in futures.items():
+            try:
+                row[attachment_property] = future.result()
+            except ValueError as e:
+                row['_errors'] = repr(e)
+        return row
+
+
 ##############################################################################
 # Pipelines
 
@@ -489,7 +666,8 @@ def process(rows):
         pass
 
 
-def get_pipeline(testapp, docsdir, test_only, item_type, phase=None, method=None):
+def get_pipeline(testapp, docsdir, test_only, item_type, phase=None, method=None, bulk_batch_size=None,
+                 attachments=None):
     pipeline = [
         skip_rows_with_all_key_value(test='skip'),
         skip_rows_with_all_key_value(_test='skip'),
@@ -501,7 +679,7 @@ def get_pipeline(testapp, docsdir, test_only, item_type, phase=None, method=None
         warn_keys_with_unknown_value_except_for(
             'version',
         ),
-        add_attachments(docsdir),
+        add_attachments(docsdir, attachments),
     ]
     if phase == 1:
         method = 'POST'
@@ -513,68 +691,48 @@ def get_pipeline(testapp, docsdir, test_only, item_type, phase=None, method=None
     pipeline.extend([
         request_url(item_type, method),
         remove_keys('uuid') if method in ('PUT', 'PATCH') else noop,
-        make_request(testapp, item_type, method),
+        make_bulk_request(testapp, item_type, bulk_batch_size)
+        if bulk_batch_size and method == 'POST' else make_request(testapp, item_type, method),
         pipeline_logger(item_type, phase),
     ])
     return pipeline
 
 
 # Additional pipeline sections for item types
+#
+# Keys that are left out of the phase 1 POST, usually to break reference
+# cycles, and set by a phase 2 PUT once every item exists.
+
+DEFERRED_KEYS = {
+    'user': ('lab', 'submits_for'),
+    'construct_library_set': ('integrated_content_files', 'large_scale_gene_list', 'large_scale_loci_list'),
+    'prediction_set': ('large_scale_gene_list', 'large_scale_loci_list', 'scope'),
+    'in_vitro_system': ('pooled_from', 'part_of', 'originated_from', 'construct_library_sets', 'moi',
+                        'nucleic_acid_delivery', 'time_post_library_delivery', 'time_post_library_delivery_units'),
+    'tissue': ('pooled_from', 'part_of', 'construct_library_sets', 'moi', 'nucleic_acid_delivery',
+               'time_post_library_delivery', 'time_post_library_delivery_units'),
+    'primary_cell': ('pooled_from', 'part_of', 'construct_library_sets', 'moi', 'nucleic_acid_delivery',
+                     'time_post_library_delivery', 'time_post_library_delivery_units'),
+    'whole_organism': ('construct_library_sets', 'moi', 'nucleic_acid_delivery',
+                       'time_post_library_delivery', 'time_post_library_delivery_units'),
+    'technical_sample': ('construct_library_sets', 'moi', 'nucleic_acid_delivery',
+                         'time_post_library_delivery', 'time_post_library_delivery_units'),
+    'multiplexed_sample': ('barcode_sample_map',),
+    'reference_file': ('derived_from', 'file_format_specifications'),
+    'sequence_file': ('derived_from', 'file_format_specifications', 'seqspec'),
+    'alignment_file': ('derived_from', 'file_format_specifications'),
+    'configuration_file': ('derived_from', 'file_format_specifications'),
+    'signal_file': ('derived_from', 'file_format_specifications'),
+    'measurement_set': ('auxiliary_sets', 'control_file_sets'),
+    'auxiliary_set': ('measurement_sets',),
+}
+
 
 PHASE1_PIPELINES = {
-    'user': [
-        remove_keys('lab', 'submits_for'),
-    ],
-    'construct_library_set': [
-        remove_keys('integrated_content_files', 'large_scale_gene_list', 'large_scale_loci_list'),
-    ],
-    'prediction_set': [
-        remove_keys('large_scale_gene_list', 'large_scale_loci_list', 'scope'),
-    ],
-    'in_vitro_system': [
-        remove_keys('pooled_from', 'part_of', 'originated_from', 'construct_library_sets', 'moi',
-                    'nucleic_acid_delivery', 'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'tissue': [
-        remove_keys('pooled_from', 'part_of', 'construct_library_sets', 'moi', 'nucleic_acid_delivery',
-                    'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'primary_cell': [
-        remove_keys('pooled_from', 'part_of', 'construct_library_sets', 'moi', 'nucleic_acid_delivery',
-                    'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'whole_organism': [
-        remove_keys('construct_library_sets', 'moi', 'nucleic_acid_delivery',
-                    'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'technical_sample': [
-        remove_keys('construct_library_sets', 'moi', 'nucleic_acid_delivery',
-                    'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'multiplexed_sample': [
-        remove_keys('barcode_sample_map'),
-    ],
-    'reference_file': [
-        remove_keys('derived_from', 'file_format_specifications'),
-    ],
-    'sequence_file': [
-        remove_keys('derived_from', 'file_format_specifications', 'seqspec'),
-    ],
-    'alignment_file': [
-        remove_keys('derived_from', 'file_format_specifications'),
-    ],
-    'configuration_file': [
-        remove_keys('derived_from', 'file_format_specifications'),
-    ],
-    'signal_file': [
-        remove_keys('derived_from', 'file_format_specifications'),
-    ],
-    'measurement_set': [
-        remove_keys('auxiliary_sets', 'control_file_sets'),
-    ],
-    'auxiliary_set': [
-        remove_keys('measurement_sets'),
-    ],
+    item_type: [
+        remove_keys(*keys),
+    ]
+    for item_type, keys in DEFERRED_KEYS.items()
 }
 
 
@@ -586,86 +744,323 @@ PHASE1_PIPELINES = {
 
 
 PHASE2_PIPELINES = {
-    'user': [
-        skip_rows_missing_all_keys('lab', 'submits_for'),
-    ],
-    'construct_library_set': [
-        skip_rows_missing_all_keys('integrated_content_files', 'large_scale_gene_list', 'large_scale_loci_list'),
-    ],
-    'prediction_set': [
-        skip_rows_missing_all_keys('large_scale_gene_list', 'large_scale_loci_list', 'scope'),
-    ],
-    'in_vitro_system': [
-        skip_rows_missing_all_keys('pooled_from', 'part_of', 'originated_from', 'construct_library_sets',
-                                   'moi', 'nucleic_acid_delivery', 'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'tissue': [
-        skip_rows_missing_all_keys('pooled_from', 'part_of', 'construct_library_sets', 'moi',
-                                   'nucleic_acid_delivery', 'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'primary_cell': [
-        skip_rows_missing_all_keys('pooled_from', 'part_of', 'construct_library_sets', 'moi',
-                                   'nucleic_acid_delivery', 'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'whole_organism': [
-        skip_rows_missing_all_keys('construct_library_sets', 'moi', 'nucleic_acid_delivery',
-                                   'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'technical_sample': [
-        skip_rows_missing_all_keys('construct_library_sets', 'moi', 'nucleic_acid_delivery',
-                                   'time_post_library_delivery', 'time_post_library_delivery_units'),
-    ],
-    'multiplexed_sample': [
-        skip_rows_missing_all_keys('barcode_sample_map'),
-    ],
-    'reference_file': [
-        skip_rows_missing_all_keys('derived_from', 'file_format_specifications'),
-    ],
-    'sequence_file': [
-        skip_rows_missing_all_keys('derived_from', 'file_format_specifications', 'seqspec'),
-    ],
-    'alignment_file': [
-        skip_rows_missing_all_keys('derived_from', 'file_format_specifications'),
-    ],
-    'configuration_file': [
-        skip_rows_missing_all_keys('derived_from', 'file_format_specifications'),
-    ],
-    'signal_file': [
-        skip_rows_missing_all_keys('derived_from', 'file_format_specifications'),
-    ],
-    'measurement_set': [
-        skip_rows_missing_all_keys('auxiliary_sets', 'control_file_sets'),
-    ],
-    'auxiliary_set': [
-        skip_rows_missing_all_keys('measurement_sets'),
-    ],
+    item_type: [
+        skip_rows_missing_all_keys(*keys),
+    ]
+    for item_type, keys in DEFERRED_KEYS.items()
 }
 
 
-def load_all(testapp, filename, docsdir, log_level=None, test=False):
+##############################################################################
+# Checkpoints
+#
+# Loads record how far they got in a SQLite sidecar so that a load that
+# dies partway can be resumed. Rows are numbered as read from the source,
+# before any section skips them.
+
+
+def get_checkpoint_path(filename):
+    import hashlib
+    import tempfile
+    digest = hashlib.sha1(os.path.abspath(filename).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), 'igvfd-loadxl-%s.sqlite' % digest)
+
+
+class LoadCheckpoint(object):
+    """ Thread safe record of the last row processed per item type and
+    phase and of the finished ones. Rows are committed every commit_every
+    rows, so at most that many are sent again on resume. Those are POSTs
+    answered with a conflict or idempotent PUTs.
+    """
+
+    def __init__(self, path, resume=False, commit_every=100):
+        import sqlite3
+        self.path = path
+        self.commit_every = commit_every
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            if not resume:
+                self.connection.execute('DROP TABLE IF EXISTS last_rows')
+                self.connection.execute('DROP TABLE IF EXISTS finished')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS last_rows '
+                '(item_type TEXT, phase INTEGER, row INTEGER, PRIMARY KEY (item_type, phase))'
+            )
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS finished '
+                '(item_type TEXT, phase INTEGER, PRIMARY KEY (item_type, phase))'
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def last_row(self, item_type, phase):
+        with self.lock:
+            result = self.connection.execute(
+                'SELECT row FROM last_rows WHERE item_type = ? AND phase = ?', (item_type, phase)
+            ).fetchone()
+        return -1 if result is None else result[0]
+
+    def is_finished(self, item_type, phase):
+        with self.lock:
+            result = self.connection.execute(
+                'SELECT 1 FROM finished WHERE item_type = ? AND phase = ?', (item_type, phase)
+            ).fetchone()
+        return result is not None
+
+    def _set_last_row(self, item_type, phase, row):
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO last_rows VALUES (?, ?, ?)', (item_type, phase, row)
+            )
+
+    def finish(self, item_type, phase):
+        with self.lock, self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO finished VALUES (?, ?)', (item_type, phase))
+
+    def skip_done_rows(self, item_type, phase):
+        last_row = self.last_row(item_type, phase)
+        if last_row >= 0:
+            logger.info('Resuming %s (phase %s) after row %d', item_type, phase, last_row + 2)
+
+        def component(rows):
+            for index, row in enumerate(rows):
+                if index <= last_row:
+                    continue
+                row['_row'] = index
+                yield row
+
+        return component
+
+    def recorder(self, item_type, phase):
+        def component(rows):
+            last_row = None
+            for row in rows:
+                # Rows come out in order, so this row and those before it
+                # are done once it is through the request section.
+                last_row = row['_row']
+                if last_row % self.commit_every == 0:
+                    self._set_last_row(item_type, phase, last_row)
+                yield row
+            if last_row is not None:
+                self._set_last_row(item_type, phase, last_row)
+
+        return component
+
+
+def _run_pipeline(source, pipeline, item_type, phase, checkpoint=None):
+    if checkpoint is not None:
+        source = checkpoint.skip_done_rows(item_type, phase)(source)
+        pipeline = pipeline + [checkpoint.recorder(item_type, phase)]
+    process(combine(source, pipeline))
+    if checkpoint is not None:
+        checkpoint.finish(item_type, phase)
+
+
+def load_all(testapp, filename, docsdir, log_level=None, test=False, workers=1, bulk_batch_size=None,
+             attachment_workers=1, attachment_cache_dir=None, checkpoint=False, resume=False):
     if log_level is not None:
         _reset_log_level(log_level)
+    load_checkpoint = None
+    if checkpoint or resume:
+        load_checkpoint = LoadCheckpoint(get_checkpoint_path(filename), resume=resume)
+    try:
+        with AttachmentProcessor(workers=attachment_workers, cache_dir=attachment_cache_dir) as attachments:
+            if workers > 1:
+                return load_all_concurrently(
+                    testapp, filename, docsdir, test=test, workers=workers, bulk_batch_size=bulk_batch_size,
+                    attachments=attachments, checkpoint=load_checkpoint,
+                )
+            _load_all_in_order(testapp, filename, docsdir, test, bulk_batch_size, attachments, load_checkpoint)
+    finally:
+        if load_checkpoint is not None:
+            load_checkpoint.close()
+
+
+def _load_all_in_order(testapp, filename, docsdir, test, bulk_batch_size, attachments, checkpoint=None):
     for item_type in ORDER:
+        if checkpoint is not None and checkpoint.is_finished(item_type, 1):
+            continue
         try:
             source = read_single_sheet(filename, item_type)
         except ValueError:
             logger.error('Opening %s %s failed.', filename, item_type)
             continue
-        pipeline = get_pipeline(testapp, docsdir, test, item_type, phase=1)
-        process(combine(source, pipeline))
+        pipeline = get_pipeline(
+            testapp, docsdir, test, item_type, phase=1, bulk_batch_size=bulk_batch_size, attachments=attachments
+        )
+        _run_pipeline(source, pipeline, item_type, 1, checkpoint)
 
     for item_type in ORDER:
         if item_type not in PHASE2_PIPELINES:
             continue
+        if checkpoint is not None and checkpoint.is_finished(item_type, 2):
+            continue
         try:
             source = read_single_sheet(filename, item_type)
         except ValueError:
             continue
-        pipeline = get_pipeline(testapp, docsdir, test, item_type, phase=2)
-        process(combine(source, pipeline))
+        pipeline = get_pipeline(testapp, docsdir, test, item_type, phase=2, attachments=attachments)
+        _run_pipeline(source, pipeline, item_type, 2, checkpoint)
+
+
+##############################################################################
+# Concurrent loading
+#
+# Item types are loaded as soon as every type they link to is loaded,
+# using the linkTo properties of the schemas rather than ORDER. Deferred
+# keys are not dependencies since they are only set in phase 2.
+
+
+def _get_link_targets(schema):
+    link_to = schema.get('linkTo')
+    if link_to is not None:
+        yield from [link_to] if isinstance(link_to, str) else link_to
+    if isinstance(schema.get('items'), dict):
+        yield from _get_link_targets(schema['items'])
+    for subschema in schema.get('properties', {}).values():
+        yield from _get_link_targets(subschema)
+
+
+def get_type_dependencies(profiles):
+    """ Map each item type to the item types it links to in phase 1
+    from the /profiles/ of the app.
+    """
+    subtypes = profiles.get('_subtypes', {})
+    item_types = {
+        name: os.path.splitext(os.path.basename(schema['$id']))[0]
+        for name, schema in profiles.items()
+        if not name.startswith('_') and isinstance(schema, dict) and '$id' in schema
+    }
+    dependencies = {}
+    for name, item_type in item_types.items():
+        deferred_keys = DEFERRED_KEYS.get(item_type, ())
+        targets = set()
+        for key, subschema in profiles[name].get('properties', {}).items():
+            if key in deferred_keys or subschema.get('notSubmittable'):
+                continue
+            for target in _get_link_targets(subschema):
+                for concrete in subtypes.get(target, [target]):
+                    if concrete in item_types:
+                        targets.add(item_types[concrete])
+        targets.discard(item_type)
+        dependencies[item_type] = targets
+    return dependencies
+
+
+class LoadProgress(object):
+    """ Thread safe row and type counters logged as the load goes.
+    """
+
+    def __init__(self, total_types, log_every=1000):
+        self.total_types = total_types
+        self.log_every = log_every
+        self.finished_types = 0
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def counter(self, item_type, phase):
+        def component(rows):
+            for row in rows:
+                with self.lock:
+                    self.rows += 1
+                    if self.rows % self.log_every == 0:
+                        logger.info('Progress: %d rows, %d of %d types finished', self.rows,
+                                    self.finished_types, self.total_types)
+                yield row
+
+        return component
+
+    def finished(self, item_type, phase):
+        with self.lock:
+            self.finished_types += 1
+            logger.info('Finished %s (phase %s): %d of %d types, %d rows', item_type, phase,
+                        self.finished_types, self.total_types, self.rows)
+
+
+def _load_type(testapp, filename, docsdir, test, item_type, phase, progress, bulk_batch_size=None,
+               attachments=None, checkpoint=None):
+    from webtest import TestApp
+    if checkpoint is not None and checkpoint.is_finished(item_type, phase):
+        return
+    # TestApp keeps cookies so each worker gets its own.
+    testapp = TestApp(testapp.app, extra_environ=testapp.extra_environ)
+    try:
+        source = read_single_sheet(filename, item_type)
+    except ValueError:
+        logger.error('Opening %s %s failed.', filename, item_type)
+        return
+    pipeline = get_pipeline(
+        testapp, docsdir, test, item_type, phase=phase, bulk_batch_size=bulk_batch_size, attachments=attachments
+    )
+    pipeline.append(progress.counter(item_type, phase))
+    _run_pipeline(source, pipeline, item_type, phase, checkpoint)
+
+
+def load_all_concurrently(testapp, filename, docsdir, test=False, workers=4, bulk_batch_size=None,
+                          attachments=None, checkpoint=None):
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import wait
+
+    dependencies = get_type_dependencies(testapp.get('/profiles/').json)
+    item_types = [item_type for item_type in ORDER if item_type in dependencies]
+    waiting = {
+        item_type: dependencies[item_type] & set(item_types)
+        for item_type in item_types
+    }
+    phase2_types = [item_type for item_type in item_types if item_type in PHASE2_PIPELINES]
+    progress = LoadProgress(len(item_types) + len(phase2_types))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+
+        def submit_ready():
+            for item_type in sorted(waiting, key=item_types.index):
+                if not waiting[item_type]:
+                    del waiting[item_type]
+                    future = executor.submit(
+                        _load_type, testapp, filename, docsdir, test, item_type, 1, progress, bulk_batch_size,
+                        attachments, checkpoint,
+                    )
+                    running[future] = item_type
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item_type = running.pop(future)
+                future.result()
+                progress.finished(item_type, 1)
+                for deps in waiting.values():
+                    deps.discard(item_type)
+            submit_ready()
+        if waiting:
+            # Only possible with a dependency cycle.
+            logger.warning('Dependency cycle between %s, loading in ORDER', sorted(waiting))
+            for item_type in sorted(waiting, key=item_types.index):
+                _load_type(
+                    testapp, filename, docsdir, test, item_type, 1, progress, bulk_batch_size, attachments, checkpoint
+                )
+                progress.finished(item_type, 1)
+
+        # Every item exists after phase 1 so phase 2 types are independent.
+        futures = {
+            executor.submit(
+                _load_type, testapp, filename, docsdir, test, item_type, 2, progress,
+                attachments=attachments, checkpoint=checkpoint,
+            ): item_type
+            for item_type in phase2_types
+        }
+        for future in futures:
+            future.result()
+            progress.finished(futures[future], 2)
 
 
-def load_test_data(app):
+def load_test_data(app, workers=1, bulk_batch_size=None, attachment_workers=1, attachment_cache_dir=None,
+                   checkpoint=False, resume=False):
     from webtest import TestApp
     environ = {
         'HTTP_ACCEPT': 'application/json',
@@ -675,4 +1070,14 @@ def load_test_data(app):
     from pkg_resources import resource_filename
     inserts = resource_filename('igvfd', 'tests/data/inserts/')
     docsdir = [resource_filename('igvfd', 'tests/data/documents/')]
-    load_all(testapp, inserts, docsdir)
+    load_all(
+        testapp,
+        inserts,
+        docsdir,
+        workers=workers,
+        bulk_batch_size=bulk_batch_size,
+        attachment_workers=attachment_workers,
+        attachment_cache_dir=attachment_cache_dir,
+        checkpoint=checkpoint,
+        resume=resume,
+    )
@@ -1,13 +1,33 @@
 import gzip
+import hashlib
 import json
+import logging
+import mmap
+import os
 import pickle
 import sqlite3
+import struct
+import threading
+import time
 import zlib
 
+from collections import OrderedDict
+from collections.abc import Mapping
 from pathlib import Path
+from pyramid.events import ApplicationCreated
+from pyramid.events import subscriber
+from pyramid.settings import asbool
+from pyramid.view import view_config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from sqlitedict import SqliteDict
 
+from igvfd.jsonstream import iter_json_object_items
+
 
 ONTOLOGY_FILE_NAME = 'ontology.json.gz'
 
@@ -15,12 +35,159 @@ REFERENCE_DATABASE_FILE_NAME = '/srv/sqlite/reference.sqlite'
 
 REFERENCE_ONTOLOGY_TABLE_NAME = 'ontology'
 
+REFERENCE_STORE_FILE_NAME = '/srv/sqlite/reference.ontology.store'
+
+DEFAULT_ONTOLOGY_CACHE_CAPACITY = 50000
+
+log = logging.getLogger(__name__)
+
 
 def includeme(config):
+    config.add_route('ontology_cache', '/_ontology_cache')
     config.scan(__name__, categories=None)
-    config.registry['ontology'] = get_connection_to_reference_database(
-        REFERENCE_ONTOLOGY_TABLE_NAME
+    capacity = int(
+        config.registry.settings.get('ontology_cache.capacity', DEFAULT_ONTOLOGY_CACHE_CAPACITY)
+    )
+    config.registry['ontology'] = OntologyCache(get_reference_ontology(), capacity=capacity)
+
+
+def get_reference_ontology(
+        store_filename=REFERENCE_STORE_FILE_NAME,
+        filename=REFERENCE_DATABASE_FILE_NAME,
+):
+    # The memory-mapped store is preferred, the SQLite database is kept
+    # for deployments built before it existed.
+    if os.path.exists(store_filename):
+        return ReferenceStore(store_filename)
+    return get_connection_to_reference_database(
+        REFERENCE_ONTOLOGY_TABLE_NAME,
+        decode=get_item_decode(REFERENCE_ONTOLOGY_TABLE_NAME, filename=filename),
+        filename=filename,
+    )
+
+
+_MISSING = object()
+
+
+class OntologyCache(Mapping):
+    '''
+    LRU of terms in front of the reference database or store, private to
+    each worker process. Terms from a ReferenceStore are cached as their
+    records, so fields are still decoded from the shared mmap only when
+    read. Missing terms are cached too since most lookups are for terms
+    that have no slims.
+    '''
+
+    def __init__(self, reference, capacity=DEFAULT_ONTOLOGY_CACHE_CAPACITY):
+        self.reference = reference
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.warmed = 0
+
+    def _load(self, term_id):
+        term = self.reference.get(term_id)
+        with self.lock:
+            self.cache[term_id] = term
+            self.cache.move_to_end(term_id)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+        return term
+
+    def get(self, term_id, default=None):
+        with self.lock:
+            term = self.cache.get(term_id, _MISSING)
+            if term is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.cache.move_to_end(term_id)
+        if term is _MISSING:
+            term = self._load(term_id)
+        return default if term is None else term
+
+    def __getitem__(self, term_id):
+        term = self.get(term_id)
+        if term is None:
+            raise KeyError(term_id)
+        return term
+
+    def __contains__(self, term_id):
+        return self.get(term_id) is not None
+
+    def __iter__(self):
+        return iter(self.reference)
+
+    def __len__(self):
+        return len(self.reference)
+
+    def warm_up(self, term_ids):
+        for term_id in term_ids:
+            if self.warmed >= self.capacity:
+                break
+            self._load(term_id)
+            self.warmed += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'capacity': self.capacity,
+                'size': len(self.cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'warmed': self.warmed,
+            }
+
+
+def get_referenced_term_ids(registry):
+    from snovault import DBSESSION
+    from snovault import TYPES
+    from snovault.storage import CurrentPropertySheet
+    from snovault.storage import PropertySheet
+    from snovault.storage import Resource
+    item_types = registry[TYPES].abstract['OntologyTerm'].subtypes
+    session = registry[DBSESSION]
+    query = session.query(
+        PropertySheet.properties['term_id'].astext
+    ).join(
+        CurrentPropertySheet, CurrentPropertySheet.sid == PropertySheet.sid
+    ).join(
+        Resource, Resource.rid == CurrentPropertySheet.rid
+    ).filter(
+        Resource.item_type.in_(item_types),
+        CurrentPropertySheet.name == '',
     )
+    return [term_id for term_id, in query.yield_per(1000) if term_id]
+
+
+@subscriber(ApplicationCreated)
+def warm_up_ontology_cache(event):
+    registry = event.app.registry
+    ontology = registry.get('ontology')
+    if not isinstance(ontology, OntologyCache):
+        return
+    if not asbool(registry.settings.get('ontology_cache.warm_up', False)):
+        return
+    import transaction
+    try:
+        with transaction.manager:
+            term_ids = get_referenced_term_ids(registry)
+        ontology.warm_up(term_ids)
+    except Exception:
+        # A cold cache is only slower, so never fail startup over it.
+        log.warning('Warming up the ontology cache failed', exc_info=True)
+        return
+    log.info('Warmed up the ontology cache with %d of %d terms', ontology.warmed, len(term_ids))
+
+
+@view_config(route_name='ontology_cache', request_method='GET', permission='ontology_cache')
+def ontology_cache_stats(context, request):
+    ontology = request.registry['ontology']
+    return ontology.stats() if isinstance(ontology, OntologyCache) else {}
 
 
 def load_local_gz_json(path):
@@ -112,3 +279,409 @@ def get_connection_to_reference_database(
         flag=flag,
         outer_stack=False,
     )
+
+
+# Streaming build
+#
+# Terms are parsed from the gzipped JSON one at a time and written in
+# batched transactions, so memory use does not grow with the ontology.
+# Values are pickled as before but compressed with a zstd dictionary
+# trained on the first terms when zstandard is installed.
+
+ZSTD_FRAME_MAGIC = b'\x28\xb5\x2f\xfd'
+
+ONTOLOGY_READ_SIZE = 1 << 20
+
+DEFAULT_BATCH_SIZE = 5000
+
+DEFAULT_DICTIONARY_SAMPLES = 5000
+
+DEFAULT_DICTIONARY_SIZE = 1 << 17
+
+
+def get_dictionary_tablename(tablename):
+    return '{}_zstd_dictionary'.format(tablename)
+
+
+def iter_ontology_items(path=None):
+    path = path or get_ontology_gz_json_path()
+    if not path.exists():
+        return
+    with gzip.open(path, 'rt', encoding='utf-8') as local_file:
+        yield from iter_json_object_items(local_file, read_size=ONTOLOGY_READ_SIZE)
+
+
+def get_item_decode(tablename, filename=REFERENCE_DATABASE_FILE_NAME):
+    '''
+    Returns a decode for the values of tablename that handles the zstd
+    dictionary compressed values of a streaming build as well as zlib.
+    '''
+    try:
+        connection = sqlite3.connect('file:{}?mode=ro'.format(filename), uri=True)
+    except sqlite3.Error:
+        return item_decode
+    try:
+        row = connection.execute(
+            'SELECT value FROM "{}"'.format(get_dictionary_tablename(tablename))
+        ).fetchone()
+    except sqlite3.Error:
+        row = None
+    finally:
+        connection.close()
+    if row is None:
+        return item_decode
+    if zstandard is None:
+        raise RuntimeError('{} needs zstandard to be read'.format(filename))
+    dictionary = zstandard.ZstdCompressionDict(bytes(row[0]))
+    local = threading.local()
+
+    def decode(item):
+        item = bytes(item)
+        if item[:4] != ZSTD_FRAME_MAGIC:
+            return item_decompress(item)
+        # Decompressors must not be shared between threads.
+        decompressor = getattr(local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = local.decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return pickle.loads(decompressor.decompress(item))
+
+    return decode
+
+
+class BuildProgress:
+    '''
+    Logs terms per second and peak RSS every log_every terms.
+    '''
+
+    def __init__(self, log_every=10000):
+        self.log_every = log_every
+        self.count = 0
+        self.start = time.monotonic()
+
+    def _log(self, message):
+        import resource
+        elapsed = time.monotonic() - self.start
+        log.info(
+            '%s %d terms in %.1fs (%.0f terms/s), peak RSS %.0f MB',
+            message,
+            self.count,
+            elapsed,
+            self.count / elapsed if elapsed else 0,
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        )
+
+    def counter(self, items):
+        for item in items:
+            self.count += 1
+            if self.count % self.log_every == 0:
+                self._log('Wrote')
+            yield item
+
+    def finished(self):
+        self._log('Finished')
+
+
+class ReferenceDatabaseWriter:
+    '''
+    Writes terms to a new SQLite reference database that SqliteDict can
+    read, in WAL mode and in transactions of batch_size terms. The file
+    is replaced atomically on close.
+    '''
+
+    def __init__(
+            self,
+            tablename,
+            filename=REFERENCE_DATABASE_FILE_NAME,
+            batch_size=DEFAULT_BATCH_SIZE,
+            dictionary_samples=DEFAULT_DICTIONARY_SAMPLES,
+            dictionary_size=DEFAULT_DICTIONARY_SIZE,
+    ):
+        self.tablename = tablename
+        self.filename = filename
+        self.tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+        self.batch_size = batch_size
+        self.dictionary_samples = dictionary_samples if zstandard is not None else 0
+        self.dictionary_size = dictionary_size
+        self.compressor = None
+        self.samples = []
+        self.batch = []
+        if os.path.exists(self.tmp_filename):
+            os.remove(self.tmp_filename)
+        self.connection = sqlite3.connect(self.tmp_filename)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE "{}" (key TEXT PRIMARY KEY, value BLOB)'.format(tablename)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.connection.close()
+            os.remove(self.tmp_filename)
+
+    def _train(self):
+        pickled = [pickle.dumps(value, pickle.HIGHEST_PROTOCOL) for _, value in self.samples]
+        try:
+            dictionary = zstandard.train_dictionary(self.dictionary_size, pickled)
+        except zstandard.ZstdError:
+            # Too few or too small samples, fall back to zlib.
+            log.warning('Could not train a zstd dictionary, using zlib')
+        else:
+            self.compressor = zstandard.ZstdCompressor(dict_data=dictionary)
+            with self.connection:
+                self.connection.execute(
+                    'CREATE TABLE "{}" (key TEXT PRIMARY KEY, value BLOB)'.format(
+                        get_dictionary_tablename(self.tablename)
+                    )
+                )
+                self.connection.execute(
+                    'INSERT INTO "{}" VALUES (?, ?)'.format(get_dictionary_tablename(self.tablename)),
+                    ('dictionary', sqlite3.Binary(dictionary.as_bytes())),
+                )
+        samples, self.samples, self.dictionary_samples = self.samples, [], 0
+        for key, value in samples:
+            self.add(key, value)
+
+    def _encode(self, value):
+        if self.compressor is None:
+            return item_encode(value)
+        return sqlite3.Binary(self.compressor.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+
+    def _flush(self):
+        with self.connection:
+            self.connection.executemany(
+                'REPLACE INTO "{}" (key, value) VALUES (?, ?)'.format(self.tablename),
+                self.batch,
+            )
+        self.batch = []
+
+    def add(self, key, value):
+        if len(self.samples) < self.dictionary_samples:
+            self.samples.append((key, value))
+            if len(self.samples) == self.dictionary_samples:
+                self._train()
+            return
+        self.batch.append((key, self._encode(value)))
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def write_through(self, items):
+        '''
+        Adds every (key, value) of items and yields it on, so that another
+        writer can consume the same single pass.
+        '''
+        for key, value in items:
+            self.add(key, value)
+            yield key, value
+
+    def close(self):
+        if self.samples:
+            self._train()
+        if self.batch:
+            self._flush()
+        # Readers open the database read-only so cannot use a WAL.
+        self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        self.connection.execute('PRAGMA journal_mode=DELETE')
+        self.connection.close()
+        os.replace(self.tmp_filename, self.filename)
+
+
+def build_reference_databases(
+        items,
+        tablename=REFERENCE_ONTOLOGY_TABLE_NAME,
+        filename=REFERENCE_DATABASE_FILE_NAME,
+        store_filename=REFERENCE_STORE_FILE_NAME,
+        batch_size=DEFAULT_BATCH_SIZE,
+        dictionary_samples=DEFAULT_DICTIONARY_SAMPLES,
+        dictionary_size=DEFAULT_DICTIONARY_SIZE,
+):
+    '''
+    Writes the SQLite reference database and the reference store in one
+    pass over items.
+    '''
+    progress = BuildProgress()
+    with ReferenceDatabaseWriter(
+            tablename,
+            filename=filename,
+            batch_size=batch_size,
+            dictionary_samples=dictionary_samples,
+            dictionary_size=dictionary_size,
+    ) as database:
+        write_reference_store(
+            progress.counter(database.write_through(items)),
+            filename=store_filename,
+        )
+    progress.finished()
+    return progress.count
+
+
+# Read-only reference store
+#
+# A single file shared through the page cache by every worker that maps it.
+# Layout: header, records, field names, then an open addressing hash table
+# of (key hash, record offset) buckets. Each record is its key and a
+# directory of (field id, length) followed by the JSON of every field, so
+# reading one field of a term is one probe and one small JSON decode.
+
+REFERENCE_STORE_MAGIC = b'IGVFREF1'
+
+REFERENCE_STORE_HEADER = struct.Struct('<8sQQQQ')
+
+REFERENCE_STORE_BUCKET = struct.Struct('<QQ')
+
+REFERENCE_STORE_FIELD = struct.Struct('<HI')
+
+REFERENCE_STORE_LENGTH = struct.Struct('<H')
+
+
+def reference_store_hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+def write_reference_store(items, filename=REFERENCE_STORE_FILE_NAME):
+    '''
+    Writes (key, dict) pairs to a reference store. items can be any
+    iterable, records are written as they come. The file is replaced
+    atomically so workers that mapped the old one keep reading it.
+    '''
+    tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+    field_ids = {}
+    buckets = []
+    with open(tmp_filename, 'wb') as stream:
+        stream.write(b'\0' * REFERENCE_STORE_HEADER.size)
+        offset = REFERENCE_STORE_HEADER.size
+        for key, value in items:
+            encoded_key = key.encode('utf-8')
+            values = [
+                (field_ids.setdefault(field, len(field_ids)), json.dumps(field_value).encode('utf-8'))
+                for field, field_value in value.items()
+            ]
+            record = [
+                REFERENCE_STORE_LENGTH.pack(len(encoded_key)),
+                encoded_key,
+                REFERENCE_STORE_LENGTH.pack(len(values)),
+            ]
+            record.extend(REFERENCE_STORE_FIELD.pack(field_id, len(data)) for field_id, data in values)
+            record.extend(data for _, data in values)
+            record = b''.join(record)
+            stream.write(record)
+            buckets.append((reference_store_hash(encoded_key), offset))
+            offset += len(record)
+        fields_offset = offset
+        fields = json.dumps(sorted(field_ids, key=field_ids.get)).encode('utf-8')
+        stream.write(fields)
+        table_offset = fields_offset + len(fields)
+        table_size = 1
+        while table_size < 2 * len(buckets):
+            table_size *= 2
+        table = [(0, 0)] * table_size
+        for key_hash, record_offset in buckets:
+            index = key_hash & (table_size - 1)
+            while table[index][1]:
+                index = (index + 1) & (table_size - 1)
+            table[index] = (key_hash, record_offset)
+        for bucket in table:
+            stream.write(REFERENCE_STORE_BUCKET.pack(*bucket))
+        stream.seek(0)
+        stream.write(
+            REFERENCE_STORE_HEADER.pack(REFERENCE_STORE_MAGIC, table_offset, table_size, fields_offset, len(buckets))
+        )
+    os.replace(tmp_filename, filename)
+
+
+class ReferenceRecord(Mapping):
+    '''
+    Read-only view of one record in a ReferenceStore. Fields are only
+    decoded when they are read.
+    '''
+
+    def __init__(self, store, offset):
+        self._store = store
+        self._fields = {}
+        buffer = store._mmap
+        key_length, = REFERENCE_STORE_LENGTH.unpack_from(buffer, offset)
+        offset += REFERENCE_STORE_LENGTH.size + key_length
+        count, = REFERENCE_STORE_LENGTH.unpack_from(buffer, offset)
+        offset += REFERENCE_STORE_LENGTH.size
+        value_offset = offset + count * REFERENCE_STORE_FIELD.size
+        for field_id, length in REFERENCE_STORE_FIELD.iter_unpack(buffer[offset:value_offset]):
+            self._fields[store.fields[field_id]] = (value_offset, length)
+            value_offset += length
+
+    def __getitem__(self, field):
+        offset, length = self._fields[field]
+        return json.loads(self._store._mmap[offset:offset + length])
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+
+class ReferenceStore(Mapping):
+    '''
+    Read-only, memory-mapped mapping of term ID to ReferenceRecord written
+    by write_reference_store. Safe to share between threads and forked
+    workers since nothing is ever written through it.
+    '''
+
+    def __init__(self, filename=REFERENCE_STORE_FILE_NAME):
+        with open(filename, 'rb') as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._table_offset, self._table_size, fields_offset, self._count = (
+            REFERENCE_STORE_HEADER.unpack_from(self._mmap, 0)
+        )
+        if magic != REFERENCE_STORE_MAGIC:
+            raise ValueError('Not a reference store: {}'.format(filename))
+        self.fields = json.loads(self._mmap[fields_offset:self._table_offset])
+
+    def _find(self, key):
+        if not isinstance(key, str):
+            return None
+        encoded_key = key.encode('utf-8')
+        key_hash = reference_store_hash(encoded_key)
+        mask = self._table_size - 1
+        index = key_hash & mask
+        while True:
+            bucket_hash, offset = REFERENCE_STORE_BUCKET.unpack_from(
+                self._mmap, self._table_offset + index * REFERENCE_STORE_BUCKET.size
+            )
+            if not offset:
+                return None
+            if bucket_hash == key_hash:
+                key_length, = REFERENCE_STORE_LENGTH.unpack_from(self._mmap, offset)
+                start = offset + REFERENCE_STORE_LENGTH.size
+                if self._mmap[start:start + key_length] == encoded_key:
+                    return offset
+            index = (index + 1) & mask
+
+    def __getitem__(self, key):
+        offset = self._find(key)
+        if offset is None:
+            raise KeyError(key)
+        return ReferenceRecord(self, offset)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        for index in range(self._table_size):
+            _, offset = REFERENCE_STORE_BUCKET.unpack_from(
+                self._mmap, self._table_offset + index * REFERENCE_STORE_BUCKET.size
+            )
+            if offset:
+                key_length, = REFERENCE_STORE_LENGTH.unpack_from(self._mmap, offset)
+                start = offset + REFERENCE_STORE_LENGTH.size
+                yield self._mmap[start:start + key_length].decode('utf-8')
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._mmap.close()
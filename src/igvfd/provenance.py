@@ -0,0 +1,159 @@
+import threading
+
+from collections import OrderedDict
+from snovault import CONNECTION
+
+from igvfd.embed import call_with_dependencies
+from igvfd.embed import record_dependencies
+
+
+INPUT_FILE_SET_CLOSURE_CACHE = 'igvfd.input_file_set_closure_cache'
+
+DEFAULT_CLOSURE_CACHE_CAPACITY = 10000
+
+FRAME = '@@object?skip_calculated=true'
+
+
+def includeme(config):
+    capacity = int(
+        config.registry.settings.get('provenance_cache.capacity', DEFAULT_CLOSURE_CACHE_CAPACITY)
+    )
+    config.registry[INPUT_FILE_SET_CLOSURE_CACHE] = ClosureCache(capacity=capacity)
+
+
+class ClosureCache:
+    '''
+    Process wide LRU of input_file_sets closures keyed by the uuid of the
+    analysis set and the effective principals of the request, since the
+    embeds a closure is built from depend on what those may view. Each
+    entry also holds the uuids the closure was built from
+    and the max sid among them. Every write gets a new, higher sid so an
+    entry is only used until the set or anything it reached is edited.
+    '''
+
+    def __init__(self, capacity=DEFAULT_CLOSURE_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, max_sid):
+        if max_sid is None:
+            return None
+        with self.lock:
+            value = self.cache.get(key)
+            if value is None or value[0] != max_sid:
+                return None
+            self.cache.move_to_end(key)
+            return value
+
+    def peek_dependencies(self, key):
+        with self.lock:
+            value = self.cache.get(key)
+            return None if value is None else value[2] | value[3]
+
+    def set(self, key, max_sid, closure, embedded_uuids, linked_uuids):
+        with self.lock:
+            self.cache[key] = (max_sid, closure, embedded_uuids, linked_uuids)
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+def _count(request, name):
+    stats = getattr(request, '_stats', None)
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + 1
+
+
+def get_max_sid(request, uuids):
+    connection = request.registry[CONNECTION]
+    max_sid = None
+    for uuid in uuids:
+        item = connection.get_by_uuid(str(uuid))
+        # Items written in the current transaction have no sid yet.
+        if item is None or item.sid is None:
+            return None
+        if max_sid is None or item.sid > max_sid:
+            max_sid = item.sid
+    return max_sid
+
+
+def _get_item_type(path):
+    if path.startswith('/measurement-sets/'):
+        return 'MeasurementSet'
+    if path.startswith('/analysis-sets/'):
+        return 'AnalysisSet'
+    return 'FileSet'
+
+
+def _build_input_file_set_closure(request, input_file_sets):
+    direct_file_sets = set(input_file_sets)
+    inspected_file_sets = set()
+    file_sets_to_inspect = list(input_file_sets)
+    closure = []
+    while file_sets_to_inspect:
+        file_set = file_sets_to_inspect.pop()
+        if file_set in inspected_file_sets:
+            continue
+        inspected_file_sets.add(file_set)
+        file_set_object = request.memoized_embed(file_set, FRAME)
+        item_type = _get_item_type(file_set)
+        assay_title = None
+        if item_type == 'MeasurementSet':
+            assay_title = file_set_object.get('preferred_assay_title')
+            if not assay_title:
+                assay_title = request.memoized_embed(file_set_object['assay_term'], FRAME)['term_name']
+        elif item_type == 'AnalysisSet':
+            for candidate_file_set in file_set_object.get('input_file_sets', []):
+                if candidate_file_set not in inspected_file_sets:
+                    file_sets_to_inspect.append(candidate_file_set)
+        closure.append(
+            {
+                '@id': file_set,
+                'item_type': item_type,
+                'file_set_type': file_set_object.get('file_set_type'),
+                'assay_title': assay_title,
+                'direct': file_set in direct_file_sets,
+            }
+        )
+    return closure
+
+
+def get_input_file_set_closure(request, analysis_set, input_file_sets):
+    '''
+    Returns every file set reachable from the analysis set through
+    input_file_sets (recursing through analysis sets only) as a list of
+    dicts with @id, item_type, file_set_type, assay_title and whether it is
+    a direct input. Shared by provenance based calculated properties and
+    must be treated as read-only.
+    '''
+    cache = request.registry.get(INPUT_FILE_SET_CLOSURE_CACHE)
+    uuid = str(analysis_set.uuid)
+    key = (uuid, frozenset(request.effective_principals))
+    if cache is not None:
+        dependencies = cache.peek_dependencies(key)
+        if dependencies is not None:
+            value = cache.get(key, get_max_sid(request, dependencies | {uuid}))
+            if value is not None:
+                _count(request, 'provenance_cache_hits')
+                _, closure, embedded_uuids, linked_uuids = value
+                # Recording the dependencies keeps the invalidation queue
+                # reindexing this set when anything in its closure changes.
+                record_dependencies(request, embedded_uuids, linked_uuids)
+                return closure
+    _count(request, 'provenance_cache_misses')
+    closure, embedded_uuids, linked_uuids = call_with_dependencies(
+        request,
+        _build_input_file_set_closure,
+        request,
+        input_file_sets,
+    )
+    if cache is not None:
+        max_sid = get_max_sid(request, embedded_uuids | linked_uuids | {uuid})
+        if max_sid is not None:
+            cache.set(key, max_sid, closure, embedded_uuids, linked_uuids)
+    return closure
@@ -4,22 +4,85 @@ from pyramid.view import view_config
 from snovault import TYPES
 from snovault.elasticsearch.searches.interfaces import SEARCH_CONFIG
 from snosearch.parsers import QueryString
-from snovault.compat import bytes_
-from igvfd.searches.generator import search_generator
+from igvfd.searches.generator import sliced_search_generator
 
 import datetime
+import io
 import re
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 # Those columns contain href value
 HREF_COLUMN_KEYS = ['href', 'attachment', 'attachment.href', 'files.href']
 
+# Those href columns are relative to the item (@@download) rather than the site
+ITEM_RELATIVE_HREF_COLUMN_KEYS = ['attachment', 'attachment.href']
+
+# Those href columns are embedded in an object
+EMBEDDED_HREF_COLUMN_KEYS = ['attachment']
+
+# format= values that download the report as a compressed file
+COMPRESSED_REPORT_FORMATS = {
+    'tsv.gz': 'gzip',
+    'tsv.zst': 'zstd',
+}
+
+COMPRESSED_CONTENT_TYPES = {
+    'gzip': 'application/gzip',
+    'zstd': 'application/zstd',
+}
+
+# Compressed output is flushed after the first row and then every this many
+# rows, so clients get the header immediately.
+ROWS_PER_COMPRESSED_CHUNK = 1000
+
+COLUMNAR_REPORT_ROUTES = {
+    'report_parquet_download': 'parquet',
+    'report_arrow_download': 'arrow',
+}
+
+COLUMNAR_CONTENT_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+# Rows per record batch (and Parquet row group) in columnar reports.
+COLUMNAR_BATCH_SIZE = 10000
+
 
 def includeme(config):
     config.add_route('report_download', '/report.tsv')
     config.add_route('multitype_report_download', '/multireport.tsv')
+    config.add_route('report_parquet_download', '/report.parquet')
+    config.add_route('report_arrow_download', '/report.arrow')
     config.scan(__name__, categories=None)
 
 
+def _dedupe_column_nodes(nodes):
+    # if we ended with an embedded object, show the @id
+    if nodes and hasattr(nodes[0], '__contains__') and '@id' in nodes[0]:
+        nodes = [node['@id'] for node in nodes]
+    # Dict keys act as an ordered set.
+    return list(dict.fromkeys(
+        str(n) if isinstance(n, (dict, list)) else n
+        for n in nodes
+    ))
+
+
+def _format_column_nodes(nodes):
+    return u','.join(u'{}'.format(n) for n in _dedupe_column_nodes(nodes))
+
+
 def lookup_column_value(value, path):
     nodes = [value]
     names = path.split('.')
@@ -36,57 +99,179 @@ def lookup_column_value(value, path):
         nodes = nextnodes
         if not nodes:
             return ''
-    # if we ended with an embedded object, show the @id
-    if nodes and hasattr(nodes[0], '__contains__') and '@id' in nodes[0]:
-        nodes = [node['@id'] for node in nodes]
-    deduped_nodes = []
-    for n in nodes:
-        if isinstance(n, dict):
-            n = str(n)
-        if n not in deduped_nodes:
-            deduped_nodes.append(n)
-    return u','.join(u'{}'.format(n) for n in deduped_nodes)
+    return _format_column_nodes(nodes)
+
+
+class _ColumnNode:
+
+    __slots__ = ('children', 'column_indexes')
+
+    def __init__(self):
+        self.children = {}
+        self.column_indexes = []
+
+
+class ColumnProjector:
+    '''
+    Compiles dotted column paths into a prefix tree once so that
+    projecting a row walks each shared prefix (e.g. samples.sample_terms)
+    a single time instead of once per column. Returns the same values as
+    calling lookup_column_value for every path.
+    '''
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.root = _ColumnNode()
+        for index, path in enumerate(self.paths):
+            node = self.root
+            for name in path.split('.'):
+                node = node.children.setdefault(name, _ColumnNode())
+            node.column_indexes.append(index)
+
+    def _walk(self, nodes, column_node, values, finalize):
+        for name, child in column_node.children.items():
+            nextnodes = []
+            for node in nodes:
+                if not isinstance(node, dict) or name not in node:
+                    continue
+                value = node[name]
+                if isinstance(value, list):
+                    nextnodes.extend(value)
+                else:
+                    nextnodes.append(value)
+            if not nextnodes:
+                continue
+            if child.column_indexes:
+                formatted = finalize(nextnodes)
+                for index in child.column_indexes:
+                    values[index] = formatted
+            if child.children:
+                self._walk(nextnodes, child, values, finalize)
+
+    def project(self, item):
+        values = [''] * len(self.paths)
+        self._walk([item], self.root, values, _format_column_nodes)
+        return values
+
+    def project_values(self, item):
+        """Like project but returns the deduplicated values of each column
+        as a list instead of a comma-joined string."""
+        values = [[] for _ in self.paths]
+        self._walk([item], self.root, values, _dedupe_column_nodes)
+        return values
 
 
 def format_row(columns):
     """Format a list of text columns as a tab-separated byte string."""
-    return b'\t'.join([bytes_(' '.join(c.strip('\t\n\r').split()), 'utf-8') for c in columns]) + b'\r\n'
+    return ('\t'.join([' '.join(c.split()) for c in columns]) + '\r\n').encode('utf-8')
+
+
+def _prefix_hrefs(value, prefix):
+    # Comma-joined lists of hrefs (e.g. files.href) get every entry prefixed.
+    if not value:
+        return value
+    return prefix + value.replace(',', ',' + prefix)
+
 
+def _prefix_embedded_href(value, prefix):
+    # Embedded attachment objects are shown as a dict string.
+    return value.replace("'href': '", "'href': '" + prefix, 1)
 
-def format_row_full_url(columns, href_index, host_url, id):
+
+class HrefRewritePlan:
+    '''
+    Precomputed rewrites that turn the href columns of a report into full
+    URLs. Built once from HREF_COLUMN_KEYS and the column order, so the
+    per-row work is prefix concatenation.
+    '''
+
+    def __init__(self, column_keys, host_url):
+        self.host_url = host_url
+        self.rewrites = []
+        for index, key in enumerate(column_keys):
+            if key not in HREF_COLUMN_KEYS:
+                continue
+            rewrite = _prefix_embedded_href if key in EMBEDDED_HREF_COLUMN_KEYS else _prefix_hrefs
+            self.rewrites.append((index, rewrite, key in ITEM_RELATIVE_HREF_COLUMN_KEYS))
+
+    def apply(self, values, id):
+        item_url = self.host_url + id
+        for index, rewrite, item_relative in self.rewrites:
+            values[index] = rewrite(values[index], item_url if item_relative else self.host_url)
+        return values
+
+
+def format_row_full_url(columns, href_plan, id):
     """Format a list of text columns as a tab-separated byte string. add host_url to href to form a full length url"""
-    row = []
-    for index, column in enumerate(columns):
-        ls = column.strip('\t\n\r').split()
-        if index in href_index:
-            # href is not embedded, append host_url directly
-            if len(ls) == 1:
-                # files.href, FileSet can have more than one file in files
-                if ',' in ls[0]:
-                    files = ls[0].split(',')
-                    files_with_host_url = []
-                    for file in files:
-                        file = host_url + file.strip()
-                        files_with_host_url.append(file)
-                    ls[0] = ','.join(files_with_host_url)
-
-                # attachment.href
-                elif ls[0].startswith('@@download'):
-                    ls[0] = host_url + id + ls[0]
-                # href from File or files.href when there is one file in FileSet
-                else:
-                    ls[0] = host_url + ls[0]
-            # href is embedded
-            elif len(ls) > 1:
-                for index, item in enumerate(ls):
-                    if ''.join([i for i in item if i.isalpha()]) == 'href':
-                        embedded_index = index + 1
-                        break
-                if embedded_index:
-                    ls[embedded_index] = ls[embedded_index][0] + host_url + id + ls[embedded_index][1:]
+    return format_row(href_plan.apply(columns, id))
 
-        row.append(bytes_(' '.join(ls), 'utf-8'))
-    return b'\t'.join(row) + b'\r\n'
+
+def add_field_params_for_columns(request, columns):
+    """Request only the report columns (and @id) from the search generator.
+    Field params are passed through to OpenSearch as _source includes, so the
+    full embedded documents are never transferred or decoded."""
+    fields_requested = request.params.getall('field')
+    for field in ['@id'] + list(columns):
+        if field not in fields_requested:
+            request.GET.add('field', field)
+            fields_requested.append(field)
+
+
+def compress_rows(rows, encoding, rows_per_chunk=ROWS_PER_COMPRESSED_CHUNK):
+    """Incrementally compress a stream of rows with gzip or zstd."""
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor().compressobj()
+        sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    else:
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        sync_flush = zlib.Z_SYNC_FLUSH
+    for index, row in enumerate(rows, start=1):
+        chunk = compressor.compress(row)
+        if index == 1 or index % rows_per_chunk == 0:
+            chunk += compressor.flush(sync_flush)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def get_available_encodings():
+    if zstandard is not None:
+        return ['zstd', 'gzip']
+    return ['gzip']
+
+
+def negotiate_report_encoding(request):
+    if 'Accept-Encoding' not in request.headers:
+        return None
+    offers = request.accept_encoding.acceptable_offers(get_available_encodings())
+    if offers:
+        return offers[0][0]
+    return None
+
+
+def stream_report_response(request, rows, filename):
+    """Set up a streaming (chunked) TSV response, compressed either as a
+    file (format=tsv.gz or tsv.zst) or as a negotiated Content-Encoding."""
+    file_format = request.params.get('format')
+    if file_format in COMPRESSED_REPORT_FORMATS:
+        encoding = COMPRESSED_REPORT_FORMATS[file_format]
+        if encoding not in get_available_encodings():
+            msg = 'Report format {} is not available.'.format(file_format)
+            raise HTTPBadRequest(explanation=msg)
+        request.response.content_type = COMPRESSED_CONTENT_TYPES[encoding]
+        filename = '{}.{}'.format(filename, file_format)
+        rows = compress_rows(rows, encoding)
+    else:
+        request.response.content_type = 'text/tsv'
+        filename = '{}.tsv'.format(filename)
+        request.response.vary = (request.response.vary or ()) + ('Accept-Encoding',)
+        encoding = negotiate_report_encoding(request)
+        if encoding is not None:
+            request.response.content_encoding = encoding
+            rows = compress_rows(rows, encoding)
+    request.response.content_disposition = 'attachment;filename="{}"'.format(filename)
+    request.response.app_iter = rows
+    return request.response
 
 
 def _convert_camel_to_snake(type_str):
@@ -94,10 +279,7 @@ def _convert_camel_to_snake(type_str):
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', tmp).lower()
 
 
-@view_config(route_name='report_download', request_method='GET')
-def report_download(context, request):
-    downloadtime = datetime.datetime.now()
-
+def get_single_type_report_columns(request):
     types = request.params.getall('type')
     if len(types) != 1:
         msg = 'Report view requires specifying a single type.'
@@ -109,11 +291,21 @@ def report_download(context, request):
     schema = request.registry[TYPES][type_str].schema
     search_config = request.registry[SEARCH_CONFIG].as_dict()[type_str]
     columns = list_visible_columns_for_schemas(request, schema, search_config)
+    return type_str, schema, columns
+
+
+@view_config(route_name='report_download', request_method='GET')
+def report_download(context, request):
+    downloadtime = datetime.datetime.now()
+
+    type_str, schema, columns = get_single_type_report_columns(request)
     snake_type = _convert_camel_to_snake(type_str).replace("'", '')
-    results = search_generator(request)
+    query_string = request.query_string
+    add_field_params_for_columns(request, columns)
+    results = sliced_search_generator(request)
 
     def format_header():
-        newheader = '%s\t%s%s?%s\r\n' % (downloadtime, request.host_url, '/report/', request.query_string)
+        newheader = '%s\t%s%s?%s\r\n' % (downloadtime, request.host_url, '/report/', query_string)
         return(bytes(newheader, 'utf-8'))
 
     # Work around Excel bug; can't open single column TSV with 'ID' header
@@ -121,17 +313,16 @@ def report_download(context, request):
         columns['@id']['title'] = 'id'
 
     header = [column.get('title') or field for field, column in columns.items()]
+    projector = ColumnProjector(columns)
 
     def generate_rows():
         yield format_header()
         yield format_row(header)
         for item in results['@graph']:
-            values = [lookup_column_value(item, path) for path in columns]
-            yield format_row(values)
+            yield format_row(projector.project(item))
 
     # Stream response using chunked encoding.
-    request.response.content_type = 'text/tsv'
-    request.response.content_disposition = 'attachment;filename="{}_report_{}_{}_{}_{}h_{}m.tsv"'.format(
+    filename = '{}_report_{}_{}_{}_{}h_{}m'.format(
         snake_type,
         downloadtime.year,
         downloadtime.month,
@@ -139,7 +330,174 @@ def report_download(context, request):
         downloadtime.hour,
         downloadtime.minute
     )
-    request.response.app_iter = generate_rows()
+    return stream_report_response(request, generate_rows(), filename)
+
+
+def _get_schema_type(schema):
+    """Returns the JSON schema type of a property, reducing a list of types
+    to its single non-null type, or to string when there are several."""
+    schema_type = schema.get('type')
+    if isinstance(schema_type, list):
+        schema_types = [name for name in schema_type if name != 'null']
+        return schema_types[0] if len(schema_types) == 1 else 'string'
+    return schema_type
+
+
+def _get_column_property_schema(schema, path):
+    """Follow a dotted column path through a schema. Returns the leaf
+    property schema, or None if the path leaves this schema (e.g. through a
+    linkTo), and whether any step along the way is an array."""
+    is_list = False
+    for name in path.split('.'):
+        if name in ('@id', 'uuid'):
+            return {'type': 'string'}, is_list
+        properties = schema.get('properties', {})
+        if name not in properties:
+            return None, is_list
+        schema = properties[name]
+        if _get_schema_type(schema) == 'array':
+            is_list = True
+            schema = schema.get('items', {})
+        if 'linkTo' in schema or 'linkFrom' in schema:
+            schema = {'type': 'string'}
+    return schema, is_list
+
+
+ARROW_TYPES_AND_CONVERTERS = {
+    'integer': ('int64', int),
+    'number': ('float64', float),
+    'boolean': ('bool_', bool),
+}
+
+
+def get_arrow_column(schema, path, title):
+    """Returns an Arrow field for a report column and a function converting
+    the projected values of a row to the field type."""
+    property_schema, is_list = _get_column_property_schema(schema, path)
+    if property_schema is None:
+        property_schema = {}
+    arrow_type_name, convert = ARROW_TYPES_AND_CONVERTERS.get(
+        _get_schema_type(property_schema),
+        ('string', str)
+    )
+    arrow_type = getattr(pyarrow, arrow_type_name)()
+    metadata = {'title': title}
+    if is_list:
+        field = pyarrow.field(path, pyarrow.list_(arrow_type), metadata=metadata)
+        return field, lambda values: [convert(value) for value in values]
+    field = pyarrow.field(path, arrow_type, metadata=metadata)
+    if convert is str:
+        # Unexpected multiple values in a scalar column are comma-joined like in TSV.
+        return field, lambda values: ','.join(str(value) for value in values) if values else None
+    return field, lambda values: convert(values[0]) if values else None
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that holds written bytes until drained, so
+    that Arrow writers can stream their output."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _iter_record_batches(items, projector, arrow_schema, converters, batch_size):
+    columns = [[] for _ in converters]
+    size = 0
+    for item in items:
+        for column, convert, values in zip(columns, converters, projector.project_values(item)):
+            column.append(convert(values))
+        size += 1
+        if size >= batch_size:
+            yield pyarrow.RecordBatch.from_arrays(columns, schema=arrow_schema)
+            columns = [[] for _ in converters]
+            size = 0
+    if size:
+        yield pyarrow.RecordBatch.from_arrays(columns, schema=arrow_schema)
+
+
+def generate_columnar_report(items, projector, arrow_schema, converters, file_format,
+                             batch_size=COLUMNAR_BATCH_SIZE):
+    """Write search results as Parquet or Arrow IPC, one record batch at a
+    time, yielding the bytes written for each batch."""
+    sink = _ChunkSink()
+    if file_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(sink, arrow_schema)
+    else:
+        writer = pyarrow.ipc.new_file(sink, arrow_schema)
+    for batch in _iter_record_batches(items, projector, arrow_schema, converters, batch_size):
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+@view_config(route_name='report_parquet_download', request_method='GET')
+@view_config(route_name='report_arrow_download', request_method='GET')
+def report_columnar_download(context, request):
+    downloadtime = datetime.datetime.now()
+    file_format = COLUMNAR_REPORT_ROUTES[request.matched_route.name]
+    if pyarrow is None:
+        msg = 'Report format {} is not available.'.format(file_format)
+        raise HTTPBadRequest(explanation=msg)
+
+    type_str, schema, columns = get_single_type_report_columns(request)
+    snake_type = _convert_camel_to_snake(type_str).replace("'", '')
+    query_string = request.query_string
+    add_field_params_for_columns(request, columns)
+    results = sliced_search_generator(request)
+
+    fields = []
+    converters = []
+    for path, column in columns.items():
+        field, convert = get_arrow_column(schema, path, column.get('title') or path)
+        fields.append(field)
+        converters.append(convert)
+    arrow_schema = pyarrow.schema(
+        fields,
+        metadata={
+            'report_url': '{}{}?{}'.format(request.host_url, '/report/', query_string),
+            'download_time': str(downloadtime),
+        }
+    )
+    projector = ColumnProjector(columns)
+
+    request.response.content_type = COLUMNAR_CONTENT_TYPES[file_format]
+    request.response.content_disposition = 'attachment;filename="{}_report_{}_{}_{}_{}h_{}m.{}"'.format(
+        snake_type,
+        downloadtime.year,
+        downloadtime.month,
+        downloadtime.day,
+        downloadtime.hour,
+        downloadtime.minute,
+        file_format
+    )
+    request.response.app_iter = generate_columnar_report(
+        results['@graph'],
+        projector,
+        arrow_schema,
+        converters,
+        file_format
+    )
     return request.response
 
 
@@ -205,10 +563,12 @@ def multitype_report_download(context, request):
 
     # Make sure we get all results
     request.GET['limit'] = 'all'
-    results = search_generator(request)
+    query_string = request.query_string
+    add_field_params_for_columns(request, columns)
+    results = sliced_search_generator(request)
 
     def format_header():
-        newheader = '%s\t%s%s?%s\r\n' % (downloadtime, request.host_url, '/multireport/', request.query_string)
+        newheader = '%s\t%s%s?%s\r\n' % (downloadtime, request.host_url, '/multireport/', query_string)
         return(bytes(newheader, 'utf-8'))
 
     # Work around Excel bug; can't open single column TSV with 'ID' header
@@ -217,22 +577,19 @@ def multitype_report_download(context, request):
 
     header_row = [column.get('title') or field for field, column in columns.items()]
     columns_keys = list(columns.keys())
-    href_index = []
-    for index, item in enumerate(columns_keys):
-        if item in HREF_COLUMN_KEYS:
-            href_index.append(index)
+    href_plan = HrefRewritePlan(columns_keys, request.host_url)
+    projector = ColumnProjector(columns_keys)
 
     def generate_rows():
         yield format_header()
         yield format_row(header_row)
         for item in results['@graph']:
             id = item['@id']
-            values = [lookup_column_value(item, path) for path in columns]
-            yield format_row_full_url(values, href_index, request.host_url, id)
+            values = projector.project(item)
+            yield format_row_full_url(values, href_plan, id)
 
     # Stream response using chunked encoding.
-    request.response.content_type = 'text/tsv'
-    request.response.content_disposition = 'attachment;filename="igvf_{}_report_{}_{}_{}_{}h_{}m.tsv"'.format(
+    filename = 'igvf_{}_report_{}_{}_{}_{}h_{}m'.format(
         report_type,
         downloadtime.year,
         downloadtime.month,
@@ -240,8 +597,7 @@ def multitype_report_download(context, request):
         downloadtime.hour,
         downloadtime.minute
     )
-    request.response.app_iter = generate_rows()
-    return request.response
+    return stream_report_response(request, generate_rows(), filename)
 
 # only return the columns of the concrete types if the type is returned in search restult
 
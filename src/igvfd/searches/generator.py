@@ -1,10 +1,27 @@
+import itertools
+import queue
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
 from snosearch.responses import FieldedGeneratorResponse
 from snosearch.parsers import ParamsParser
 from snosearch.fields import BasicSearchResponseField
+from snosearch.queries import BasicSearchQueryFactory
 from igvfd.searches.defaults import DEFAULT_ITEM_TYPES
 from igvfd.searches.defaults import RESERVED_KEYS
 
 
+DEFAULT_SLICES = 4
+
+DEFAULT_MAX_PAGES_IN_FLIGHT = 8
+
+DEFAULT_PAGE_SIZE = 1000
+
+DEFAULT_SCROLL = '5m'
+
+_SLICE_DONE = object()
+
+
 def search_generator(request):
     '''
     For internal use (no view). Like search_quick but returns raw generator
@@ -22,3 +39,100 @@ def search_generator(request):
         ]
     )
     return fgr.render()
+
+
+def _acquire_page(budget, stop):
+    # Blocks while the slice is at its in-flight budget, but gives up
+    # as soon as the consumer goes away.
+    while not stop.is_set():
+        if budget.acquire(timeout=0.1):
+            return True
+    return False
+
+
+def _scan_slice(search, slice_id, slices, page_size, frame, pages, budget, stop, scroll):
+    try:
+        if slices > 1:
+            search = search.extra(slice={'id': slice_id, 'max': slices})
+        hits = (
+            hit.to_dict().get(frame, {})
+            for hit in search.params(size=page_size, scroll=scroll).scan()
+        )
+        # A page counts towards the budget from before it is fetched until
+        # the consumer has yielded all of it.
+        while _acquire_page(budget, stop):
+            page = list(itertools.islice(hits, page_size))
+            if page:
+                pages.put(page)
+            if len(page) < page_size:
+                break
+        else:
+            return
+    except Exception as e:
+        pages.put(e)
+        return
+    pages.put(_SLICE_DONE)
+
+
+def _iter_sliced_hits(search, slices, max_pages_in_flight, page_size, frame, scroll=DEFAULT_SCROLL):
+    stop = threading.Event()
+    # Each slice gets an equal share of the page budget, and at least one
+    # page, so that at most max_pages_in_flight pages are held at once.
+    slices = max(1, min(slices, max_pages_in_flight))
+    slice_pages = [
+        (queue.Queue(), threading.Semaphore(max_pages_in_flight // slices))
+        for _ in range(slices)
+    ]
+    executor = ThreadPoolExecutor(max_workers=slices)
+    try:
+        for slice_id, (pages, budget) in enumerate(slice_pages):
+            executor.submit(_scan_slice, search, slice_id, slices, page_size, frame, pages, budget, stop, scroll)
+        # Take one page from each slice in turn so that every scroll keeps
+        # advancing and none sits idle past its keepalive while the others
+        # are streamed. The order is stable for a given number of slices.
+        active = list(slice_pages)
+        while active:
+            for pages, budget in list(active):
+                page = pages.get()
+                if page is _SLICE_DONE:
+                    active.remove((pages, budget))
+                    continue
+                if isinstance(page, Exception):
+                    raise page
+                yield from page
+                budget.release()
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def sliced_search_generator(request, slices=None, max_pages_in_flight=None, page_size=None):
+    '''
+    Like search_generator but scans the results as parallel sliced scrolls.
+    Slices are fetched concurrently on a thread pool and yielded a page from
+    each slice at a time, with memory bounded by max_pages_in_flight pages of
+    page_size hits (so at most max_pages_in_flight slices are used). Scans do not keep a sort order, so requests with a sort
+    use a single search_generator scan instead.
+    '''
+    settings = request.registry.settings
+    if slices is None:
+        slices = int(settings.get('search_generator.slices', DEFAULT_SLICES))
+    if slices <= 1 or request.params.get('sort'):
+        return search_generator(request)
+    if max_pages_in_flight is None:
+        max_pages_in_flight = int(
+            settings.get('search_generator.max_pages_in_flight', DEFAULT_MAX_PAGES_IN_FLIGHT)
+        )
+    if page_size is None:
+        page_size = int(settings.get('search_generator.page_size', DEFAULT_PAGE_SIZE))
+    query_factory = BasicSearchQueryFactory(
+        params_parser=ParamsParser(request),
+        default_item_types=DEFAULT_ITEM_TYPES,
+        reserved_keys=RESERVED_KEYS,
+    )
+    search = query_factory.build_query()
+    frame = request.params.get('frame', 'embedded')
+    scroll = settings.get('search_generator.scroll', DEFAULT_SCROLL)
+    return {
+        '@graph': _iter_sliced_hits(search, slices, max_pages_in_flight, page_size, frame, scroll)
+    }
@@ -29,3 +29,45 @@ def lookup_column_value_validate():
         '@type': 'Experiment,Dataset,Item'
     }
     return valid
+
+
+@pytest.fixture
+def column_projector_item():
+    item = {
+        '@id': '/measurement-sets/IGVFDS0000001/',
+        'accession': 'IGVFDS0000001',
+        'files': [
+            {'@id': '/sequence-files/IGVFFI0000001/', 'file_format': 'fastq'},
+            {'@id': '/sequence-files/IGVFFI0000002/', 'file_format': 'fastq'},
+        ],
+        'samples': [
+            {
+                '@id': '/tissues/IGVFSM0000001/',
+                'sample_terms': [{'@id': '/sample-terms/UBERON_0002048/', 'term_name': 'lung'}],
+            },
+            {
+                '@id': '/tissues/IGVFSM0000002/',
+                'sample_terms': [{'@id': '/sample-terms/UBERON_0002048/', 'term_name': 'lung'}],
+            },
+        ],
+        'lab': {'@id': '/labs/j-michael-cherry/', 'title': 'J. Michael Cherry, Stanford'},
+    }
+    return item
+
+
+@pytest.fixture
+def columnar_report_schema():
+    schema = {
+        'properties': {
+            'accession': {'type': 'string'},
+            'file_size': {'type': 'integer'},
+            'read_count': {'type': 'integer'},
+            'lab': {'type': 'string', 'linkTo': 'Lab'},
+            'files': {
+                'type': 'array',
+                'items': {'type': ['string', 'object'], 'linkFrom': 'File.file_set'},
+            },
+            'aliases': {'type': 'array', 'items': {'type': 'string'}},
+        }
+    }
+    return schema
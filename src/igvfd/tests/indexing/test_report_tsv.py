@@ -27,6 +27,38 @@ def test_batch_download_report_download(workbook, testapp):
     ]
 
 
+def test_batch_download_report_download_compressed(workbook, testapp):
+    import gzip
+    plain = testapp.get('/report.tsv?type=Award&sort=accession')
+    res = testapp.get('/report.tsv?type=Award&sort=accession&format=tsv.gz')
+    assert res.headers['content-type'] == 'application/gzip'
+    disposition = res.headers['content-disposition']
+    assert disposition.startswith('attachment;filename="award_report') and disposition.endswith('.tsv.gz"')
+    lines = gzip.decompress(res.body).splitlines()
+    assert lines[1:] == plain.body.splitlines()[1:]
+    res = testapp.get('/report.tsv?type=Award&sort=accession', headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['content-encoding'] == 'gzip'
+    assert res.headers['content-disposition'].endswith('.tsv"')
+    assert gzip.decompress(res.body).splitlines()[1:] == plain.body.splitlines()[1:]
+
+
+def test_batch_download_report_download_columnar(workbook, testapp):
+    pyarrow = pytest.importorskip('pyarrow')
+    import io
+    import pyarrow.parquet
+    tsv = testapp.get('/report.tsv?type=Award&sort=accession')
+    res = testapp.get('/report.parquet?type=Award&sort=accession')
+    assert res.headers['content-type'] == 'application/vnd.apache.parquet'
+    disposition = res.headers['content-disposition']
+    assert disposition.startswith('attachment;filename="award_report') and disposition.endswith('.parquet"')
+    table = pyarrow.parquet.read_table(io.BytesIO(res.body))
+    assert table.num_rows == len(tsv.body.splitlines()) - 2
+    res = testapp.get('/report.arrow?type=Award&field=title&field=@id')
+    assert res.headers['content-type'] == 'application/vnd.apache.arrow.file'
+    table = pyarrow.ipc.open_file(io.BytesIO(res.body)).read_all()
+    assert table.column_names == ['title', '@id']
+
+
 def test_batch_download_human_donor_report_download(workbook, testapp):
     res = testapp.get('/report.tsv?type=HumanDonor&sort=accession')
     disposition = res.headers['content-disposition']
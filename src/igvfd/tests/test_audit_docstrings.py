@@ -0,0 +1,75 @@
+import pytest
+
+
+def make_audit_module(**functions):
+    import types
+    module = types.ModuleType('igvfd.tests.audit_docstring_module')
+    for name, function in functions.items():
+        setattr(module, name, function)
+    return module
+
+
+def test_audit_docstrings_register_audit_docstrings():
+    from igvfd.tests.fixtures.audit_docstring import (
+        function_with_docstring_out_of_order,
+        function_without_docstring,
+    )
+    from igvfd.audit.docstrings import register_audit_docstrings
+    from igvfd.audit.formatter import (
+        get_audit_category,
+        get_audit_description,
+        get_audit_level,
+    )
+    module = make_audit_module(
+        audit_out_of_order=function_with_docstring_out_of_order,
+        audit_without_docstring=function_without_docstring,
+        audit_link=function_with_docstring_out_of_order,
+    )
+    assert register_audit_docstrings([module]) == {
+        'igvfd.tests.audit_docstring_module.audit_out_of_order': [
+            {
+                'audit_description': 'audit description',
+                'audit_category': 'audit category',
+                'audit_level': 'WARNING'
+            }
+        ],
+        'igvfd.tests.audit_docstring_module.audit_without_docstring': {},
+    }
+    assert get_audit_description(function_with_docstring_out_of_order) == 'audit description'
+    assert get_audit_category(function_with_docstring_out_of_order) == 'audit category'
+    assert get_audit_level(function_with_docstring_out_of_order) == 'WARNING'
+    assert get_audit_description(function_without_docstring) is None
+
+
+def test_audit_docstrings_register_audit_docstrings_improper_keys():
+    from igvfd.tests.fixtures.audit_docstring import function_with_docstring_improper_keys
+    from igvfd.audit.docstrings import register_audit_docstrings
+    module = make_audit_module(audit_improper_keys=function_with_docstring_improper_keys)
+    with pytest.raises(ValueError, match='audit_improper_keys must have exactly the keys'):
+        register_audit_docstrings([module])
+
+
+def test_audit_docstrings_register_audit_docstrings_invalid_json():
+    from igvfd.tests.fixtures.audit_docstring import function_with_docstring
+    from igvfd.audit.docstrings import register_audit_docstrings
+    module = make_audit_module(audit_invalid_json=function_with_docstring)
+    with pytest.raises(ValueError, match='is not valid JSON format'):
+        register_audit_docstrings([module])
+
+
+def test_audit_docstrings_register_audit_docstrings_unknown_level():
+    from igvfd.audit.docstrings import register_audit_docstrings
+
+    def audit_unknown_level(value, system):
+        '''
+        [
+            {
+                "audit_description": "audit description",
+                "audit_category": "audit category",
+                "audit_level": "CRITICAL"
+            }
+        ]
+        '''
+    module = make_audit_module(audit_unknown_level=audit_unknown_level)
+    with pytest.raises(ValueError, match='has unknown level CRITICAL'):
+        register_audit_docstrings([module])
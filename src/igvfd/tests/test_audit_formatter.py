@@ -0,0 +1,18 @@
+def test_audit_formatter_path_to_link():
+    from igvfd.audit.formatter import (
+        audit_link,
+        path_to_link,
+        path_to_text,
+        paths_to_links,
+    )
+    paths = [
+        '/sequence-files/IGVFFI0000SEQU/',
+        '/sample-terms/EFO_0002067/',
+        '/sequence-files/IGVFFI0000SEQU/',
+        'IGVFFI0000SEQU',
+    ]
+    assert path_to_text(paths[0]) == 'IGVFFI0000SEQU'
+    assert path_to_text(paths[3]) is None
+    assert path_to_link(paths[1]) == '[EFO_0002067](/sample-terms/EFO_0002067/)'
+    assert paths_to_links(paths) == [audit_link(path_to_text(path), path) for path in paths]
+    assert paths_to_links([]) == []
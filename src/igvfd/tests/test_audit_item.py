@@ -54,3 +54,48 @@ def test_audit_item_schema_upgrade_validation_failure(testapp, item_donor):
     assert any(
         error['category'] == 'validation error: status' and error['name'] == 'audit_item_schema'
         for error in errors_list)
+
+
+def test_audit_item_schema_reuses_result_for_unchanged_item(mocker):
+    from igvfd.audit.item import (
+        AUDIT_SCHEMA_HASHES,
+        audit_item_schema,
+    )
+    from igvfd.audit.tracking import (
+        AUDIT_RESULT_CACHE,
+        AuditResultCache,
+    )
+    validate = mocker.patch('igvfd.audit.item.validate', return_value=({}, []))
+    query_max_sid = mocker.patch('igvfd.audit.item.query_max_sid', return_value=5)
+    context = mocker.Mock()
+    context.schema = {'type': 'object'}
+    context.properties = {'schema_version': '1'}
+    context.type_info.name = 'Donor'
+    context.type_info.schema = context.schema
+    context.type_info.schema_version = '1'
+    context.uuid = '3e1d5b92-5e6a-4b8f-9b2e-0a1c7d4e6f80'
+    context.sid = 1
+    context.links.return_value = {'lab': ['a0b1c2d3-0000-4000-8000-000000000001']}
+    system = {
+        'request': mocker.Mock(),
+        'context': context,
+        'registry': {AUDIT_RESULT_CACHE: AuditResultCache(capacity=10)},
+    }
+    value = {'@id': '/human-donors/IGVFDO0000DONR/', '@type': ['HumanDonor']}
+    assert list(audit_item_schema(value, system)) == []
+    assert list(audit_item_schema(value, system)) == []
+    assert validate.call_count == 1
+    context.sid = 2
+    assert list(audit_item_schema(value, system)) == []
+    assert validate.call_count == 2
+    system['registry'][AUDIT_SCHEMA_HASHES]['Donor'] = 'hash of a changed schema'
+    assert list(audit_item_schema(value, system)) == []
+    assert validate.call_count == 3
+    # The linked lab was edited or deleted.
+    query_max_sid.return_value = 6
+    assert list(audit_item_schema(value, system)) == []
+    assert validate.call_count == 4
+    query_max_sid.return_value = None
+    assert list(audit_item_schema(value, system)) == []
+    assert list(audit_item_schema(value, system)) == []
+    assert validate.call_count == 6
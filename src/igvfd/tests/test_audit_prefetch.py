@@ -0,0 +1,117 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def audit_links_registry(monkeypatch):
+    import igvfd.audit.prefetch
+    monkeypatch.setattr(igvfd.audit.prefetch, 'AUDIT_LINKS', {})
+
+
+@pytest.fixture
+def prefetch_system(mocker):
+    request = mocker.Mock()
+    request.environ = {}
+    request.embed_many.return_value = []
+    context = mocker.Mock()
+    context.type_info.name = 'PrefetchTestChild'
+    context.type_info.base_types = ['PrefetchTestParent', 'Item']
+    return {
+        'request': request,
+        'context': context,
+        'path': '/prefetch-test-children/child-1/',
+    }
+
+
+def test_audit_prefetch_get_audit_links_merges_base_types(mocker):
+    from igvfd.audit.prefetch import (
+        audit_links,
+        get_audit_links,
+        OBJECT_FRAME,
+        RAW_OBJECT_FRAME,
+    )
+    audit_links('PrefetchTestParent', files=OBJECT_FRAME, prefixes=['/sequence-files/'])
+    audit_links('PrefetchTestChild', files=OBJECT_FRAME, prefixes=['/configuration-files/'])
+    audit_links('PrefetchTestChild', donors=RAW_OBJECT_FRAME)
+    type_info = mocker.Mock()
+    type_info.name = 'PrefetchTestChild'
+    type_info.base_types = ['PrefetchTestParent', 'Item']
+    assert get_audit_links(type_info) == {
+        'files': {OBJECT_FRAME: {'/sequence-files/', '/configuration-files/'}},
+        'donors': {RAW_OBJECT_FRAME: None},
+    }
+
+
+def test_audit_prefetch_groups_paths_by_frame_once_per_item(prefetch_system):
+    from igvfd.audit.prefetch import (
+        audit_links,
+        OBJECT_FRAME,
+        RAW_OBJECT_FRAME,
+    )
+    audit_links('PrefetchTestParent', files=OBJECT_FRAME, prefixes=['/sequence-files/'])
+    audit_links('PrefetchTestChild', donors=RAW_OBJECT_FRAME)
+    calls = []
+
+    @audit_links('PrefetchTestChild', samples=RAW_OBJECT_FRAME, assay_term=RAW_OBJECT_FRAME)
+    def checker(value, system):
+        calls.append(value['@id'])
+
+    value = {
+        '@id': '/prefetch-test-children/child-1/',
+        'samples': ['/in-vitro-systems/a/', '/tissues/b/'],
+        'assay_term': '/assay-terms/OBI_0000001/',
+        'files': ['/sequence-files/c/', '/alignment-files/d/'],
+        'donors': ['/human-donors/e/'],
+    }
+    checker(value, prefetch_system)
+    checker(value, prefetch_system)
+    request = prefetch_system['request']
+    assert calls == [value['@id'], value['@id']]
+    assert request.embed_many.call_count == 2
+    paths_by_frame = {
+        call.args[1]: call.args[0]
+        for call in request.embed_many.call_args_list
+    }
+    assert sorted(paths_by_frame[RAW_OBJECT_FRAME]) == [
+        '/assay-terms/OBI_0000001/',
+        '/human-donors/e/',
+        '/in-vitro-systems/a/',
+        '/tissues/b/',
+    ]
+    assert paths_by_frame[OBJECT_FRAME] == ['/sequence-files/c/']
+
+
+def test_audit_prefetch_get_linked_object_uses_embed_memo(prefetch_system):
+    from igvfd.audit.prefetch import (
+        get_linked_object,
+        RAW_OBJECT_FRAME,
+    )
+    get_linked_object(prefetch_system, '/human-donors/e/', RAW_OBJECT_FRAME)
+    prefetch_system['request'].memoized_embed.assert_called_once_with('/human-donors/e/', RAW_OBJECT_FRAME)
+
+
+def test_audit_prefetch_embedded_frame_checker_first(prefetch_system):
+    from igvfd.audit.prefetch import (
+        audit_links,
+        RAW_OBJECT_FRAME,
+    )
+
+    @audit_links('PrefetchTestChild', cell_fate_change_protocol=RAW_OBJECT_FRAME)
+    def embedded_checker(value, system):
+        pass
+
+    @audit_links('PrefetchTestChild', sorted_from=RAW_OBJECT_FRAME, originated_from=RAW_OBJECT_FRAME)
+    def object_checker(value, system):
+        pass
+
+    embedded_value = {
+        '@id': '/prefetch-test-children/child-1/',
+        'sorted_from': {'@id': '/in-vitro-systems/a/', 'accession': 'a'},
+        'originated_from': {'@id': '/in-vitro-systems/b/', 'accession': 'b'},
+        'cell_fate_change_protocol': {'@id': '/documents/c/', 'document_type': 'protocol'},
+    }
+    embedded_checker(embedded_value, prefetch_system)
+    object_checker(embedded_value, prefetch_system)
+    prefetch_system['request'].embed_many.assert_called_once()
+    paths, frame = prefetch_system['request'].embed_many.call_args.args
+    assert frame == RAW_OBJECT_FRAME
+    assert sorted(paths) == ['/documents/c/', '/in-vitro-systems/a/', '/in-vitro-systems/b/']
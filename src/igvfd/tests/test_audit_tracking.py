@@ -0,0 +1,173 @@
+import pytest
+
+
+@pytest.fixture
+def tracking_system(mocker):
+    from igvfd.audit.tracking import (
+        AUDIT_RESULT_CACHE,
+        AuditResultCache,
+    )
+    request = mocker.Mock()
+    request._embedded_uuids = set()
+    request._linked_uuids = set()
+    request._stats = {}
+    request.environ = {}
+    context = mocker.Mock()
+    context.uuid = '0f13f5b2-2b31-4a4b-9b1f-6a4b1f5e8f9a'
+    return {
+        'request': request,
+        'context': context,
+        'registry': {AUDIT_RESULT_CACHE: AuditResultCache(capacity=10)},
+    }
+
+
+def test_audit_tracking_tracked_value_records_reads():
+    from igvfd.audit.tracking import TrackedValue
+    value = TrackedValue({'files': [], 'notes': 'a note', 'status': 'released'})
+    value.get('files')
+    'samples' in value
+    value['status']
+    assert value.read_keys == {'files', 'samples', 'status'}
+    assert not value.read_all
+    list(value.items())
+    assert value.read_all
+
+
+def test_audit_tracking_reuses_failures_when_inputs_unchanged(tracking_system):
+    from igvfd.audit.tracking import track_audit_inputs
+    calls = []
+
+    @track_audit_inputs
+    def checker(value, system):
+        calls.append(value.get('files'))
+        if not value.get('files'):
+            yield 'missing files'
+
+    value = {'files': [], 'notes': 'a note'}
+    assert checker(value, tracking_system) == ['missing files']
+    assert checker(dict(value, notes='another note'), tracking_system) == ['missing files']
+    assert len(calls) == 1
+    assert checker(dict(value, files=['/sequence-files/IGVFFI0000SEQU/']), tracking_system) == []
+    assert len(calls) == 2
+    stats = tracking_system['request']._stats
+    assert stats == {'audit_cache_hits': 1, 'audit_cache_misses': 2}
+
+
+@pytest.fixture
+def linked_objects(tracking_system):
+    objects = {}
+
+    def memoized_embed(path, frame):
+        request = tracking_system['request']
+        request._embedded_uuids.add(objects[path]['uuid'])
+        return objects[path]
+
+    tracking_system['request'].memoized_embed.side_effect = memoized_embed
+    return objects
+
+
+def test_audit_tracking_reruns_when_linked_item_changes(tracking_system, linked_objects, mocker):
+    from igvfd.audit.prefetch import (
+        get_linked_object,
+        RAW_OBJECT_FRAME,
+    )
+    from igvfd.audit.tracking import track_audit_inputs
+    query_max_sid = mocker.patch('igvfd.audit.tracking.query_max_sid', return_value=10)
+    donor = '/human-donors/IGVFDO0000DONR/'
+    linked_objects[donor] = {'uuid': 'c2a0e8c4-7b8d-4a3e-8d3b-2a6f9e0b1c7d', 'virtual': True}
+    calls = []
+
+    @track_audit_inputs
+    def checker(value, system):
+        calls.append(1)
+        if get_linked_object(system, value['donors'][0], RAW_OBJECT_FRAME)['virtual']:
+            yield 'virtual donor'
+
+    value = {'donors': [donor]}
+    assert checker(value, tracking_system) == ['virtual donor']
+    assert checker(value, tracking_system) == ['virtual donor']
+    assert len(calls) == 1
+    assert linked_objects[donor]['uuid'] in tracking_system['request']._embedded_uuids
+    linked_objects[donor]['virtual'] = False
+    query_max_sid.return_value = 11
+    assert checker(value, tracking_system) == []
+    assert len(calls) == 2
+
+
+def test_audit_tracking_reruns_when_calculated_rev_link_changes(tracking_system, linked_objects, mocker):
+    from igvfd.audit.prefetch import (
+        get_linked_object,
+        OBJECT_FRAME,
+    )
+    from igvfd.audit.tracking import track_audit_inputs
+    # Adding a configuration file with seqspec_of changes the seqspecs of
+    # the sequence file without a new sid for it.
+    mocker.patch('igvfd.audit.tracking.query_max_sid', return_value=10)
+    sequence_file = '/sequence-files/IGVFFI0000SEQU/'
+    linked_objects[sequence_file] = {'uuid': '8a7c1c1e-3d4b-4f7e-9a57-2f1f0e1d2c3b'}
+
+    @track_audit_inputs
+    def checker(value, system):
+        if not get_linked_object(system, value['files'][0], OBJECT_FRAME).get('seqspecs'):
+            yield 'missing seqspec'
+
+    value = {'files': [sequence_file]}
+    assert checker(value, tracking_system) == ['missing seqspec']
+    linked_objects[sequence_file] = dict(
+        linked_objects[sequence_file],
+        seqspecs=['/configuration-files/IGVFFI0000SSPC/'],
+    )
+    assert checker(value, tracking_system) == []
+    assert tracking_system['request']._stats['audit_cache_misses'] == 2
+
+
+def test_audit_tracking_caches_digest_of_inputs(tracking_system):
+    from igvfd.audit.tracking import (
+        AUDIT_RESULT_CACHE,
+        track_audit_inputs,
+    )
+
+    @track_audit_inputs
+    def checker(value, system):
+        if value.get('description') is None:
+            yield 'missing description'
+
+    value = {'description': 'a long description ' * 100, 'notes': 'a note'}
+    assert checker(value, tracking_system) == []
+    (read_keys, digest, *_), = tracking_system['registry'][AUDIT_RESULT_CACHE].cache.values()
+    assert read_keys == {'description'}
+    assert len(digest) == 40
+    assert checker(dict(value, notes='another note'), tracking_system) == []
+    assert checker({'notes': 'a note'}, tracking_system) == ['missing description']
+    stats = tracking_system['request']._stats
+    assert stats == {'audit_cache_hits': 1, 'audit_cache_misses': 2}
+
+
+def test_audit_tracking_does_not_cache_direct_calculated_embeds(tracking_system, mocker):
+    from igvfd.audit.prefetch import (
+        OBJECT_FRAME,
+        RAW_OBJECT_FRAME,
+    )
+    from igvfd.audit.tracking import track_audit_inputs
+    mocker.patch('igvfd.audit.tracking.query_max_sid', return_value=10)
+    request = tracking_system['request']
+    embed = request.embed
+    embed.return_value = {'uuid': '8a7c1c1e-3d4b-4f7e-9a57-2f1f0e1d2c3b'}
+
+    def make_checker(frame):
+        @track_audit_inputs
+        def checker(value, system):
+            if not system['request'].embed(value['files'][0], frame).get('seqspecs'):
+                yield 'missing seqspec'
+        return checker
+
+    value = {'files': ['/sequence-files/IGVFFI0000SEQU/']}
+    object_checker = make_checker(OBJECT_FRAME)
+    object_checker(value, tracking_system)
+    object_checker(value, tracking_system)
+    assert embed.call_count == 2
+    assert request.embed is embed
+    raw_object_checker = make_checker(RAW_OBJECT_FRAME)
+    raw_object_checker(value, tracking_system)
+    raw_object_checker(value, tracking_system)
+    assert embed.call_count == 3
@@ -0,0 +1,38 @@
+import json
+import pytest
+
+
+def _ndjson(items):
+    return '\n'.join(json.dumps(item) for item in items)
+
+
+def test_bulk_import_creates_items(testapp):
+    items = [
+        {'name': 'bulk-one', 'title': 'Bulk One'},
+        {'name': 'bulk-two', 'title': 'Bulk Two'},
+    ]
+    res = testapp.post('/_bulk_import?type=source', _ndjson(items), content_type='application/x-ndjson', status=201)
+    assert res.json['count'] == 2
+    res = testapp.get('/sources/bulk-two/')
+    assert res.json['title'] == 'Bulk Two'
+
+
+def test_bulk_import_rejects_batch_on_invalid_item(testapp):
+    items = [
+        {'name': 'bulk-valid', 'title': 'Valid'},
+        {'name': 'bulk-invalid'},
+    ]
+    res = testapp.post('/_bulk_import?type=source', _ndjson(items), content_type='application/x-ndjson', status=422)
+    assert res.json['errors'][0]['name'][0] == 'line 2'
+    testapp.get('/sources/bulk-valid/', status=404)
+
+
+def test_bulk_import_unknown_type(testapp):
+    testapp.post('/_bulk_import?type=nonexistent', '', content_type='application/x-ndjson', status=400)
+
+
+def test_bulk_import_admin_only(submitter_testapp):
+    items = [{'name': 'bulk-submitter', 'title': 'Submitter'}]
+    submitter_testapp.post(
+        '/_bulk_import?type=source', _ndjson(items), content_type='application/x-ndjson', status=403
+    )
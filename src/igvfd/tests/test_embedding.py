@@ -67,3 +67,78 @@ def test_updated_target(content, testapp):
     url = '/testing-link-targets/' + targets[0]['uuid']
     res = testapp.patch_json(url, {})
     assert set(res.headers['X-Updated'].split(',')) == {targets[0]['uuid']}
+
+
+def test_embed_memo_lru():
+    from igvfd.embed import EmbedMemo
+    stats = {}
+    memo = EmbedMemo(stats, capacity=2)
+    memo.set('a', 1)
+    memo.set('b', 2)
+    assert memo.get('a') == 1
+    memo.set('c', 3)
+    assert memo.get('b') is None
+    assert memo.get('c') == 3
+    assert stats == {'embed_memo_hits': 2, 'embed_memo_misses': 1}
+    memo.clear()
+    assert memo.get('a') is None
+
+
+def test_memoized_embed_records_linked_uuids(content, dummy_request, threadlocals):
+    from igvfd.embed import EMBED_MEMO_ENVIRON_KEY
+    from igvfd.embed import EmbedMemo
+    dummy_request.environ[EMBED_MEMO_ENVIRON_KEY] = EmbedMemo(dummy_request._stats)
+    path = '/testing-link-sources/' + sources[0]['uuid']
+    first = dummy_request.memoized_embed(path, '@@object')
+    assert dummy_request._linked_uuids == {sources[0]['uuid'], targets[0]['uuid']}
+    dummy_request._embedded_uuids = set()
+    dummy_request._linked_uuids = set()
+    second = dummy_request.memoized_embed(path, '@@object')
+    assert second == first
+    assert dummy_request._embedded_uuids == {sources[0]['uuid']}
+    assert dummy_request._linked_uuids == {sources[0]['uuid'], targets[0]['uuid']}
+    assert dummy_request._stats['embed_memo_hits'] == 1
+    assert dummy_request._stats['embed_memo_misses'] == 1
+
+
+def test_memoized_embed_reported_in_x_stats(testapp, tissue):
+    res = testapp.get(tissue['@id'] + '@@object')
+    assert 'embed_memo_hits=' in res.headers['X-Stats']
+    assert 'embed_memo_misses=' in res.headers['X-Stats']
+
+
+def test_resolve_item_uuids(content, dummy_request, threadlocals):
+    from igvfd.embed import resolve_item_uuids
+    source_path = '/testing-link-sources/' + sources[0]['uuid'] + '/'
+    uuids = resolve_item_uuids(dummy_request, [
+        source_path,
+        '/testing-link-targets/one/',
+        '/testing-link-targets/two/',
+        '/testing-link-targets/missing/',
+    ])
+    assert uuids == {
+        source_path: sources[0]['uuid'],
+        '/testing-link-targets/one/': targets[0]['uuid'],
+        '/testing-link-targets/two/': targets[1]['uuid'],
+    }
+
+
+def test_embed_many_matches_embed(content, dummy_request, threadlocals):
+    from igvfd.embed import EMBED_MEMO_ENVIRON_KEY
+    from igvfd.embed import EmbedMemo
+    dummy_request.environ[EMBED_MEMO_ENVIRON_KEY] = EmbedMemo(dummy_request._stats)
+    paths = [
+        '/testing-link-targets/two/',
+        '/testing-link-sources/' + sources[1]['uuid'] + '/',
+        '/testing-link-targets/one/',
+        '/testing-link-targets/two/',
+    ]
+    expected = [dummy_request.embed(path, '@@object') for path in paths]
+    dummy_request._embedded_uuids = set()
+    dummy_request._linked_uuids = set()
+    assert dummy_request.embed_many(paths, '@@object') == expected
+    assert dummy_request._linked_uuids >= {
+        targets[0]['uuid'],
+        targets[1]['uuid'],
+        sources[1]['uuid'],
+    }
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.mark.parametrize('text', [
+    '[{"uuid": "a", "n": 10}, {"uuid": "b", "n": 123456}]',
+    '{"uuid": "a", "n": 10}\n{"uuid": "b", "n": 123456}\n',
+    '\n [\n{"uuid": "a", "n": 10} ,\n{"uuid": "b", "n": 123456}\n]\n',
+])
+def test_jsonstream_iter_json_values(text):
+    import io
+    from igvfd.jsonstream import iter_json_values
+    for read_size in (1, 3, 1024):
+        assert list(iter_json_values(io.StringIO(text), read_size=read_size)) == [
+            {'uuid': 'a', 'n': 10},
+            {'uuid': 'b', 'n': 123456},
+        ]
+    assert list(iter_json_values(io.BytesIO(text.encode('utf-8')), read_size=3))[1]['n'] == 123456
+
+
+def test_jsonstream_iter_json_values_errors():
+    import io
+    from igvfd.jsonstream import iter_json_values
+    with pytest.raises(ValueError):
+        list(iter_json_values(io.StringIO('[{"uuid": "a"}')))
+    with pytest.raises(ValueError):
+        list(iter_json_values(io.StringIO('{"uuid": ')))
+
+
+@pytest.mark.parametrize('text', ['[1 2]', '[1,,2]', '[1,]', '[,1]', '[1', '[1,'])
+def test_jsonstream_iter_json_values_rejects_malformed_arrays(text):
+    import io
+    import json
+    from igvfd.jsonstream import iter_json_values
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text)
+    for read_size in (1, 1024):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_values(io.StringIO(text), read_size=read_size))
+
+
+def test_jsonstream_iter_json_values_numbers_across_chunks():
+    import io
+    from igvfd.jsonstream import iter_json_values
+    for read_size in range(1, 8):
+        assert list(iter_json_values(io.StringIO('1.5e10 -20'), read_size=read_size)) == [1.5e10, -20]
+        assert list(iter_json_values(io.StringIO('[1.5e10, 123]'), read_size=read_size)) == [1.5e10, 123]
+        assert list(iter_json_values(io.StringIO('[]\n[]'), read_size=read_size)) == []
+
+
+def test_jsonstream_iter_json_values_multibyte_across_chunks():
+    import io
+    from igvfd.jsonstream import iter_json_values
+    text = '{"name": "\u00e9\u4e2d\U0001f600"}'
+    for read_size in range(1, 5):
+        assert list(iter_json_values(io.BytesIO(text.encode('utf-8')), read_size=read_size)) == [
+            {'name': '\u00e9\u4e2d\U0001f600'}
+        ]
+
+
+def test_jsonstream_iter_json_object_items():
+    import io
+    from igvfd.jsonstream import iter_json_object_items
+    text = ' {"CL:1": {"ancestors": ["CL:0"], "n": 12345},\n "CL:2" : {} , "UBERON:3": {"s": "a\\"}"}} '
+    expected = [
+        ('CL:1', {'ancestors': ['CL:0'], 'n': 12345}),
+        ('CL:2', {}),
+        ('UBERON:3', {'s': 'a"}'}),
+    ]
+    for read_size in (1, 7, 1024):
+        assert list(iter_json_object_items(io.StringIO(text), read_size=read_size)) == expected
+    assert list(iter_json_object_items(io.StringIO('{}'))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_object_items(io.StringIO('{"CL:1": {}')))
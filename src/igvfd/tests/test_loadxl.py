@@ -0,0 +1,188 @@
+import pytest
+
+
+def test_get_type_dependencies():
+    from igvfd.loadxl import get_type_dependencies
+    profiles = {
+        'Lab': {
+            '$id': '/profiles/lab.json',
+            'properties': {
+                'pi': {'type': 'string', 'linkTo': 'User'},
+            },
+        },
+        'User': {
+            '$id': '/profiles/user.json',
+            'properties': {
+                # Deferred to phase 2.
+                'lab': {'type': 'string', 'linkTo': 'Lab'},
+            },
+        },
+        'Tissue': {
+            '$id': '/profiles/tissue.json',
+            'properties': {
+                'lab': {'type': 'string', 'linkTo': 'Lab'},
+                'part_of': {'type': 'string', 'linkTo': 'Sample'},
+                'documents': {'type': 'array', 'items': {'type': 'string', 'linkTo': ['Lab', 'User']}},
+                'donors': {'type': 'array', 'notSubmittable': True, 'items': {'linkTo': 'Donor'}},
+            },
+        },
+        'PrimaryCell': {
+            '$id': '/profiles/primary_cell.json',
+            'properties': {
+                'parent_sample': {'type': 'string', 'linkTo': 'Sample'},
+            },
+        },
+        '_subtypes': {
+            'Sample': ['Tissue', 'PrimaryCell'],
+        },
+    }
+    assert get_type_dependencies(profiles) == {
+        'lab': {'user'},
+        'user': set(),
+        'tissue': {'lab', 'user'},
+        'primary_cell': {'tissue'},
+    }
+
+
+def test_deferred_keys_drive_both_phases():
+    from igvfd.loadxl import DEFERRED_KEYS
+    from igvfd.loadxl import PHASE1_PIPELINES
+    from igvfd.loadxl import PHASE2_PIPELINES
+    assert set(PHASE1_PIPELINES) == set(PHASE2_PIPELINES) == set(DEFERRED_KEYS)
+    row = {'uuid': 'x', 'lab': 'y', 'email': 'z'}
+    phase1_rows = list(PHASE1_PIPELINES['user'][0]([dict(row)]))
+    assert phase1_rows == [{'uuid': 'x', 'email': 'z'}]
+    phase2_rows = list(PHASE2_PIPELINES['user'][0]([{'uuid': 'x'}]))
+    assert phase2_rows[0]['_skip'] is True
+
+
+def test_read_json_single_object_and_errors():
+    import io
+    from igvfd.loadxl import read_json
+    assert list(read_json(io.BytesIO(b'{"uuid": "a"}'))) == [{'uuid': 'a'}]
+    assert list(read_json(io.StringIO(''))) == []
+    with pytest.raises(ValueError):
+        read_json(io.StringIO('{"uuid": '))
+    with pytest.raises(ValueError):
+        list(read_json(io.StringIO('[{"uuid": "a"}')))
+
+
+def _make_xlsx(rows_xml):
+    import io
+    import zipfile
+    stream = io.BytesIO()
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    r_ns = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    with zipfile.ZipFile(stream, 'w') as zf:
+        zf.writestr(
+            'xl/workbook.xml',
+            f'<workbook {ns} {r_ns}><sheets><sheet name="lab" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        )
+        zf.writestr(
+            'xl/_rels/workbook.xml.rels',
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>'
+        )
+        zf.writestr(
+            'xl/sharedStrings.xml',
+            f'<sst {ns}><si><t>name</t></si><si><t>date</t></si><si><r><t>a</t></r><r><t>b</t></r></si></sst>'
+        )
+        zf.writestr(
+            'xl/styles.xml',
+            f'<styleSheet {ns}><numFmts><numFmt numFmtId="164" formatCode="yyyy\\-mm\\-dd"/></numFmts>'
+            '<cellXfs><xf numFmtId="0"/><xf numFmtId="164"/></cellXfs></styleSheet>'
+        )
+        zf.writestr(
+            'xl/worksheets/sheet1.xml',
+            f'<worksheet {ns}><dimension ref="A1:D4"/><sheetData>{rows_xml}</sheetData></worksheet>'
+        )
+    stream.seek(0)
+    return stream
+
+
+def test_xlreader_streams_xlsx():
+    from igvfd import xlreader
+    stream = _make_xlsx(
+        '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>'
+        '<row r="2"><c r="A2" t="s"><v>2</v></c><c r="B2" s="1"><v>44927</v></c>'
+        '<c r="C2"><v>2.5</v></c><c r="D2" t="b"><v>1</v></c></row>'
+        '<row r="4"><c r="B4" t="inlineStr"><is><t>x</t></is></c><c r="C4"><v>3</v></c></row>'
+    )
+    assert list(xlreader.reader(stream)) == [
+        ['name', 'date', '', ''],
+        ['ab', '2023-01-01', '2.5', '1'],
+        ['', '', '', ''],
+        ['', 'x', '3', ''],
+    ]
+    assert list(xlreader.reader(_make_xlsx(''), sheetname='missing')) == []
+
+
+def test_attachment_cache_skips_decoding(tmpdir, mocker):
+    from igvfd import loadxl
+    inspect = mocker.patch.object(
+        loadxl,
+        '_inspect_attachment',
+        return_value={'detected_type': 'text/plain', 'payload': 'aGk='},
+    )
+    path = tmpdir.join('notes.txt')
+    path.write('hi')
+    cache_dir = str(tmpdir.join('cache'))
+    first = loadxl.attachment(str(path), cache_dir=cache_dir)
+    second = loadxl.attachment(str(path), cache_dir=cache_dir)
+    assert first == second == {
+        'download': 'notes.txt',
+        'type': 'text/plain',
+        'href': 'data:text/plain;base64,aGk=',
+    }
+    assert inspect.call_count == 1
+    # A copy under another name hits the cache but is validated by its own name.
+    renamed = tmpdir.join('notes.png')
+    renamed.write('hi')
+    with pytest.raises(ValueError):
+        loadxl.attachment(str(renamed), cache_dir=cache_dir)
+    assert inspect.call_count == 1
+
+
+def test_add_attachments_keeps_row_order(tmpdir, mocker):
+    from igvfd import loadxl
+    mocker.patch.object(loadxl, 'attachment', side_effect=lambda path, cache_dir: {'download': path})
+    tmpdir.join('a.txt').write('a')
+    rows = [{'uuid': '1', 'attachment': 'a.txt'}, {'uuid': '2'}, {'uuid': '3', 'attachment': 'missing.txt'}]
+    attachments = loadxl.AttachmentProcessor()
+    result = list(loadxl.add_attachments([str(tmpdir)], attachments)(rows))
+    assert [row['uuid'] for row in result] == ['1', '2', '3']
+    assert result[0]['attachment'] == {'download': str(tmpdir.join('a.txt'))}
+    assert 'File not found' in result[2]['_errors']
+
+
+def test_load_checkpoint_resumes_after_last_row(tmpdir):
+    from igvfd.loadxl import LoadCheckpoint
+    from igvfd.loadxl import _run_pipeline
+    path = str(tmpdir.join('checkpoint.sqlite'))
+    seen = []
+
+    def fail_on_third(rows):
+        for row in rows:
+            if row['uuid'] == '3' and not seen.count('3'):
+                seen.append('3')
+                raise RuntimeError('connection lost')
+            seen.append(row['uuid'])
+            yield row
+
+    checkpoint = LoadCheckpoint(path, commit_every=1)
+    with pytest.raises(RuntimeError):
+        _run_pipeline([{'uuid': str(i)} for i in range(5)], [fail_on_third], 'lab', 1, checkpoint)
+    assert checkpoint.last_row('lab', 1) == 2
+    assert not checkpoint.is_finished('lab', 1)
+    checkpoint.close()
+
+    checkpoint = LoadCheckpoint(path, resume=True, commit_every=1)
+    _run_pipeline([{'uuid': str(i)} for i in range(5)], [fail_on_third], 'lab', 1, checkpoint)
+    assert seen == ['0', '1', '2', '3', '3', '4']
+    assert checkpoint.is_finished('lab', 1)
+    checkpoint.close()
+
+    checkpoint = LoadCheckpoint(path)
+    assert checkpoint.last_row('lab', 1) == -1
+    assert not checkpoint.is_finished('lab', 1)
+    checkpoint.close()
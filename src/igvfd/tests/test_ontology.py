@@ -184,3 +184,128 @@ def test_ontology_get_connection_to_reference_database():
     # Clean up.
     os.remove(filename)
     assert not os.path.isfile(filename)
+
+
+def test_ontology_reference_store(tmpdir):
+    from igvfd.ontology import ReferenceStore
+    from igvfd.ontology import write_reference_store
+    data = {
+        'UBERON:0002048': {'ancestors': ['UBERON:0000062'], 'organs': ['lung'], 'synonyms': []},
+        'CL:0000236': {'ancestors': ['CL:0000000'], 'cells': ['B cell']},
+        'EFO:0002067': {},
+    }
+    filename = str(tmpdir.join('reference.store'))
+    write_reference_store(data.items(), filename=filename)
+    store = ReferenceStore(filename)
+    assert len(store) == 3
+    assert set(store) == set(data)
+    assert 'CL:0000236' in store
+    assert 'CL:0000237' not in store
+    assert 1 not in store
+    assert store.get('CL:0000237') is None
+    assert store['UBERON:0002048'].get('organs', []) == ['lung']
+    assert store['UBERON:0002048'].get('cells', []) == []
+    for term_id, term in data.items():
+        assert store[term_id] == term
+    store.close()
+
+
+def test_ontology_get_reference_ontology_falls_back_to_sqlite(tmpdir):
+    from sqlitedict import SqliteDict
+    from igvfd.ontology import ReferenceStore
+    from igvfd.ontology import REFERENCE_ONTOLOGY_TABLE_NAME
+    from igvfd.ontology import get_reference_ontology
+    from igvfd.ontology import write_data_to_reference_database
+    from igvfd.ontology import write_reference_store
+    store_filename = str(tmpdir.join('reference.store'))
+    filename = str(tmpdir.join('reference.sqlite'))
+    write_data_to_reference_database({}, REFERENCE_ONTOLOGY_TABLE_NAME, filename=filename)
+    assert isinstance(get_reference_ontology(store_filename=store_filename, filename=filename), SqliteDict)
+    write_reference_store([], filename=store_filename)
+    assert isinstance(get_reference_ontology(store_filename=store_filename, filename=filename), ReferenceStore)
+
+
+def test_ontology_cache_counts_hits_and_caches_missing_terms():
+    from igvfd.ontology import OntologyCache
+    reference = {'CL:0000236': {'cells': ['B cell']}}
+    cache = OntologyCache(reference, capacity=2)
+    assert cache.get('CL:0000236') == {'cells': ['B cell']}
+    assert cache['CL:0000236']['cells'] == ['B cell']
+    assert 'CL:0000000' not in cache
+    assert cache.get('CL:0000000', []) == []
+    stats = cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
+    assert stats['size'] == 2
+    assert stats['hit_rate'] == 0.5
+
+
+def test_ontology_cache_is_bounded_and_warms_up():
+    from igvfd.ontology import OntologyCache
+    reference = {'a': {'x': 1}, 'b': {'x': 2}, 'c': {'x': 3}}
+    cache = OntologyCache(reference, capacity=2)
+    cache.warm_up(['a', 'b', 'c'])
+    assert cache.stats()['warmed'] == 2
+    assert list(cache.cache) == ['a', 'b']
+    assert cache['c'] == {'x': 3}
+    assert list(cache.cache) == ['b', 'c']
+    assert cache.stats()['misses'] == 1
+
+
+def test_ontology_cache_keeps_store_records_lazy(tmpdir, mocker):
+    from igvfd import ontology
+    filename = str(tmpdir.join('reference.store'))
+    ontology.write_reference_store(
+        [('CL:0000236', {'cells': ['B cell'], 'ancestors': ['CL:0000000']})],
+        filename=filename,
+    )
+    store = ontology.ReferenceStore(filename)
+    cache = ontology.OntologyCache(store, capacity=2)
+    loads = mocker.spy(ontology.json, 'loads')
+    cache.warm_up(['CL:0000236'])
+    assert isinstance(cache.cache['CL:0000236'], ontology.ReferenceRecord)
+    assert loads.call_count == 0
+    assert cache['CL:0000236'].get('cells', []) == ['B cell']
+    assert loads.call_count == 1
+    store.close()
+
+
+def test_ontology_cache_stats_view(testapp, submitter_testapp):
+    res = testapp.get('/_ontology_cache')
+    assert {'capacity', 'size', 'hits', 'misses', 'hit_rate', 'warmed'} <= set(res.json)
+    submitter_testapp.get('/_ontology_cache', status=403)
+
+
+@pytest.mark.parametrize('dictionary_samples', [0, 300])
+def test_ontology_build_reference_databases(tmpdir, dictionary_samples):
+    from igvfd import ontology
+    if dictionary_samples and ontology.zstandard is None:
+        pytest.skip('zstandard is not installed')
+    data = {
+        f'UBERON:{i:07d}': {
+            'name': f'term {i}',
+            'ancestors': [f'UBERON:{j:07d}' for j in range(i % 7)],
+            'organs': ['lung', 'heart'][:i % 3],
+        }
+        for i in range(1000)
+    }
+    filename = str(tmpdir.join('reference.sqlite'))
+    store_filename = str(tmpdir.join('reference.store'))
+    assert ontology.build_reference_databases(
+        iter(data.items()),
+        filename=filename,
+        store_filename=store_filename,
+        batch_size=64,
+        dictionary_samples=dictionary_samples,
+        dictionary_size=4096,
+    ) == 1000
+    db = ontology.get_connection_to_reference_database(
+        ontology.REFERENCE_ONTOLOGY_TABLE_NAME,
+        decode=ontology.get_item_decode(ontology.REFERENCE_ONTOLOGY_TABLE_NAME, filename=filename),
+        filename=filename,
+    )
+    assert dict(db) == data
+    db.close()
+    store = ontology.ReferenceStore(store_filename)
+    assert {key: dict(value) for key, value in store.items()} == data
+    store.close()
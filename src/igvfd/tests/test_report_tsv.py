@@ -26,3 +26,191 @@ def test_convert_camel_to_snake_with_one_words():
 def test_batch_download_lookup_column_value(lookup_column_value_item, lookup_column_value_validate):
     for path in lookup_column_value_validate.keys():
         assert lookup_column_value_validate[path] == lookup_column_value(lookup_column_value_item, path)
+
+
+def test_column_projector_matches_lookup_column_value(lookup_column_value_item, lookup_column_value_validate):
+    from igvfd.report import ColumnProjector
+    paths = list(lookup_column_value_validate.keys())
+    projector = ColumnProjector(paths)
+    assert projector.project(lookup_column_value_item) == list(lookup_column_value_validate.values())
+
+
+def test_column_projector_shared_prefixes(column_projector_item):
+    from igvfd.report import ColumnProjector
+    paths = [
+        '@id',
+        'files',
+        'files.file_format',
+        'samples.sample_terms',
+        'samples.sample_terms.term_name',
+        'samples.sample_terms.missing',
+        'lab.title',
+        'missing.path',
+    ]
+    projector = ColumnProjector(paths)
+    assert projector.project(column_projector_item) == [
+        lookup_column_value(column_projector_item, path) for path in paths
+    ]
+    assert projector.project(column_projector_item) == [
+        '/measurement-sets/IGVFDS0000001/',
+        '/sequence-files/IGVFFI0000001/,/sequence-files/IGVFFI0000002/',
+        'fastq',
+        '/sample-terms/UBERON_0002048/',
+        'lung',
+        '',
+        'J. Michael Cherry, Stanford',
+        '',
+    ]
+
+
+def test_format_row_collapses_whitespace():
+    columns = [' col1  with\tspaces ', 'col2\r\n']
+    expected = b'col1 with spaces\tcol2\r\n'
+    assert format_row(columns) == expected
+
+
+def test_add_field_params_for_columns():
+    from webob import Request
+    from igvfd.report import add_field_params_for_columns
+    request = Request.blank('/report.tsv?type=Award&field=title')
+    add_field_params_for_columns(request, ['title', 'lab.title', 'files.href'])
+    assert request.params.getall('field') == ['title', '@id', 'lab.title', 'files.href']
+    assert request.params.getall('type') == ['Award']
+
+
+def test_compress_rows_gzip():
+    import gzip
+    from igvfd.report import compress_rows
+    rows = [format_row(['col{}'.format(i), 'value']) for i in range(25)]
+    chunks = list(compress_rows(iter(rows), 'gzip', rows_per_chunk=10))
+    assert gzip.decompress(b''.join(chunks)) == b''.join(rows)
+    # Header row is flushed on its own.
+    assert len(chunks) > 2
+
+
+def test_compress_rows_zstd():
+    zstandard = pytest.importorskip('zstandard')
+    from igvfd.report import compress_rows
+    rows = [format_row(['col{}'.format(i), 'value']) for i in range(25)]
+    compressed = b''.join(compress_rows(iter(rows), 'zstd', rows_per_chunk=10))
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(compressed) == b''.join(rows)
+
+
+def test_negotiate_report_encoding():
+    from webob import Request
+    from igvfd.report import negotiate_report_encoding
+    assert negotiate_report_encoding(Request.blank('/report.tsv')) is None
+    request = Request.blank('/report.tsv', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert negotiate_report_encoding(request) == 'gzip'
+    request = Request.blank('/report.tsv', headers={'Accept-Encoding': 'identity'})
+    assert negotiate_report_encoding(request) is None
+
+
+def test_get_arrow_column(columnar_report_schema):
+    pyarrow = pytest.importorskip('pyarrow')
+    from igvfd.report import get_arrow_column
+    field, convert = get_arrow_column(columnar_report_schema, 'files.href', 'Files')
+    assert field.type == pyarrow.list_(pyarrow.string())
+    assert field.metadata == {b'title': b'Files'}
+    assert convert(['/a/', '/b/']) == ['/a/', '/b/']
+    field, convert = get_arrow_column(columnar_report_schema, 'file_size', 'File Size')
+    assert field.type == pyarrow.int64()
+    assert convert([10]) == 10
+    assert convert([]) is None
+    field, convert = get_arrow_column(columnar_report_schema, 'lab.title', 'Lab')
+    assert field.type == pyarrow.string()
+    assert convert(['a', 'b']) == 'a,b'
+
+
+def test_get_arrow_column_multiple_types():
+    pyarrow = pytest.importorskip('pyarrow')
+    from igvfd.report import get_arrow_column
+    schema = {
+        'properties': {
+            'parent': {'type': ['string', 'null'], 'linkTo': 'Page'},
+            'read_length': {'type': ['integer', 'null']},
+            'value': {'type': ['number', 'string']},
+            'tags': {'type': ['array', 'null'], 'items': {'type': ['boolean', 'null']}},
+        }
+    }
+    field, convert = get_arrow_column(schema, 'parent', 'Parent Page')
+    assert field.type == pyarrow.string()
+    field, convert = get_arrow_column(schema, 'read_length', 'Read Length')
+    assert field.type == pyarrow.int64()
+    assert convert([150]) == 150
+    field, convert = get_arrow_column(schema, 'value', 'Value')
+    assert field.type == pyarrow.string()
+    assert convert([1.5]) == '1.5'
+    field, convert = get_arrow_column(schema, 'tags', 'Tags')
+    assert field.type == pyarrow.list_(pyarrow.bool_())
+
+
+def test_generate_columnar_report(columnar_report_schema, column_projector_item):
+    pyarrow = pytest.importorskip('pyarrow')
+    import io
+    import pyarrow.parquet
+    from igvfd.report import ColumnProjector
+    from igvfd.report import generate_columnar_report
+    from igvfd.report import get_arrow_column
+    paths = ['@id', 'accession', 'files.@id', 'lab.title', 'file_size']
+    fields, converters = zip(*[get_arrow_column(columnar_report_schema, path, path) for path in paths])
+    arrow_schema = pyarrow.schema(fields)
+    items = [column_projector_item] * 5
+    for file_format in ['parquet', 'arrow']:
+        chunks = list(
+            generate_columnar_report(
+                iter(items),
+                ColumnProjector(paths),
+                arrow_schema,
+                converters,
+                file_format,
+                batch_size=2
+            )
+        )
+        data = io.BytesIO(b''.join(chunks))
+        if file_format == 'parquet':
+            table = pyarrow.parquet.read_table(data)
+        else:
+            table = pyarrow.ipc.open_file(data).read_all()
+        assert table.num_rows == 5
+        assert table.column('files.@id').to_pylist()[0] == [
+            '/sequence-files/IGVFFI0000001/',
+            '/sequence-files/IGVFFI0000002/'
+        ]
+        assert table.column('lab.title').to_pylist()[0] == 'J. Michael Cherry, Stanford'
+        assert table.column('file_size').to_pylist()[0] is None
+
+
+def test_format_row_full_url():
+    from igvfd.report import HrefRewritePlan
+    from igvfd.report import format_row_full_url
+    host_url = 'http://localhost'
+    item_id = '/documents/a8a8ea3e-c6e7-4aa0-92f1-f2ea4b0d8c5b/'
+    columns_keys = ['@id', 'href', 'files.href', 'attachment.href', 'attachment', 'description']
+    href_plan = HrefRewritePlan(columns_keys, host_url)
+    values = [
+        item_id,
+        '/sequence-files/IGVFFI0000SEQU/@@download/IGVFFI0000SEQU.fastq.gz',
+        '/sequence-files/IGVFFI0001SEQU/@@download/IGVFFI0001SEQU.fastq.gz,/sequence-files/IGVFFI0002SEQU/@@download/IGVFFI0002SEQU.fastq.gz',
+        '@@download/attachment/document.pdf',
+        "{'download': 'document.pdf', 'href': '@@download/attachment/document.pdf', 'type': 'application/pdf'}",
+        'a  description',
+    ]
+    assert format_row_full_url(values, href_plan, item_id) == (
+        item_id.encode('utf-8') + b'\t'
+        b'http://localhost/sequence-files/IGVFFI0000SEQU/@@download/IGVFFI0000SEQU.fastq.gz\t'
+        b'http://localhost/sequence-files/IGVFFI0001SEQU/@@download/IGVFFI0001SEQU.fastq.gz,'
+        b'http://localhost/sequence-files/IGVFFI0002SEQU/@@download/IGVFFI0002SEQU.fastq.gz\t'
+        b'http://localhost/documents/a8a8ea3e-c6e7-4aa0-92f1-f2ea4b0d8c5b/@@download/attachment/document.pdf\t'
+        b"{'download': 'document.pdf', 'href': 'http://localhost/documents/a8a8ea3e-c6e7-4aa0-92f1-f2ea4b0d8c5b/"
+        b"@@download/attachment/document.pdf', 'type': 'application/pdf'}\t"
+        b'a description\r\n'
+    )
+
+
+def test_format_row_full_url_empty_href():
+    from igvfd.report import HrefRewritePlan
+    from igvfd.report import format_row_full_url
+    href_plan = HrefRewritePlan(['@id', 'files.href'], 'http://localhost')
+    assert format_row_full_url(['/analysis-sets/IGVFDS0000ANAL/', ''], href_plan,
+                               '/analysis-sets/IGVFDS0000ANAL/') == b'/analysis-sets/IGVFDS0000ANAL/\t\r\n'
@@ -0,0 +1,118 @@
+import pytest
+
+
+class FakeHit:
+
+    def __init__(self, source):
+        self.source = source
+
+    def to_dict(self):
+        return self.source
+
+
+class FakeSearch:
+
+    def __init__(self, docs, slice_id=0, slices=1, fail_on_slice=None):
+        self.docs = docs
+        self.slice_id = slice_id
+        self.slices = slices
+        self.fail_on_slice = fail_on_slice
+
+    def extra(self, slice=None):
+        return FakeSearch(self.docs, slice['id'], slice['max'], self.fail_on_slice)
+
+    def params(self, size=None, scroll=None):
+        return self
+
+    def scan(self):
+        for index, doc in enumerate(self.docs):
+            if index % self.slices == self.slice_id:
+                if self.slice_id == self.fail_on_slice:
+                    raise ValueError('scroll failed')
+                yield FakeHit({'embedded': doc})
+
+
+def test_searches_generator_iter_sliced_hits_stable_order():
+    from igvfd.searches.generator import _iter_sliced_hits
+    docs = [{'@id': f'/items/{i}/'} for i in range(25)]
+    hits = list(_iter_sliced_hits(FakeSearch(docs), 3, 3, 4, 'embedded'))
+    assert len(hits) == 25
+    # One page of 4 hits from each slice in turn.
+    pages = [[docs[slice_id::3][i:i + 4] for i in range(0, 9, 4)] for slice_id in range(3)]
+    assert hits == [
+        doc
+        for round_pages in zip(*pages)
+        for page in round_pages
+        for doc in page
+    ]
+    assert hits == list(_iter_sliced_hits(FakeSearch(docs), 3, 3, 4, 'embedded'))
+
+
+def test_searches_generator_iter_sliced_hits_raises_slice_errors():
+    from igvfd.searches.generator import _iter_sliced_hits
+    docs = [{'@id': f'/items/{i}/'} for i in range(10)]
+    with pytest.raises(ValueError):
+        list(_iter_sliced_hits(FakeSearch(docs, fail_on_slice=1), 2, 2, 2, 'embedded'))
+
+
+def test_searches_generator_iter_sliced_hits_early_close():
+    from igvfd.searches.generator import _iter_sliced_hits
+    docs = [{'@id': f'/items/{i}/'} for i in range(1000)]
+    hits = _iter_sliced_hits(FakeSearch(docs), 4, 4, 10, 'embedded')
+    assert next(hits) == docs[0]
+    hits.close()
+
+
+def test_searches_generator_iter_sliced_hits_advances_all_slices(mocker):
+    import igvfd.searches.generator
+    from igvfd.searches.generator import _iter_sliced_hits
+    gets = []
+    get = igvfd.searches.generator.queue.Queue.get
+
+    def record_get(pages, *args, **kwargs):
+        gets.append(id(pages))
+        return get(pages, *args, **kwargs)
+
+    mocker.patch.object(igvfd.searches.generator.queue.Queue, 'get', record_get)
+    docs = [{'@id': f'/items/{i}/'} for i in range(40)]
+    list(_iter_sliced_hits(FakeSearch(docs), 4, 4, 2, 'embedded'))
+    # Every slice is read from before any slice gets a second read.
+    assert len(set(gets[:4])) == 4
+
+
+def test_searches_generator_iter_sliced_hits_page_budget(mocker):
+    import igvfd.searches.generator
+    from igvfd.searches.generator import _iter_sliced_hits
+    slices = []
+    extra = FakeSearch.extra
+
+    def record_extra(search, slice=None):
+        slices.append(slice['max'])
+        return extra(search, slice)
+
+    mocker.patch.object(FakeSearch, 'extra', record_extra)
+    fetched = []
+    islice = igvfd.searches.generator.itertools.islice
+
+    def record_islice(hits, page_size):
+        page = list(islice(hits, page_size))
+        fetched.append(len(page))
+        return page
+
+    mocker.patch.object(igvfd.searches.generator.itertools, 'islice', record_islice)
+    docs = [{'@id': f'/items/{i}/'} for i in range(100)]
+    hits = _iter_sliced_hits(FakeSearch(docs), 8, 2, 5, 'embedded')
+    assert next(hits) == docs[0]
+    assert slices == [2, 2]
+    # Each of the 2 slices holds at most its one page until it is consumed.
+    assert len(fetched) <= 2
+    hits.close()
+
+
+def test_searches_generator_sliced_search_generator_keeps_sort(mocker):
+    from igvfd.searches.generator import sliced_search_generator
+    search_generator = mocker.patch('igvfd.searches.generator.search_generator')
+    request = mocker.Mock()
+    request.registry.settings = {}
+    request.params = {'sort': 'accession'}
+    assert sliced_search_generator(request) is search_generator.return_value
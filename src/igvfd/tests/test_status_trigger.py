@@ -106,3 +106,74 @@ def test_set_status_endpoint_status_specified(testapp, content):
         {'status': 'released'},
         status=200
     )
+
+
+def test_set_status_plans_children(testapp, measurement_set, reference_file, experimental_protocol_document):
+    testapp.patch_json(reference_file['@id'], {'file_set': measurement_set['@id']})
+    testapp.patch_json(measurement_set['@id'], {'documents': [experimental_protocol_document['@id']]})
+    res = testapp.patch_json(
+        measurement_set['@id'] + '@@set_status?update=true&force_audit=true&validate=false',
+        {'status': 'released'},
+        status=200
+    )
+    considered = {item_id for item_id, _, _ in res.json['considered']}
+    assert {measurement_set['@id'], reference_file['@id'], experimental_protocol_document['@id']} <= considered
+    changed = {item_id for item_id, _, _ in res.json['changed']}
+    assert {measurement_set['@id'], reference_file['@id'], experimental_protocol_document['@id']} <= changed
+    assert testapp.get(reference_file['@id']).json['status'] == 'released'
+
+
+def test_set_status_child_validation_blocks_all_updates(testapp, measurement_set, reference_file, mocker):
+    from snovault.validation import ValidationFailure
+    from igvfd.types.file import File
+    testapp.patch_json(reference_file['@id'], {'file_set': measurement_set['@id']})
+    mocker.patch.object(
+        File,
+        '_validate_set_status_patch',
+        side_effect=ValidationFailure('body', ['status'], 'Invalid file')
+    )
+    testapp.patch_json(
+        measurement_set['@id'] + '@@set_status?update=true&force_audit=true',
+        {'status': 'released'},
+        status=422
+    )
+    assert testapp.get(measurement_set['@id']).json['status'] == 'in progress'
+
+
+def test_set_status_without_plan_token_skips_plan_cache(testapp, measurement_set, mocker):
+    from igvfd.types.base import SetStatusPlanner
+    mocker.spy(SetStatusPlanner, '_get_plan_token')
+    testapp.patch_json(
+        measurement_set['@id'] + '@@set_status?update=true&force_audit=true',
+        {'status': 'released'},
+        status=200
+    )
+    assert SetStatusPlanner._get_plan_token.call_count == 0
+
+
+def test_set_status_plan_dry_run(testapp, measurement_set, reference_file, mocker):
+    from igvfd.types.base import SetStatusPlanner
+    testapp.patch_json(reference_file['@id'], {'file_set': measurement_set['@id']})
+    res = testapp.patch_json(
+        measurement_set['@id'] + '@@set_status?plan=true&update=true',
+        {'status': 'released'},
+        status=200
+    )
+    considered = {item_id for item_id, _, _ in res.json['considered']}
+    assert {measurement_set['@id'], reference_file['@id']} <= considered
+    changed = {item_id for item_id, _, _ in res.json['changed']}
+    assert {measurement_set['@id'], reference_file['@id']} <= changed
+    assert res.json['audits']['evaluated'] == 1
+    assert res.json['estimated_embed_calls'] >= 2
+    assert res.json['estimated_db_calls'] >= len(changed)
+    assert res.json['plan_token']
+    assert testapp.get(reference_file['@id']).json['status'] == 'in progress'
+    mocker.spy(SetStatusPlanner, 'plan')
+    testapp.patch_json(
+        measurement_set['@id'] + '@@set_status?update=true&force_audit=true&validate=false&plan_token=' +
+        res.json['plan_token'],
+        {'status': 'released'},
+        status=200
+    )
+    assert SetStatusPlanner.plan.call_count == 0
+    assert testapp.get(reference_file['@id']).json['status'] == 'released'
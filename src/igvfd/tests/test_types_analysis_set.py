@@ -88,3 +88,71 @@ def test_analysis_set_summary(testapp, analysis_set_base, base_auxiliary_set, me
     )
     res = testapp.get(analysis_set_base['@id']).json
     assert res.get('summary', '') == 'intermediate analysis of ATAC-seq, STARR-seq, lentiMPRA data'
+
+
+def test_input_file_set_closure_cache():
+    from igvfd.provenance import ClosureCache
+    cache = ClosureCache(capacity=1)
+    cache.set('a', 10, ['closure'], {'b'}, {'c'})
+    assert cache.peek_dependencies('a') == {'b', 'c'}
+    assert cache.get('a', 10) == (10, ['closure'], {'b'}, {'c'})
+    assert cache.get('a', 11) is None
+    assert cache.get('a', None) is None
+    cache.set('d', 10, [], set(), set())
+    assert cache.peek_dependencies('a') is None
+
+
+def test_input_file_set_closure_cache_keyed_by_principals(mocker):
+    from igvfd.provenance import (
+        ClosureCache,
+        get_input_file_set_closure,
+        INPUT_FILE_SET_CLOSURE_CACHE,
+    )
+    mocker.patch('igvfd.provenance.get_max_sid', return_value=10)
+    cache = ClosureCache()
+    analysis_set = mocker.Mock()
+    analysis_set.uuid = '609869e7-cbd9-4d06-9569-d3fdb4604ccd'
+
+    def get_closure(effective_principals):
+        request = mocker.Mock()
+        request.registry = {INPUT_FILE_SET_CLOSURE_CACHE: cache}
+        request.effective_principals = effective_principals
+        request._embedded_uuids = set()
+        request._linked_uuids = set()
+        request._stats = {}
+        request.memoized_embed.return_value = {'file_set_type': 'experimental data'}
+        get_input_file_set_closure(request, analysis_set, ['/analysis-sets/IGVFDS0000ANAL/'])
+        return request._stats
+
+    assert get_closure(['system.Everyone', 'group.admin']) == {'provenance_cache_misses': 1}
+    assert get_closure(['system.Everyone']) == {'provenance_cache_misses': 1}
+    assert get_closure(['group.admin', 'system.Everyone']) == {'provenance_cache_hits': 1}
+
+
+def test_analysis_set_closure_invalidated_by_nested_edit(testapp, analysis_set_base, primary_analysis_set,
+                                                         measurement_set_mpra):
+    testapp.patch_json(
+        primary_analysis_set['@id'],
+        {
+            'input_file_sets': [measurement_set_mpra['@id']]
+        }
+    )
+    testapp.patch_json(
+        analysis_set_base['@id'],
+        {
+            'input_file_sets': [primary_analysis_set['@id']]
+        }
+    )
+    res = testapp.get(analysis_set_base['@id'] + '@@object')
+    assert res.json['summary'] == 'intermediate analysis of massively parallel reporter assay data'
+    assert res.json.get('assay_titles') == []
+    res = testapp.get(analysis_set_base['@id'] + '@@object')
+    assert 'provenance_cache_hits=' in res.headers['X-Stats']
+    testapp.patch_json(
+        measurement_set_mpra['@id'],
+        {
+            'preferred_assay_title': 'lentiMPRA'
+        }
+    )
+    res = testapp.get(analysis_set_base['@id'] + '@@object')
+    assert res.json['summary'] == 'intermediate analysis of lentiMPRA data'
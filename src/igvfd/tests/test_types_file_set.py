@@ -54,3 +54,54 @@ def test_submitted_files_timestamp(testapp,  reference_file, sequence_file, meas
     )
     res = testapp.get(measurement_set['@id'])
     assert res.json.get('submitted_files_timestamp') == reference_file.get('creation_timestamp')
+
+
+def test_submitted_files_timestamp_file_removed(testapp, reference_file, sequence_file, measurement_set,
+                                                curated_set_genome):
+    for file_id in [reference_file['@id'], sequence_file['@id']]:
+        testapp.patch_json(
+            file_id,
+            {
+                'file_set': measurement_set['@id']
+            }
+        )
+    testapp.patch_json(
+        reference_file['@id'],
+        {
+            'file_set': curated_set_genome['@id']
+        }
+    )
+    res = testapp.get(measurement_set['@id'])
+    assert res.json.get('submitted_files_timestamp') == sequence_file.get('creation_timestamp')
+    res = testapp.get(curated_set_genome['@id'])
+    assert res.json.get('submitted_files_timestamp') == reference_file.get('creation_timestamp')
+    res = testapp.post_json(measurement_set['@id'] + '@@refresh_submitted_files_timestamp', {})
+    assert res.json['submitted_files_timestamp'] == sequence_file.get('creation_timestamp')
+
+
+def test_submitted_files_timestamp_file_deleted(testapp, reference_file, sequence_file, measurement_set):
+    for file_id in [reference_file['@id'], sequence_file['@id']]:
+        testapp.patch_json(
+            file_id,
+            {
+                'file_set': measurement_set['@id']
+            }
+        )
+    testapp.patch_json(
+        reference_file['@id'],
+        {
+            'status': 'deleted'
+        }
+    )
+    res = testapp.get(measurement_set['@id'])
+    assert res.json.get('submitted_files_timestamp') == sequence_file.get('creation_timestamp')
+    res = testapp.post_json(measurement_set['@id'] + '@@refresh_submitted_files_timestamp', {})
+    assert res.json['submitted_files_timestamp'] == sequence_file.get('creation_timestamp')
+    testapp.patch_json(
+        reference_file['@id'],
+        {
+            'status': 'in progress'
+        }
+    )
+    res = testapp.get(measurement_set['@id'])
+    assert res.json.get('submitted_files_timestamp') == reference_file.get('creation_timestamp')
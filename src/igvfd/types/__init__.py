@@ -1,4 +1,15 @@
+from .base import (
+    DEFAULT_SET_STATUS_PLAN_CACHE_CAPACITY,
+    SET_STATUS_PLAN_CACHE,
+    SetStatusPlanCache,
+)
+
+
 def includeme(config):
     config.scan(categories=None)
     config.add_request_method(lambda request: set(), '_set_status_changed_paths', reify=True)
     config.add_request_method(lambda request: set(), '_set_status_considered_paths', reify=True)
+    capacity = int(
+        config.registry.settings.get('set_status_plan_cache.capacity', DEFAULT_SET_STATUS_PLAN_CACHE_CAPACITY)
+    )
+    config.registry[SET_STATUS_PLAN_CACHE] = SetStatusPlanCache(capacity=capacity)
@@ -1,4 +1,8 @@
+import hashlib
 import itertools
+import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from functools import lru_cache
 import logging
@@ -26,8 +30,20 @@ from snovault.auditor import traversed_path_ids
 from snovault import (
     AfterModified,
     BeforeModified,
-    calculated_property
+    calculated_property,
+    DBSESSION,
 )
+from snovault.storage import PropertySheet
+from sqlalchemy import func
+from igvfd.embed import (
+    prefetch_items,
+    resolve_item_uuids,
+)
+
+
+SET_STATUS_PLAN_CACHE = 'igvfd.set_status_plan_cache'
+
+DEFAULT_SET_STATUS_PLAN_CACHE_CAPACITY = 100
 
 
 @lru_cache()
@@ -265,7 +281,8 @@ class Item(snovault.Item):
         if any(request.errors):
             raise ValidationFailure(request.errors)
 
-    def _update_status(self, new_status, current_status, current_properties, schema, request, item_id, update, validate=True):
+    @staticmethod
+    def _get_new_status_properties(new_status, current_properties, schema):
         new_properties = current_properties.copy()
         new_properties['status'] = new_status
         # Some release specific functionality.
@@ -273,6 +290,16 @@ class Item(snovault.Item):
             # This won't be reassigned if you rerelease something.
             if 'release_timestamp' in schema['properties'] and 'release_timestamp' not in new_properties:
                 new_properties['release_timestamp'] = str(datetime.utcnow().isoformat() + '+00:00')
+        return new_properties
+
+    def _apply_status(self, new_properties, current_status, new_status, request, item_id):
+        request.registry.notify(BeforeModified(self, request))
+        self.update(new_properties)
+        request.registry.notify(AfterModified(self, request))
+        request._set_status_changed_paths.add((item_id, current_status, new_status))
+
+    def _update_status(self, new_status, current_status, current_properties, schema, request, item_id, update, validate=True):
+        new_properties = self._get_new_status_properties(new_status, current_properties, schema)
         if validate:
             self._validate_set_status_patch(request, schema, new_properties, current_properties)
         # Don't update if update parameter not true.
@@ -281,10 +308,7 @@ class Item(snovault.Item):
         # Don't actually patch if the same.
         if new_status == current_status:
             return
-        request.registry.notify(BeforeModified(self, request))
-        self.update(new_properties)
-        request.registry.notify(AfterModified(self, request))
-        request._set_status_changed_paths.add((item_id, current_status, new_status))
+        self._apply_status(new_properties, current_status, new_status, request, item_id)
 
     def _get_child_paths(self, current_status, new_status, block_children):
         # Do not traverse children if parameter specified.
@@ -310,48 +334,32 @@ class Item(snovault.Item):
         return related_objects
 
     @staticmethod
-    def _block_on_audits(item_id, force_audit, request, parent, new_status):
+    def _get_blocking_audits(item_id, force_audit, request, parent, new_status):
+        # Returns None if audits are not evaluated.
         if new_status not in ['released']:
-            return
+            return None
         if not parent or force_audit:
-            return
+            return None
         audits = request.embed(item_id, '@@audit')
         errors = audits.get('audit', {}).get('ERROR', [])
         not_compliants = audits.get('audit', {}).get('NOT_COMPLIANT', [])
+        return list(itertools.chain(errors, not_compliants))
+
+    @staticmethod
+    def _block_on_audits(item_id, force_audit, request, parent, new_status):
+        blocking_audits = Item._get_blocking_audits(item_id, force_audit, request, parent, new_status)
         details = {
             detail.get('detail')
-            for detail in itertools.chain(errors, not_compliants)
+            for detail in blocking_audits or []
             if detail.get('detail')
         }
-        if audits and any([errors, not_compliants]):
+        if blocking_audits:
             raise ValidationFailure(
                 'body',
                 ['status'],
                 'Audit on parent object. Must use ?force_audit=true to change status. {}'.format(list(details))
             )
 
-    @staticmethod
-    def _set_status_on_related_objects(new_status, related_objects, root, request):
-        for child_id in related_objects:
-            # Avoid cycles.
-            visited_children = [
-                x[0]
-                for x in request._set_status_changed_paths.union(
-                    request._set_status_considered_paths
-                )
-            ]
-            if child_id in visited_children:
-                continue
-            else:
-                child_uuid = request.embed(child_id).get('uuid')
-                igvfd_item = root.get_by_uuid(child_uuid)
-                igvfd_item.set_status(
-                    new_status,
-                    request,
-                    parent=False
-                )
-        return True
-
     @staticmethod
     def _calculate_block_children(request, force_transition):
         block_children_param = request.params.get('block_children', None)
@@ -359,8 +367,7 @@ class Item(snovault.Item):
             return True
         return asbool(block_children_param)
 
-    def set_status(self, new_status, request, parent=True):
-        root = find_root(self)
+    def _get_set_status_node(self, new_status, request, parent, force_transition):
         schema = self.type_info.schema
         properties = self.upgrade_properties()
         item_id = '{}/'.format(resource_path(self))
@@ -368,26 +375,254 @@ class Item(snovault.Item):
         if not current_status:
             raise ValidationFailure('body', ['status'], 'No property status')
         if not self._valid_status(new_status, schema, parent):
-            return False
-        force_transition = asbool(request.params.get('force_transition'))
+            return None
         if not self._valid_transition(current_status, new_status, parent, force_transition):
+            return None
+        return SetStatusNode(self, item_id, current_status, properties)
+
+    def set_status(self, new_status, request, parent=True):
+        force_transition = asbool(request.params.get('force_transition'))
+        node = self._get_set_status_node(new_status, request, parent, force_transition)
+        if node is None:
             return False
         force_audit = asbool(request.params.get('force_audit'))
-        self._block_on_audits(item_id, force_audit, request, parent, new_status)
-        update = asbool(request.params.get('update'))
-        validate = asbool(request.params.get('validate', True))
-        self._update_status(new_status, current_status, properties, schema, request, item_id, update, validate=validate)
-        request._set_status_considered_paths.add((item_id, current_status, new_status))
-        logging.warning(
-            'Considering {} from status {} to status {}'.format(item_id, current_status, new_status)
-        )
-        block_children = self._calculate_block_children(request, force_transition)
-        child_paths = self._get_child_paths(current_status, new_status, block_children)
-        embedded_properties = request.embed(item_id, '@@embedded')
-        related_objects = self._get_related_object(child_paths, embedded_properties, request)
-        self._set_status_on_related_objects(new_status, related_objects, root, request)
+        self._block_on_audits(node.item_id, force_audit, request, parent, new_status)
+        planner = SetStatusPlanner(request, new_status, force_transition)
+        # Reuse the plan of an earlier ?plan=true call passed as
+        # ?plan_token= if nothing changed since.
+        plan = None
+        plan_token = request.params.get('plan_token')
+        if plan_token:
+            plan = planner.get_cached_plan(node, plan_token)
+        if plan is None:
+            plan = planner.plan(node)
+        plan.validate(request, validate=asbool(request.params.get('validate', True)))
+        plan.apply(request, update=asbool(request.params.get('update')))
         return True
 
+    def plan_set_status(self, new_status, request):
+        force_transition = asbool(request.params.get('force_transition'))
+        node = self._get_set_status_node(new_status, request, True, force_transition)
+        force_audit = asbool(request.params.get('force_audit'))
+        blocking_audits = self._get_blocking_audits(node.item_id, force_audit, request, True, new_status)
+        planner = SetStatusPlanner(request, new_status, force_transition)
+        plan = planner.plan(node)
+        token = planner.cache_plan(node, plan)
+        audits_evaluated = 0 if blocking_audits is None else 1
+        changed = plan.get_changed()
+        return {
+            'plan_token': token,
+            'considered': plan.get_considered(),
+            'changed': changed,
+            'audits': {
+                'evaluated': audits_evaluated,
+                'blocking': len(blocking_audits or []),
+            },
+            'estimated_embed_calls': planner.embed_calls + audits_evaluated,
+            # One write per changed item on top of the traversal queries.
+            'estimated_db_calls': planner.db_calls + len(changed),
+        }
+
+
+class SetStatusNode:
+    def __init__(self, item, item_id, current_status, properties):
+        self.item = item
+        self.item_id = item_id
+        self.current_status = current_status
+        self.properties = properties
+
+
+class SetStatusPlanCache:
+    '''
+    LRU of set_status plans by plan token, shared by the requests of a
+    process. Only the uuids and paths of the planned items are kept.
+    '''
+
+    def __init__(self, capacity=DEFAULT_SET_STATUS_PLAN_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, token):
+        with self.lock:
+            value = self.cache.get(token)
+            if value is not None:
+                self.cache.move_to_end(token)
+            return value
+
+    def set(self, token, value):
+        with self.lock:
+            self.cache[token] = value
+            self.cache.move_to_end(token)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+
+class SetStatusPlan:
+    '''
+    Items reached by a set_status call, in the order they were considered.
+    '''
+
+    def __init__(self, new_status, nodes):
+        self.new_status = new_status
+        self.nodes = nodes
+        self.new_properties = {}
+
+    def get_considered(self):
+        return [
+            (node.item_id, node.current_status, self.new_status)
+            for node in self.nodes
+        ]
+
+    def get_changed(self):
+        return [
+            (node.item_id, node.current_status, self.new_status)
+            for node in self.nodes
+            if node.current_status != self.new_status
+        ]
+
+    def validate(self, request, validate=True):
+        # Everything is validated before anything is written.
+        for node in self.nodes:
+            schema = node.item.type_info.schema
+            new_properties = node.item._get_new_status_properties(self.new_status, node.properties, schema)
+            if validate:
+                node.item._validate_set_status_patch(request, schema, new_properties, node.properties)
+            self.new_properties[node.item_id] = new_properties
+
+    def apply(self, request, update=False):
+        for node in self.nodes:
+            request._set_status_considered_paths.add((node.item_id, node.current_status, self.new_status))
+            # Don't update if update parameter not true or if status the same.
+            if not update or node.current_status == self.new_status:
+                continue
+            node.item._apply_status(
+                self.new_properties[node.item_id],
+                node.current_status,
+                self.new_status,
+                request,
+                node.item_id
+            )
+
+
+class SetStatusPlanner:
+    '''
+    Walks the set_status_up/set_status_down closure of an item one level
+    at a time, fetching each level with request.embed_many instead of
+    embedding @@embedded item by item.
+    '''
+
+    def __init__(self, request, new_status, force_transition=False):
+        self.request = request
+        self.new_status = new_status
+        self.force_transition = force_transition
+        self.block_children = Item._calculate_block_children(request, force_transition)
+        self.embed_calls = 0
+        self.db_calls = 0
+
+    def _get_plan_token(self, node):
+        # Any write bumps the max sid, so a token is only reproduced while
+        # the database is unchanged since the plan was made.
+        max_sid = self.request.registry[DBSESSION].query(
+            func.max(PropertySheet.sid)
+        ).scalar()
+        key = json.dumps(
+            [str(node.item.uuid), self.new_status, self.force_transition, self.block_children, max_sid]
+        )
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def cache_plan(self, node, plan):
+        token = self._get_plan_token(node)
+        self.request.registry[SET_STATUS_PLAN_CACHE].set(
+            token,
+            [
+                (str(plan_node.item.uuid), plan_node.item_id)
+                for plan_node in plan.nodes
+            ]
+        )
+        return token
+
+    def get_cached_plan(self, node, token):
+        if token != self._get_plan_token(node):
+            return None
+        entries = self.request.registry[SET_STATUS_PLAN_CACHE].get(token)
+        if entries is None:
+            return None
+        root = find_root(node.item)
+        prefetch_items(self.request, [uuid for uuid, _ in entries])
+        nodes = []
+        for uuid, item_id in entries:
+            item = root.get_by_uuid(uuid)
+            properties = item.upgrade_properties()
+            nodes.append(SetStatusNode(item, item_id, properties.get('status'), properties))
+        return SetStatusPlan(self.new_status, nodes)
+
+    def _get_child_paths(self, node):
+        return node.item._get_child_paths(node.current_status, self.new_status, self.block_children)
+
+    @staticmethod
+    def _get_frame(node, child_paths):
+        # Only render calculated properties if a child path needs them.
+        submittable = node.item.schema.get('properties', {})
+        if all(path.split('.')[0] in submittable for path in child_paths):
+            return '@@object?skip_calculated=true'
+        return '@@object'
+
+    def _get_child_ids(self, nodes, visited):
+        nodes_by_frame = {}
+        for node in nodes:
+            child_paths = self._get_child_paths(node)
+            if child_paths:
+                nodes_by_frame.setdefault(self._get_frame(node, child_paths), []).append((node, child_paths))
+        child_ids = []
+        for frame, nodes_with_paths in nodes_by_frame.items():
+            self.embed_calls += len(nodes_with_paths)
+            objects = self.request.embed_many([node.item_id for node, _ in nodes_with_paths], frame)
+            for (node, child_paths), obj in zip(nodes_with_paths, objects):
+                for child_id in sorted(node.item._get_related_object(child_paths, obj, self.request)):
+                    # Avoid cycles.
+                    if child_id not in visited:
+                        visited.add(child_id)
+                        child_ids.append(child_id)
+        return child_ids
+
+    def _get_items(self, root, child_ids):
+        if not child_ids:
+            return
+        # A keys query, then an IN query each for the items and their links.
+        self.db_calls += 3
+        uuids = resolve_item_uuids(self.request, child_ids)
+        prefetch_items(self.request, uuids.values())
+        for child_id in child_ids:
+            if child_id in uuids:
+                yield root.get_by_uuid(uuids[child_id])
+            else:
+                yield traverse(root, child_id)['context']
+
+    def plan(self, node):
+        root = find_root(node.item)
+        nodes = []
+        visited = {node.item_id}
+        level = [node]
+        while level:
+            for level_node in level:
+                logging.warning(
+                    'Considering {} from status {} to status {}'.format(
+                        level_node.item_id, level_node.current_status, self.new_status
+                    )
+                )
+            nodes.extend(level)
+            child_ids = self._get_child_ids(level, visited)
+            level = [
+                child_node
+                for child_node in (
+                    child._get_set_status_node(self.new_status, self.request, False, self.force_transition)
+                    for child in self._get_items(root, child_ids)
+                )
+                if child_node is not None
+            ]
+        return SetStatusPlan(self.new_status, nodes)
+
 
 class SharedItem(Item):
     ''' An Item visible to all authenticated users while "in progress".
@@ -455,6 +690,14 @@ def item_set_status(context, request):
     new_status = request.json_body.get('status')
     if not new_status:
         raise ValidationFailure('body', ['status'], 'Status not specified')
+    if asbool(request.params.get('plan')):
+        # Dry run. Nothing is validated or written.
+        plan = context.plan_set_status(new_status, request)
+        plan.update({
+            'status': 'success',
+            '@type': ['result'],
+        })
+        return plan
     context.set_status(new_status, request)
     # Returns changed and considered lists of tuples: (item, current_status, new_status).
     return {
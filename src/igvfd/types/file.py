@@ -9,6 +9,8 @@ from pyramid.httpexceptions import HTTPTemporaryRedirect
 
 from pyramid.settings import asbool
 
+from pyramid.traversal import find_root
+
 from pyramid.view import view_config
 
 from urllib.parse import parse_qs
@@ -31,6 +33,7 @@ from igvfd.types.base import (
     Item,
     paths_filtered_by_status
 )
+from igvfd.types.file_set import FILES_SUMMARY_EXCLUDED_STATUSES
 
 from igvfd.upload_credentials import get_s3_client
 from igvfd.upload_credentials import get_sts_client
@@ -200,6 +203,29 @@ class File(Item):
             sheets['external'] = upload_credentials.external_creds()
         return super(File, cls).create(registry, uuid, properties, sheets)
 
+    @staticmethod
+    def _get_files_summary_entry(properties):
+        # The (file set, creation_timestamp) this file counts towards in the
+        # files summary of its file set, if any.
+        if properties.get('status') in FILES_SUMMARY_EXCLUDED_STATUSES:
+            return None, None
+        return properties.get('file_set'), properties.get('creation_timestamp')
+
+    def _update(self, properties, sheets=None):
+        current_file_set, current_timestamp = self._get_files_summary_entry(self.propsheets.get('', {}))
+        super(File, self)._update(properties, sheets)
+        if properties is None:
+            return
+        new_file_set, new_timestamp = self._get_files_summary_entry(properties)
+        if (current_file_set, current_timestamp) == (new_file_set, new_timestamp):
+            return
+        # Keep the submitted_files_timestamp aggregate of the file sets in sync.
+        root = find_root(self)
+        if current_file_set is not None:
+            root.get_by_uuid(current_file_set).file_removed(current_timestamp)
+        if new_file_set is not None:
+            root.get_by_uuid(new_file_set).file_added(new_timestamp)
+
     def _get_external_sheet(self):
         external = self.propsheets.get(
             'external',
@@ -1,8 +1,11 @@
+from pyramid.view import view_config
 from snovault import (
     abstract_collection,
     calculated_property,
     collection,
+    CONNECTION,
     load_schema,
+    TYPES,
 )
 from snovault.util import Path
 
@@ -10,14 +13,26 @@ from .base import (
     Item,
     paths_filtered_by_status
 )
+from igvfd.provenance import get_input_file_set_closure
 
 from datetime import datetime
 
 
+FILES_SUMMARY_SHEET = 'files_summary'
+
+# Files with these statuses are left out of the files rev link, as in
+# paths_filtered_by_status, and so out of the files summary.
+FILES_SUMMARY_EXCLUDED_STATUSES = ('deleted', 'replaced')
+
+
+def parse_creation_timestamp(timestamp):
+    return datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f%z')
+
+
 def get_donors_from_samples(request, samples):
     donor_objects = []
-    for sample in samples:
-        donor_objects += request.embed(sample, '@@object').get('donors', [])
+    for sample_object in request.embed_many(samples, '@@object'):
+        donor_objects += sample_object.get('donors', [])
     return list(set(donor_objects))
 
 
@@ -130,15 +145,92 @@ class FileSet(Item):
     })
     def submitted_files_timestamp(self, request, files):
         if files:
+            files_summary = self.propsheets.get(FILES_SUMMARY_SHEET)
+            if files_summary is not None:
+                return files_summary.get('submitted_files_timestamp')
+            # File sets that have not been backfilled yet.
             timestamps = set()
-            for current_file_path in files:
-                file_object = request.embed(current_file_path, '@@object?skip_calculated=true')
+            for file_object in request.embed_many(files, '@@object?skip_calculated=true'):
                 timestamp = file_object.get('creation_timestamp', None)
                 if timestamp:
                     timestamps.add(timestamp)
-            res = sorted(timestamps, key=lambda x: datetime.strptime(x, '%Y-%m-%dT%H:%M:%S.%f%z'))
+            res = sorted(timestamps, key=parse_creation_timestamp)
             return res[0]
 
+    @classmethod
+    def create(cls, registry, uuid, properties, sheets=None):
+        sheets = {} if sheets is None else sheets.copy()
+        sheets.setdefault(FILES_SUMMARY_SHEET, {'submitted_files_timestamp': None})
+        return super(FileSet, cls).create(registry, uuid, properties, sheets)
+
+    def _get_file_uuids(self):
+        type_name, rel = self.rev['files']
+        file_types = self.registry[TYPES][type_name].subtypes
+        return self.registry[CONNECTION].get_rev_links(self.model, rel, *file_types)
+
+    def _set_files_summary_sheet(self, files_summary):
+        # Only write the summary sheet so the file set properties keep their sid.
+        self.update(
+            None,
+            {
+                FILES_SUMMARY_SHEET: files_summary
+            }
+        )
+
+    def refresh_files_summary(self):
+        connection = self.registry[CONNECTION]
+        timestamps = set()
+        for file_uuid in self._get_file_uuids():
+            properties = connection.get_by_uuid(str(file_uuid)).properties
+            if properties.get('status') in FILES_SUMMARY_EXCLUDED_STATUSES:
+                continue
+            timestamp = properties.get('creation_timestamp')
+            if timestamp:
+                timestamps.add(timestamp)
+        submitted_files_timestamp = min(timestamps, key=parse_creation_timestamp, default=None)
+        self._set_files_summary_sheet(
+            {
+                'submitted_files_timestamp': submitted_files_timestamp
+            }
+        )
+        return submitted_files_timestamp
+
+    def file_added(self, timestamp):
+        files_summary = self.propsheets.get(FILES_SUMMARY_SHEET)
+        if files_summary is None:
+            self.refresh_files_summary()
+            return
+        current = files_summary.get('submitted_files_timestamp')
+        if not timestamp:
+            return
+        if current is None or parse_creation_timestamp(timestamp) < parse_creation_timestamp(current):
+            self._set_files_summary_sheet(
+                {
+                    'submitted_files_timestamp': timestamp
+                }
+            )
+
+    def file_removed(self, timestamp):
+        files_summary = self.propsheets.get(FILES_SUMMARY_SHEET)
+        # Only removing the earliest file can change the minimum.
+        if files_summary is None or files_summary.get('submitted_files_timestamp') == timestamp:
+            self.refresh_files_summary()
+
+
+@view_config(
+    context=FileSet,
+    permission='index',
+    request_method='POST',
+    name='refresh_submitted_files_timestamp'
+)
+def file_set_refresh_submitted_files_timestamp(context, request):
+    submitted_files_timestamp = context.refresh_files_summary()
+    return {
+        'status': 'success',
+        '@type': ['result'],
+        'submitted_files_timestamp': submitted_files_timestamp,
+    }
+
 
 @collection(
     name='analysis-sets',
@@ -167,30 +259,14 @@ class AnalysisSet(FileSet):
     )
     def summary(self, request, file_set_type, input_file_sets=[]):
         sentence = f'{file_set_type}'
-        inspected_filesets = set()
         assay_terms = set()
         fileset_types = set()
         if input_file_sets:
-            filesets_to_inspect = set(input_file_sets.copy())
-
-            while filesets_to_inspect:
-                input_fileset = filesets_to_inspect.pop()
-                if input_fileset not in inspected_filesets:
-                    inspected_filesets.add(input_fileset)
-                    fileset_object = request.embed(input_fileset, '@@object?skip_calculated=true')
-                    if input_fileset.startswith('/measurement-sets/'):
-                        if 'preferred_assay_title' in fileset_object:
-                            assay_terms.add(fileset_object['preferred_assay_title'])
-                        else:
-                            assay_terms.add(request.embed(fileset_object['assay_term'],
-                                            '@@object?skip_calculated=true')['term_name'])
-                    elif not input_fileset.startswith('/analysis-sets/'):
-                        fileset_types.add(fileset_object['file_set_type'])
-                    elif (input_fileset.startswith('/analysis-sets/') and
-                          fileset_object.get('input_file_sets', False)):
-                        for candidate_fileset in fileset_object.get('input_file_sets'):
-                            if candidate_fileset not in inspected_filesets:
-                                filesets_to_inspect.add(candidate_fileset)
+            for file_set in get_input_file_set_closure(request, self, input_file_sets):
+                if file_set['item_type'] == 'MeasurementSet':
+                    assay_terms.add(file_set['assay_title'])
+                elif file_set['item_type'] != 'AnalysisSet':
+                    fileset_types.add(file_set['file_set_type'])
         if assay_terms:
             terms = ', '.join(sorted(assay_terms))
             sentence += f' of {terms} data'
@@ -219,14 +295,9 @@ class AnalysisSet(FileSet):
     def assay_titles(self, request, input_file_sets=None):
         assay_title = set()
         if input_file_sets is not None:
-            for fileset in input_file_sets:
-                file_set_object = request.embed(fileset, '@@object')
-                if file_set_object.get('preferred_assay_title') and \
-                        'MeasurementSet' in file_set_object.get('@type'):
-                    assay_title.add(file_set_object.get('preferred_assay_title'))
-                elif 'MeasurementSet' in file_set_object.get('@type'):
-                    assay = request.embed(file_set_object['assay_term'], '@@object')
-                    assay_title.add(assay.get('term_name'))
+            for file_set in get_input_file_set_closure(request, self, input_file_sets):
+                if file_set['direct'] and file_set['item_type'] == 'MeasurementSet':
+                    assay_title.add(file_set['assay_title'])
             return list(assay_title)
 
     @calculated_property(
@@ -284,8 +355,7 @@ class CuratedSet(FileSet):
     def assemblies(self, request, files=None):
         if files:
             assembly_values = set()
-            for current_file_path in files:
-                file_object = request.embed(current_file_path, '@@object?skip_calculated=true')
+            for file_object in request.embed_many(files, '@@object?skip_calculated=true'):
                 if file_object.get('assembly'):
                     assembly_values.add(file_object.get('assembly'))
             if assembly_values:
@@ -309,8 +379,7 @@ class CuratedSet(FileSet):
     def transcriptome_annotations(self, request, files=None):
         if files:
             annotation_values = set()
-            for current_file_path in files:
-                file_object = request.embed(current_file_path, '@@object?skip_calculated=true')
+            for file_object in request.embed_many(files, '@@object?skip_calculated=true'):
                 if file_object.get('transcriptome_annotation'):
                     annotation_values.add(file_object.get('transcriptome_annotation'))
             if annotation_values:
@@ -397,7 +466,7 @@ class MeasurementSet(FileSet):
         if samples:
             related_datasets = []
             for sample in samples:
-                sample_object = request.embed(sample, '@@object')
+                sample_object = request.memoized_embed(sample, '@@object')
                 if sample_object.get('file_sets'):
                     for file_set_id in sample_object.get('file_sets'):
                         if '/measurement-sets/' == file_set_id[:18] and \
@@ -426,7 +495,7 @@ class MeasurementSet(FileSet):
 
         if samples:
             for sample in samples:
-                sample_object = request.embed(sample, '@@object')
+                sample_object = request.memoized_embed(sample, '@@object')
                 if sample_object.get('modifications'):
                     for modification in sample_object.get('modifications'):
                         modality = request.embed(modification)['modality']
@@ -567,7 +636,7 @@ class AuxiliarySet(FileSet):
     def summary(self, request, file_set_type, measurement_sets=None):
         if not measurement_sets:
             return f'{file_set_type}'
-        measurement_sets_summaries = [request.embed(measurement_set, '@@object').get('summary')
+        measurement_sets_summaries = [request.memoized_embed(measurement_set, '@@object').get('summary')
                                       for measurement_set in measurement_sets[:2] if measurement_set]
         if len(measurement_sets) > 2:
             remainder = f'... and {len(measurement_sets) - 2} more measurement set{"s" if len(measurement_sets) - 2 != 1 else ""}'
@@ -689,7 +758,7 @@ class ConstructLibrarySet(FileSet):
             if small_scale_gene_list and len(small_scale_gene_list) > 1:
                 target_phrase = f' {len(small_scale_gene_list)} genes'
             elif small_scale_gene_list and len(small_scale_gene_list) == 1:
-                gene_object = request.embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
+                gene_object = request.memoized_embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
                 gene_name = (gene_object.get('symbol'))
                 target_phrase = f' {gene_name}'
             elif large_scale_gene_list:
@@ -698,15 +767,15 @@ class ConstructLibrarySet(FileSet):
             if small_scale_gene_list and len(small_scale_gene_list) > 1:
                 target_phrase = f' exon {exon} of multiple genes'
             elif small_scale_gene_list and len(small_scale_gene_list) == 1:
-                gene_object = request.embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
+                gene_object = request.memoized_embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
                 gene_name = (gene_object.get('symbol'))
                 target_phrase = f' exon {exon} of {gene_name}'
         if scope == 'interactors':
             if orf_list and len(orf_list) > 1:
                 target_phrase = f' {len(orf_list)} open reading frames'
             elif small_scale_gene_list and len(small_scale_gene_list) == 1:
-                gene_object = request.embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
-                orf_object = request.embed(orf_list[0], '@@object?skip_calculated=true')
+                gene_object = request.memoized_embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
+                orf_object = request.memoized_embed(orf_list[0], '@@object?skip_calculated=true')
                 gene_name = (gene_object.get('symbol'))
                 orf_id = (orf_object.get('orf_id'))
                 target_phrase = f' open reading frame {orf_id} of {gene_name}'
@@ -717,7 +786,7 @@ class ConstructLibrarySet(FileSet):
             if small_scale_gene_list and len(small_scale_gene_list) > 1:
                 target_phrase = f' tile {tile_id} of multiple genes'
             elif small_scale_gene_list and len(small_scale_gene_list) == 1:
-                gene_object = request.embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
+                gene_object = request.memoized_embed(small_scale_gene_list[0], '@@object?skip_calculated=true')
                 gene_name = (gene_object.get('symbol'))
                 target_phrase = f' tile {tile_id} of {gene_name} (AA {start}-{end})'
         if scope == 'genome-wide':
@@ -735,7 +804,7 @@ class ConstructLibrarySet(FileSet):
 
         if associated_phenotypes:
             for pheno in associated_phenotypes:
-                pheno_object = request.embed(pheno, '@@object?skip_calculated=true')
+                pheno_object = request.memoized_embed(pheno, '@@object?skip_calculated=true')
                 term_name = (pheno_object.get('term_name'))
                 pheno_terms.append(term_name)
             if len(pheno_terms) in [1, 2]:
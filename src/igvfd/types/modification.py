@@ -68,7 +68,7 @@ class Modification(Item):
 
         summary = f'{crispr_label_mapping[modality]} {species}{cas_label}{formatted_domain}'
         if tagged_protein:
-            tagged_protein_object = request.embed(tagged_protein, '@@object?skip_calculated=true')
+            tagged_protein_object = request.memoized_embed(tagged_protein, '@@object?skip_calculated=true')
             tagged_protein_symbol = tagged_protein_object.get('symbol')
 
             summary = f'{summary} fused to {tagged_protein_symbol}'
@@ -54,9 +54,10 @@ class OntologyTerm(Item):
 
     @staticmethod
     def _get_ontology_slims(registry, term_id, slim_key):
-        if term_id not in registry['ontology']:
+        term = registry['ontology'].get(term_id)
+        if term is None:
             return []
-        key = registry['ontology'][term_id].get(slim_key, [])
+        key = term.get(slim_key, [])
         return list(set(
             slim for slim in key
         ))
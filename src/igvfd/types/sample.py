@@ -13,8 +13,7 @@ from .base import (
 
 def collect_multiplexed_samples_prop(request, multiplexed_samples, property_name):
     property_set = set()
-    for sample in multiplexed_samples:
-        sample_props = request.embed(sample, '@@object?skip_calculated=true')
+    for sample_props in request.embed_many(multiplexed_samples, '@@object?skip_calculated=true'):
         property_contents = sample_props.get(property_name, None)
         if property_contents:
             if type(property_contents) == list:
@@ -33,7 +32,7 @@ def decompose_multiplexed_samples(request, samples, visited_multiplexed_samples=
     for sample in samples:
         if sample.startswith('/multiplexed-samples/') and sample not in visited_multiplexed_samples:
             visited_multiplexed_samples.add(sample)
-            multiplexed_samples = request.embed(sample, '@@object').get('multiplexed_samples')
+            multiplexed_samples = request.memoized_embed(sample, '@@object').get('multiplexed_samples')
             if multiplexed_samples:
                 decomposed_samples.update(decompose_multiplexed_samples(
                     request, multiplexed_samples, visited_multiplexed_samples))
@@ -236,7 +235,7 @@ class Biosample(Sample):
         sexes = set()
         if donors:
             for d in donors:
-                donor_object = request.embed(d, '@@object')
+                donor_object = request.memoized_embed(d, '@@object')
                 if donor_object.get('sex'):
                     sexes.add(donor_object.get('sex'))
         if len(sexes) == 1:
@@ -281,7 +280,7 @@ class Biosample(Sample):
         taxas = set()
         if donors:
             for d in donors:
-                donor_object = request.embed(d, '@@object?skip_calculated=true')
+                donor_object = request.memoized_embed(d, '@@object?skip_calculated=true')
                 if donor_object.get('taxa'):
                     taxas.add(donor_object.get('taxa'))
 
@@ -297,7 +296,7 @@ class Biosample(Sample):
         }
     )
     def summary(self, request, sample_terms, donors, sex, age, age_units=None, embryonic=None, virtual=None, classifications=None, time_post_change=None, time_post_change_units=None, targeted_sample_term=None, cellular_sub_pool=None, taxa=None, sorted_from_detail=None, disease_terms=None, biomarkers=None, treatments=None, construct_library_sets=None, moi=None, nucleic_acid_delivery=None):
-        term_object = request.embed(sample_terms[0], '@@object?skip_calculated=true')
+        term_object = request.memoized_embed(sample_terms[0], '@@object?skip_calculated=true')
         term_name = term_object.get('term_name')
         biosample_type = self.item_type
 
@@ -350,7 +349,7 @@ class Biosample(Sample):
                 biosample_type in ['in_vitro_system']):
             time_post_change = concat_numeric_and_units(time_post_change, time_post_change_units)
             if targeted_sample_term:
-                targeted_term_object = request.embed(targeted_sample_term, '@@object?skip_calculated=true')
+                targeted_term_object = request.memoized_embed(targeted_sample_term, '@@object?skip_calculated=true')
                 targeted_term_name = targeted_term_object.get('term_name')
                 summary_terms += f' induced to {targeted_term_name} for {time_post_change}'
             else:
@@ -379,7 +378,7 @@ class Biosample(Sample):
                 taxa_set = set()
                 strains_set = set()
                 for donor in donors:
-                    donor_object = request.embed(donor, '@@object?skip_calculated=true')
+                    donor_object = request.memoized_embed(donor, '@@object?skip_calculated=true')
                     taxa_set.add(donor_object['taxa'])
                     if donor_object['taxa'] == 'Mus musculus':
                         strains_set.add(donor_object.get('strain', ''))
@@ -445,7 +444,7 @@ class Biosample(Sample):
             verb = 'modified with'
             library_types = set()
             for CLS in construct_library_sets:
-                CLS_object = request.embed(CLS, '@@object?skip_calculated=true')
+                CLS_object = request.memoized_embed(CLS, '@@object?skip_calculated=true')
                 library_types.add(CLS_object['file_set_type'])
             if nucleic_acid_delivery:
                 if nucleic_acid_delivery == 'lentiviral transduction':
@@ -614,7 +613,7 @@ class TechnicalSample(Sample):
         if len(sample_terms) > 1:
             summary_terms = 'mixed'
         else:
-            term_object = request.embed(sample_terms[0], '@@object?skip_calculated=true')
+            term_object = request.memoized_embed(sample_terms[0], '@@object?skip_calculated=true')
             summary_terms = term_object.get('term_name')
 
         summary_terms = f'{sample_material} {summary_terms}'
@@ -626,7 +625,7 @@ class TechnicalSample(Sample):
             verb = 'modified with'
             library_types = set()
             for CLS in construct_library_sets:
-                CLS_object = request.embed(CLS, '@@object?skip_calculated=true')
+                CLS_object = request.memoized_embed(CLS, '@@object?skip_calculated=true')
                 library_types.add(CLS_object['file_set_type'])
             if nucleic_acid_delivery:
                 if nucleic_acid_delivery == 'lentiviral transduction':
@@ -740,7 +739,7 @@ class MultiplexedSample(Sample):
             if any(sample.startswith('/multiplexed-samples/') for sample in multiplexed_samples):
                 multiplexed_samples = decompose_multiplexed_samples(request, multiplexed_samples)
             multiplexed_samples = sorted(multiplexed_samples)
-            sample_summaries = [request.embed(
+            sample_summaries = [request.memoized_embed(
                 sample, '@@object').get('summary') for sample in multiplexed_samples[:2]]
             if len(multiplexed_samples) > 2:
                 remainder = f'... and {len(multiplexed_samples) - 2} more sample{"s" if len(multiplexed_samples) - 2 != 1 else ""}'
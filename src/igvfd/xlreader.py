@@ -3,10 +3,14 @@
 
 import csv
 import datetime
+import io
 import os.path
+import re
 import xlrd
 import zipfile
 
+from xml.etree import ElementTree
+
 
 def cell_value(cell, datemode):
     ctype = cell.ctype
@@ -36,9 +40,152 @@ def cell_value(cell, datemode):
     raise ValueError(repr(cell), 'unknown cell type')
 
 
+SPREADSHEETML_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+OFFICE_RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Built in number formats that display dates, as in xlrd.
+DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+
+
+def _is_date_format_code(code):
+    code = re.sub(r'"[^"]*"|\\.|\[[^\]]*\]', '', code).lower()
+    return any(char in code for char in 'dmyhs')
+
+
+def _column_index(reference):
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord('A') + 1
+    return index - 1
+
+
+def _read_shared_strings(zf):
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    shared_strings = []
+    with zf.open('xl/sharedStrings.xml') as stream:
+        for _, elem in ElementTree.iterparse(stream):
+            if elem.tag == SPREADSHEETML_NS + 'si':
+                # Rich text is split over several <t> elements.
+                shared_strings.append(''.join(t.text or '' for t in elem.iter(SPREADSHEETML_NS + 't')))
+                elem.clear()
+    return shared_strings
+
+
+def _read_date_styles(zf):
+    if 'xl/styles.xml' not in zf.namelist():
+        return set()
+    with zf.open('xl/styles.xml') as stream:
+        styles = ElementTree.parse(stream).getroot()
+    date_format_ids = set(DATE_FORMAT_IDS)
+    for num_fmt in styles.iter(SPREADSHEETML_NS + 'numFmt'):
+        if _is_date_format_code(num_fmt.get('formatCode', '')):
+            date_format_ids.add(int(num_fmt.get('numFmtId')))
+    cell_xfs = styles.find(SPREADSHEETML_NS + 'cellXfs')
+    if cell_xfs is None:
+        return set()
+    return {
+        index
+        for index, xf in enumerate(cell_xfs.findall(SPREADSHEETML_NS + 'xf'))
+        if int(xf.get('numFmtId', 0)) in date_format_ids
+    }
+
+
+def _find_sheet(zf, sheetname):
+    with zf.open('xl/workbook.xml') as stream:
+        workbook = ElementTree.parse(stream).getroot()
+    workbook_pr = workbook.find(SPREADSHEETML_NS + 'workbookPr')
+    datemode = 1 if workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true') else 0
+    sheets = workbook.find(SPREADSHEETML_NS + 'sheets').findall(SPREADSHEETML_NS + 'sheet')
+    if sheetname is None:
+        sheet, = sheets
+    else:
+        sheet = next((sheet for sheet in sheets if sheet.get('name') == sheetname), None)
+        if sheet is None:
+            return None, datemode
+    with zf.open('xl/_rels/workbook.xml.rels') as stream:
+        relationships = ElementTree.parse(stream).getroot()
+    rid = sheet.get(OFFICE_RELATIONSHIPS_NS + 'id')
+    for relationship in relationships.iter(PACKAGE_RELATIONSHIPS_NS + 'Relationship'):
+        if relationship.get('Id') == rid:
+            target = relationship.get('Target')
+            return (target.lstrip('/') if target.startswith('/') else 'xl/' + target), datemode
+    raise ValueError('No worksheet for sheet %r' % sheet.get('name'))
+
+
+def _xlsx_cell_value(cell, shared_strings, date_styles, datemode):
+    ctype = cell.get('t', 'n')
+    if ctype == 'inlineStr':
+        return ''.join(t.text or '' for t in cell.iter(SPREADSHEETML_NS + 't'))
+    v = cell.find(SPREADSHEETML_NS + 'v')
+    value = v.text if v is not None and v.text is not None else ''
+    if ctype == 's':
+        return shared_strings[int(value)]
+    if ctype in ('str', 'b'):
+        return value
+    if ctype == 'e':
+        raise ValueError(value, 'cell error')
+    if value == '':
+        return ''
+    number = float(value)
+    if int(cell.get('s', 0)) in date_styles:
+        value = xlrd.xldate_as_tuple(number, datemode)
+        if value[3:] == (0, 0, 0):
+            return datetime.date(*value[:3]).isoformat()
+        return datetime.datetime(*value).isoformat()
+    if number.is_integer():
+        number = int(number)
+    return str(number)
+
+
+def stream_reader(stream, sheetname=None):
+    """ Read named sheet or first and only sheet from xlsx file one row at
+    a time. Rows are parsed as they are read from the worksheet so only
+    the shared strings are held in memory.
+    """
+    zf = zipfile.ZipFile(stream)
+    path, datemode = _find_sheet(zf, sheetname)
+    if path is None:
+        return
+    shared_strings = _read_shared_strings(zf)
+    date_styles = _read_date_styles(zf)
+    ncols = 0
+    next_row = 0
+    with zf.open(path) as sheet:
+        for _, elem in ElementTree.iterparse(sheet):
+            if elem.tag == SPREADSHEETML_NS + 'dimension':
+                ncols = _column_index(elem.get('ref', 'A1').split(':')[-1]) + 1
+            elif elem.tag == SPREADSHEETML_NS + 'row':
+                row_index = int(elem.get('r', next_row + 1)) - 1
+                # Pad skipped rows and short rows like xlrd does.
+                while next_row < row_index:
+                    yield [''] * ncols
+                    next_row += 1
+                row = []
+                for cell in elem.iter(SPREADSHEETML_NS + 'c'):
+                    column = _column_index(cell.get('r', '')) if cell.get('r') else len(row)
+                    row.extend([''] * (column - len(row)))
+                    row.append(_xlsx_cell_value(cell, shared_strings, date_styles, datemode))
+                row.extend([''] * (ncols - len(row)))
+                yield row
+                next_row = row_index + 1
+                elem.clear()
+
+
 def reader(stream, sheetname=None):
     """ Read named sheet or first and only sheet from xlsx file
     """
+    if not stream.seekable():
+        stream = io.BytesIO(stream.read())
+    # xlsx files are zip archives and are streamed, xls files go to xlrd.
+    if zipfile.is_zipfile(stream):
+        stream.seek(0)
+        yield from stream_reader(stream, sheetname)
+        return
+    stream.seek(0)
     book = xlrd.open_workbook(file_contents=stream.read())
     if sheetname is None:
         sheet, = book.sheets()